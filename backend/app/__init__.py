@@ -0,0 +1,15 @@
+"""
+RuneSmith API package
+
+Environment variables from the project-root .env are loaded here, once,
+before any submodule reads configuration at import time.
+"""
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Start of the app's own import work (see app.services.startup_profile)
+IMPORT_STARTED = time.perf_counter()
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent.parent / ".env")
@@ -11,6 +11,7 @@ from typing import Optional
 
 from app.database.session import get_db
 from app.models import User
+from app.api.responses import json_response, user_dict
 from app.services.auth import (
     verify_password,
     get_password_hash,
@@ -110,7 +111,7 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     await db.commit()
     await db.refresh(new_user)
 
-    return new_user
+    return json_response(user_dict(new_user), status_code=status.HTTP_201_CREATED)
 
 
 @router.post("/token", response_model=Token)
@@ -137,10 +138,10 @@ async def login(
     user.last_login = datetime.utcnow()
     await db.commit()
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return json_response({"access_token": access_token, "token_type": "bearer"})
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
-    return current_user
+    return json_response(user_dict(current_user))
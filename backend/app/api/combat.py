@@ -0,0 +1,129 @@
+"""
+Combat API routes - authoritative fight result submission
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import get_db
+from app.models import User
+from app.api.auth import get_current_user
+from app.api.responses import json_response
+from app.services.combat import DuplicateCombatLog, ingest_combat, known_skills, schedule_replay
+from app.services.combat_replay import MAX_EVENTS, CombatLogError, summarize, validate_columns
+from app.services.rate_limit import combat_rate_limit
+
+router = APIRouter(prefix="/api/combat", tags=["combat"])
+
+
+# ── Schemas ──
+
+class CombatTarget(BaseModel):
+    element: str
+    defense: int
+
+
+class CombatEventColumns(BaseModel):
+    """Equal-length columns; see app.services.combat_replay for the encoding"""
+    type: List[int] = Field(..., max_length=MAX_EVENTS)
+    turn: List[int] = Field(..., max_length=MAX_EVENTS)
+    t: List[int] = Field(..., max_length=MAX_EVENTS)
+    skill: List[int] = Field(..., max_length=MAX_EVENTS)
+    target: List[int] = Field(..., max_length=MAX_EVENTS)
+    damage: List[float] = Field(..., max_length=MAX_EVENTS)
+
+
+class CombatSubmission(BaseModel):
+    client_log_id: str = Field(..., min_length=8, max_length=64)  # Retries with the same id are rejected
+    world_tier: int = Field(..., ge=1, le=5)
+    stage: int = Field(..., ge=1, le=5)
+    victory: bool
+    seed: int
+    turns_played: int = Field(..., ge=0)
+    duration_ms: int = Field(..., ge=0)
+    skills: List[str] = Field(default_factory=list, max_length=16)  # Indexed by events.skill
+    targets: List[CombatTarget] = Field(default_factory=list, max_length=32)  # Indexed by events.target
+    events: CombatEventColumns
+
+
+class CombatResultResponse(BaseModel):
+    id: int
+    xp_awarded: int
+    points_awarded: int
+    total_damage_dealt: float
+    total_damage_taken: float
+    verification: str
+
+
+# ── Routes ──
+
+@router.post(
+    "/results",
+    response_model=CombatResultResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(combat_rate_limit)],
+)
+async def submit_combat_result(
+    request: CombatSubmission,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Record a fight; rewards and skill stats are computed from the events, not the client's totals"""
+    if request.world_tier > current_user.world_tier:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="World not unlocked")
+
+    events = request.events.model_dump()
+    try:
+        event_count = validate_columns(events, len(request.skills), len(request.targets))
+    except CombatLogError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    summary = summarize(events)
+    if summary["victory"] is not None and summary["victory"] != request.victory:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Outcome does not match the victory/defeat event"
+        )
+
+    skills = await known_skills(db, current_user.id, request.skills)
+    skill_pks = {idx: skills[sid]["pk"] for idx, sid in enumerate(request.skills) if sid in skills}
+
+    try:
+        result = await ingest_combat(
+            db,
+            current_user.id,
+            client_log_id=request.client_log_id,
+            world_tier=request.world_tier,
+            stage=request.stage,
+            victory=request.victory,
+            seed=request.seed,
+            turns_played=request.turns_played,
+            duration_ms=request.duration_ms,
+            events=events,
+            event_count=event_count,
+            summary=summary,
+            skill_pks=skill_pks,
+        )
+    except DuplicateCombatLog:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Combat result already submitted")
+
+    if result["sampled"]:
+        schedule_replay(
+            result["id"],
+            current_user.id,
+            {
+                "world_tier": request.world_tier,
+                "events": events,
+                "targets": [t.model_dump() for t in request.targets],
+                "skills": {idx: skills[sid] for idx, sid in enumerate(request.skills) if sid in skills},
+            },
+            result["xp_awarded"],
+            result["points_awarded"],
+            result["stats"],
+        )
+
+    return json_response(
+        {k: result[k] for k in CombatResultResponse.model_fields},
+        status_code=status.HTTP_201_CREATED,
+    )
@@ -1,9 +1,21 @@
 import os
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel, HttpUrl
 
-from app.services.llm_compiler import LLMCompiler
+from app.services.llm_compiler import TokenUsage, get_compiler, estimate_tokens
+from app.services.rate_limit import compile_rate_limit, enforce_llm_budget, token_user_id
+from app.services.compile_jobs import (
+    COMPILE_CALLBACKS_ENABLED,
+    CallbackURLError,
+    CompileJob,
+    QueueFullError,
+    get_job_backend,
+    resolve_callback,
+    submit,
+)
+from app.api.responses import json_response
+from app.services.resilience import CircuitOpenError
 
 router = APIRouter(prefix="/api", tags=["compile"])
 
@@ -18,17 +30,36 @@ class CompileResponse(BaseModel):
     success: bool
     blueprint: dict | None = None
     error: str | None = None
+    usage: dict | None = None  # tokens billed for this compile (TokenUsage)
 
 
-@router.post("/compile", response_model=CompileResponse)
+class CompileJobRequest(CompileRequest):
+    callback_url: HttpUrl | None = None  # POSTed the job on completion (if enabled)
+
+
+class CompileJobResponse(BaseModel):
+    id: str
+    status: str
+    priority: int
+    result: dict | None = None
+    error: str | None = None
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+
+
+@router.post("/compile", response_model=CompileResponse, dependencies=[Depends(compile_rate_limit)])
 async def compile_skill(req: CompileRequest):
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not set")
 
+    await enforce_llm_budget(estimate_tokens(req.user_input))
+
+    usage = TokenUsage()
     try:
-        compiler = LLMCompiler(api_key)
-        llm_output = await compiler.compile(req.user_input)
+        compiler = get_compiler(api_key)
+        llm_output = await compiler.compile(req.user_input, usage)
 
         return CompileResponse(
             success=True,
@@ -37,6 +68,67 @@ async def compile_skill(req: CompileRequest):
                 "world_tier": req.world_tier,
                 "extra_vfx_budget": req.extra_vfx_budget,
             },
+            usage=usage.as_dict(),
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
         )
     except Exception as e:
-        return CompileResponse(success=False, error=str(e))
+        return CompileResponse(success=False, error=str(e), usage=usage.as_dict())
+
+
+@router.post(
+    "/compile/jobs",
+    response_model=CompileJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(compile_rate_limit)],
+)
+async def create_compile_job(req: CompileJobRequest, request: Request):
+    """Queue a compile and return immediately; poll GET /api/compile/jobs/{id}"""
+    await enforce_llm_budget(estimate_tokens(req.user_input))
+    if req.callback_url and COMPILE_CALLBACKS_ENABLED:
+        try:
+            await resolve_callback(str(req.callback_url))  # checked again when the callback is sent
+        except CallbackURLError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    job = CompileJob(
+        user_input=req.user_input,
+        world_tier=req.world_tier,
+        extra_vfx_budget=req.extra_vfx_budget,
+        owner_id=token_user_id(request),
+        callback_url=str(req.callback_url) if req.callback_url else None,
+    )
+    try:
+        depth = await submit(job)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+
+    return json_response(
+        job.public(),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/api/compile/jobs/{job.id}", "X-Queue-Depth": str(depth)},
+    )
+
+
+@router.get("/compile/jobs/{job_id}", response_model=CompileJobResponse)
+async def get_compile_job(
+    job_id: str,
+    request: Request,
+    wait: float = Query(0, ge=0, le=30, description="Long-poll up to this many seconds"),
+):
+    """Job status/result; with ?wait=N blocks until the job finishes or N seconds pass"""
+    backend = get_job_backend()
+    job = await (backend.wait(job_id, wait) if wait else backend.get(job_id))
+
+    if job is None or (job.owner_id is not None and job.owner_id != token_user_id(request)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return json_response(job.public())
@@ -0,0 +1,43 @@
+"""
+Health API routes - liveness and readiness probes
+"""
+from fastapi import APIRouter, status
+
+from app.api.responses import json_response
+from app.services.health import readiness
+from app.services.startup_profile import PROFILE
+
+router = APIRouter(tags=["health"])
+
+SERVICE = {"service": "runesmith-api", "version": "0.1.1"}
+
+
+@router.get("/health/live")
+async def liveness():
+    """Process is up and the event loop is serving requests"""
+    return {"status": "ok", **SERVICE}
+
+
+@router.get("/health/ready")
+async def ready():
+    """Ready to take traffic: DB reachable and pool not saturated (503 otherwise)"""
+    is_ready, report = await readiness()
+    if is_ready:
+        return json_response({**report, **SERVICE})
+    return json_response(
+        {**report, **SERVICE},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.get("/health/startup")
+async def startup():
+    """Boot phase timings of this worker process"""
+    return {**PROFILE.report(), **SERVICE}
+
+
+@router.get("/health")
+async def health_check():
+    """Backwards-compatible alias of /health/ready"""
+    return await ready()
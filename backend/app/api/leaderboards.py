@@ -0,0 +1,187 @@
+"""
+Leaderboard API routes - paginated reads from the incrementally maintained boards
+
+A page is one range read on the board (O(log n + limit)) plus one IN query
+to hydrate the members; nothing here scans or groups the source tables.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional, List
+
+from app.database.session import get_db
+from app.models import User, Skill, MarketListing
+from app.api.market import MarketListingResponse
+from app.api.responses import json_response, listing_rows, LISTING_COLUMNS, SKILL_COLUMNS
+from app.services import leaderboards
+from app.services.leaderboards import LEADERBOARD_SIZE
+from app.services.skill_enums import MATERIALS
+
+router = APIRouter(prefix="/api/leaderboards", tags=["leaderboards"])
+
+MATERIAL_PATTERN = "^(" + "|".join(MATERIALS) + ")$"
+
+
+# ── Schemas ──
+
+class LeaderboardSkill(BaseModel):
+    id: int
+    skill_id: str
+    name: str
+    world_tier: int
+    material: Optional[str]
+    combat_budget: float
+    combat_budget_max: float
+    owner_username: str
+
+
+class SkillEntry(BaseModel):
+    rank: int
+    score: float
+    skill: LeaderboardSkill
+
+
+class ListingEntry(BaseModel):
+    rank: int
+    score: float
+    listing: MarketListingResponse
+
+
+class SellerEntry(BaseModel):
+    rank: int
+    score: float
+    seller_id: int
+    username: str
+
+
+class SkillLeaderboardResponse(BaseModel):
+    board: str
+    total: int
+    entries: List[SkillEntry]
+
+
+class ListingLeaderboardResponse(BaseModel):
+    board: str
+    total: int
+    entries: List[ListingEntry]
+
+
+class SellerLeaderboardResponse(BaseModel):
+    board: str
+    total: int
+    entries: List[SellerEntry]
+
+
+# ── Helpers ──
+
+async def _page(board: str, offset: int, limit: int) -> tuple[int, list[tuple[int, str, float]]]:
+    """(total, [(rank, member, score)]) - ranks are 1-based; reads stop at LEADERBOARD_SIZE"""
+    backend = leaderboards.get_leaderboards()
+    limit = max(0, min(limit, LEADERBOARD_SIZE - offset))
+    rows = await backend.page(board, offset, limit) if limit else []
+    return await backend.size(board), [(offset + i + 1, member, score) for i, (member, score) in enumerate(rows)]
+
+
+def _ranked(entries: list[tuple[int, str, float]], found: dict[int, dict], key: str) -> list[dict]:
+    """Entries whose member still exists; members deleted since the last rebuild are skipped"""
+    return [
+        {"rank": rank, "score": score, key: found[int(member)]}
+        for rank, member, score in entries
+        if int(member) in found
+    ]
+
+
+# ── Routes ──
+
+@router.get("/skills", response_model=SkillLeaderboardResponse)
+async def skill_leaderboard(
+    world_tier: int = Query(..., ge=1, le=5),
+    material: Optional[str] = Query(None, regex=MATERIAL_PATTERN),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Strongest saved skills by combat budget efficiency, per world (and element)"""
+    board = leaderboards.skill_board(world_tier, material)
+    total, entries = await _page(board, offset, limit)
+
+    found = {}
+    if entries:
+        result = await db.execute(
+            select(
+                Skill.id, Skill.skill_id, Skill.name, Skill.world_tier, Skill.vfx,
+                Skill.combat_budget, Skill.combat_budget_max, User.username,
+            )
+            .join(User, Skill.owner_id == User.id)
+            .where(Skill.id.in_([int(member) for _, member, _ in entries]))
+        )
+        found = {
+            r.id: {
+                "id": r.id,
+                "skill_id": r.skill_id,
+                "name": r.name,
+                "world_tier": r.world_tier,
+                "material": (r.vfx or {}).get("material"),
+                "combat_budget": r.combat_budget,
+                "combat_budget_max": r.combat_budget_max,
+                "owner_username": r.username,
+            }
+            for r in result
+        }
+
+    return json_response({"board": board, "total": total, "entries": _ranked(entries, found, "skill")})
+
+
+@router.get("/listings", response_model=ListingLeaderboardResponse)
+async def listing_leaderboard(
+    world_tier: int = Query(..., ge=1, le=5),
+    material: Optional[str] = Query(None, regex=MATERIAL_PATTERN),
+    by: str = Query("sales", regex="^(sales|rating)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Active listings by purchases or Bayesian rating, per world (and element)"""
+    board = leaderboards.listing_board(by, world_tier, material)
+    total, entries = await _page(board, offset, limit)
+
+    found = {}
+    if entries:
+        result = await db.execute(
+            select(*LISTING_COLUMNS, *SKILL_COLUMNS, User.username.label("seller_username"))
+            .join(Skill, MarketListing.skill_id == Skill.id)
+            .join(User, MarketListing.seller_id == User.id)
+            .where(MarketListing.id.in_([int(member) for _, member, _ in entries]))
+        )
+        found = {listing["id"]: listing for listing in listing_rows(result.all())}
+
+    return json_response({"board": board, "total": total, "entries": _ranked(entries, found, "listing")})
+
+
+@router.get("/sellers", response_model=SellerLeaderboardResponse)
+async def seller_leaderboard(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Top sellers by total sales"""
+    board = leaderboards.SELLERS_BOARD
+    total, entries = await _page(board, offset, limit)
+
+    found = {}
+    if entries:
+        result = await db.execute(
+            select(User.id, User.username).where(User.id.in_([int(member) for _, member, _ in entries]))
+        )
+        found = {r.id: r.username for r in result}
+
+    return json_response({
+        "board": board,
+        "total": total,
+        "entries": [
+            {"rank": rank, "score": score, "seller_id": int(member), "username": found[int(member)]}
+            for rank, member, score in entries
+            if int(member) in found
+        ],
+    })
@@ -1,17 +1,49 @@
 """
 Market API routes for skill marketplace
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from pydantic import BaseModel
+from sqlalchemy import select, update, and_, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 from app.database.session import get_db
-from app.models import User, Skill, MarketListing, Transaction, ListingStatus, TransactionType
+from app.models import (
+    User,
+    Skill,
+    MarketListing,
+    Transaction,
+    SkillRating,
+    ListingStatus,
+    TransactionType,
+    RATING_PRIOR_MEAN,
+    RATING_PRIOR_WEIGHT,
+    LISTING_TTL_DAYS,
+)
 from app.api.auth import get_current_user
+from app.api.responses import (
+    json_response,
+    skill_dict,
+    listing_dict,
+    listing_rows,
+    LISTING_COLUMNS,
+    SKILL_COLUMNS,
+    LISTING_FINGERPRINT,
+    PUBLIC_LIST_CACHE,
+    PRIVATE_LIST_CACHE,
+    cached_json,
+    rows_etag,
+    version_etag,
+    if_match_version,
+)
+from app.services.analytics import record_listing_event, seller_analytics
+from app.services.ledger import purchase_history, CursorError
+from app.services import leaderboards
+from app.services.view_counts import record_view
+from app.services.rate_limit import market_write_rate_limit
 
 router = APIRouter(prefix="/api/market", tags=["market"])
 
@@ -24,13 +56,17 @@ class ListSkillRequest(BaseModel):
     currency_type: str = "points"  # "points" or "rune_crystals"
 
 
+class RelistRequest(BaseModel):
+    price: Optional[int] = Field(None, gt=0)
+
+
 class BuySkillRequest(BaseModel):
     listing_id: int
 
 
 class RateSkillRequest(BaseModel):
     listing_id: int
-    rating: float  # 1.0 to 5.0
+    rating: float = Field(..., ge=1.0, le=5.0)
 
 
 class SkillResponse(BaseModel):
@@ -44,6 +80,8 @@ class SkillResponse(BaseModel):
     vfx: dict
     stats: dict
     times_used: int
+    vfx_bundle: Optional[str] = None  # GET /api/vfx/bundles/{vfx_bundle}
+    version: int
 
 
 class MarketListingResponse(BaseModel):
@@ -59,6 +97,7 @@ class MarketListingResponse(BaseModel):
     average_rating: float
     rating_count: int
     created_at: datetime
+    version: int  # send back as If-Match: "v<version>" on buy/cancel/relist
 
 
 class PurchasedSkillResponse(BaseModel):
@@ -69,9 +108,111 @@ class PurchasedSkillResponse(BaseModel):
     purchased_at: datetime
 
 
+class PurchaseHistoryItem(BaseModel):
+    transaction_id: int
+    listing_id: int
+    amount: int
+    currency_type: str
+    purchased_at: datetime
+    skill_id: Optional[str]  # buyer's copy; None if it was deleted
+    skill_name: Optional[str]
+    world_tier: Optional[int]
+
+
+class PurchaseHistoryResponse(BaseModel):
+    items: List[PurchaseHistoryItem]
+    next_cursor: Optional[str]  # pass as ?cursor= for the next (older) page; None at the end
+
+
+class RatingResponse(BaseModel):
+    listing_id: int
+    average_rating: float
+    bayesian_rating: float
+    rating_count: int
+
+
+class AnalyticsSummary(BaseModel):
+    sales: int
+    revenue_points: int
+    revenue_crystals: int
+    views: int
+    conversion: float
+    average_rating: float
+    rating_count: int
+
+
+class AnalyticsDay(BaseModel):
+    date: str
+    sales: int
+    revenue_points: int
+    revenue_crystals: int
+    views: int
+
+
+class ListingAnalytics(AnalyticsSummary):
+    listing_id: int
+    sales_per_day: float
+
+
+class SellerAnalyticsResponse(BaseModel):
+    seller_id: int
+    totals: AnalyticsSummary
+    daily: List[AnalyticsDay]
+    listings: List[ListingAnalytics]
+
+
+# ── Helpers ──
+
+async def _listing_payload(db: AsyncSession, listing_id: int) -> Optional[dict]:
+    """MarketListingResponse dict for one listing, straight from a Row (None if it does not exist)"""
+    result = await db.execute(
+        select(*LISTING_COLUMNS, *SKILL_COLUMNS, User.username.label("seller_username")).join(
+            Skill, MarketListing.skill_id == Skill.id
+        ).join(
+            User, MarketListing.seller_id == User.id
+        ).where(
+            MarketListing.id == listing_id
+        )
+    )
+    rows = listing_rows(result.all())
+    return rows[0] if rows else None
+
+
+def _listing_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(days=LISTING_TTL_DAYS)
+
+
+async def _offer_conflict(db: AsyncSession, listing_id: int, expected: Optional[int], detail: str) -> HTTPException:
+    """
+    Error for a conditional listing UPDATE that matched no row.
+
+    Only this failure path pays the extra lookup: 412 when the row is there
+    but at another version than If-Match named, else 400 with `detail`.
+    """
+    await db.rollback()
+    if expected is not None:
+        result = await db.execute(select(MarketListing.version).where(MarketListing.id == listing_id))
+        current = result.scalar_one_or_none()
+        if current is not None and current != expected:
+            return HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"Listing changed (now {version_etag(current)})",
+            )
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _skill_material(skill: Skill) -> Optional[str]:
+    return (skill.vfx or {}).get("material")
+
+
 # ── Routes ──
 
-@router.post("/list", response_model=MarketListingResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/list",
+    response_model=MarketListingResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(market_write_rate_limit)],
+)
 async def list_skill(
     request: ListSkillRequest,
     current_user: User = Depends(get_current_user),
@@ -79,6 +220,12 @@ async def list_skill(
 ):
     """List a skill for sale on the marketplace"""
 
+    if request.price <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Price must be positive"
+        )
+
     # Find user's skill
     result = await db.execute(
         select(Skill).where(
@@ -96,63 +243,36 @@ async def list_skill(
             detail="Skill not found or you don't own this skill"
         )
 
-    # Check if already listed
+    # One listing per skill is enforced by the unique index on skill_id, not a pre-check
     result = await db.execute(
-        select(MarketListing).where(MarketListing.skill_id == skill.id)
-    )
-    existing_listing = result.scalar_one_or_none()
-
-    if existing_listing and existing_listing.status == ListingStatus.ACTIVE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Skill is already listed"
+        pg_insert(MarketListing)
+        .values(
+            skill_id=skill.id,
+            seller_id=current_user.id,
+            price=request.price,
+            currency_type=request.currency_type,
+            status=ListingStatus.ACTIVE,
+            expires_at=_listing_expiry(),
         )
-
-    # Validate price
-    if request.price <= 0:
+        .on_conflict_do_nothing(index_elements=["skill_id"])
+        .returning(MarketListing)
+    )
+    listing = result.scalar_one_or_none()
+    if listing is None:
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Price must be positive"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Skill already has a listing; relist it if cancelled or expired"
         )
-
-    # Create listing
-    listing = MarketListing(
-        skill_id=skill.id,
-        seller_id=current_user.id,
-        price=request.price,
-        currency_type=request.currency_type,
-        status=ListingStatus.ACTIVE,
+    await db.commit()
+    await leaderboards.record_listing(
+        listing.id, skill.world_tier, _skill_material(skill), listing.purchases, listing.bayesian_rating
     )
 
-    db.add(listing)
-    await db.commit()
-    await db.refresh(listing)
-
-    # Build response
-    return MarketListingResponse(
-        id=listing.id,
-        skill=SkillResponse(
-            id=skill.id,
-            skill_id=skill.skill_id,
-            name=skill.name,
-            world_tier=skill.world_tier,
-            combat_budget=skill.combat_budget,
-            vfx_budget=skill.vfx_budget,
-            mechanics=skill.mechanics,
-            vfx=skill.vfx,
-            stats=skill.stats,
-            times_used=skill.times_used,
-        ),
-        seller_username=current_user.username,
-        seller_id=current_user.id,
-        price=listing.price,
-        currency_type=listing.currency_type,
-        status=listing.status.value,
-        views=listing.views,
-        purchases=listing.purchases,
-        average_rating=listing.average_rating,
-        rating_count=listing.rating_count,
-        created_at=listing.created_at,
+    return json_response(
+        listing_dict(listing, skill, current_user.username),
+        status_code=status.HTTP_201_CREATED,
+        headers={"ETag": version_etag(listing.version)},
     )
 
 
@@ -163,12 +283,13 @@ async def browse_market(
     sort_by: str = Query("popular", regex="^(popular|newest|rating|price_asc|price_desc)$"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Browse marketplace listings with filters"""
+    """Browse marketplace listings with filters; revalidates against a weak ETag of the page's rows"""
 
-    # Base query
-    query = select(MarketListing, Skill, User).join(
+    # Base query (plain columns - rows are serialized without ORM instances)
+    query = select(*LISTING_COLUMNS, *SKILL_COLUMNS, User.username.label("seller_username")).join(
         Skill, MarketListing.skill_id == Skill.id
     ).join(
         User, MarketListing.seller_id == User.id
@@ -190,9 +311,7 @@ async def browse_market(
     elif sort_by == "newest":
         query = query.order_by(MarketListing.created_at.desc())
     elif sort_by == "rating":
-        query = query.order_by(
-            (MarketListing.total_rating / func.greatest(MarketListing.rating_count, 1)).desc()
-        )
+        query = query.order_by(MarketListing.bayesian_rating.desc())
     elif sort_by == "price_asc":
         query = query.order_by(MarketListing.price.asc())
     elif sort_by == "price_desc":
@@ -202,48 +321,22 @@ async def browse_market(
     query = query.limit(limit).offset(offset)
 
     # Execute
-    result = await db.execute(query)
-    rows = result.all()
+    rows = (await db.execute(query)).all()
 
-    # Build response
-    listings = []
-    for listing, skill, seller in rows:
-        listings.append(MarketListingResponse(
-            id=listing.id,
-            skill=SkillResponse(
-                id=skill.id,
-                skill_id=skill.skill_id,
-                name=skill.name,
-                world_tier=skill.world_tier,
-                combat_budget=skill.combat_budget,
-                vfx_budget=skill.vfx_budget,
-                mechanics=skill.mechanics,
-                vfx=skill.vfx,
-                stats=skill.stats,
-                times_used=skill.times_used,
-            ),
-            seller_username=seller.username,
-            seller_id=seller.id,
-            price=listing.price,
-            currency_type=listing.currency_type,
-            status=listing.status.value,
-            views=listing.views,
-            purchases=listing.purchases,
-            average_rating=listing.average_rating,
-            rating_count=listing.rating_count,
-            created_at=listing.created_at,
-        ))
-
-    return listings
-
-
-@router.post("/buy", response_model=PurchasedSkillResponse)
+    return cached_json(
+        lambda: listing_rows(rows), rows_etag(rows, LISTING_FINGERPRINT), PUBLIC_LIST_CACHE, if_none_match
+    )
+
+
+@router.post("/buy", response_model=PurchasedSkillResponse, dependencies=[Depends(market_write_rate_limit)])
 async def buy_skill(
     request: BuySkillRequest,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Purchase a skill from the marketplace"""
+    """Purchase a skill from the marketplace; If-Match pins the price/status the buyer saw"""
+    expected = if_match_version(if_match)
 
     # Get listing with skill
     result = await db.execute(
@@ -263,6 +356,12 @@ async def buy_skill(
 
     listing, original_skill = row
 
+    if expected is not None and listing.version != expected:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Listing changed (now {version_etag(listing.version)})"
+        )
+
     # Check if listing is active
     if listing.status != ListingStatus.ACTIVE:
         raise HTTPException(
@@ -315,6 +414,7 @@ async def buy_skill(
         mechanics=original_skill.mechanics,
         vfx=original_skill.vfx,
         stats=original_skill.stats,
+        vfx_bundle=original_skill.vfx_bundle,
     )
 
     db.add(copied_skill)
@@ -350,43 +450,230 @@ async def buy_skill(
 
     db.add(transaction)
 
-    # Update listing stats
-    listing.purchases += 1
+    # Count the sale only if the offer is still the one read above: a concurrent
+    # cancel or reprice bumps the version and this purchase rolls back
+    result = await db.execute(
+        update(MarketListing)
+        .where(
+            MarketListing.id == listing.id,
+            MarketListing.status == ListingStatus.ACTIVE,
+            MarketListing.version == listing.version,
+        )
+        .values(purchases=MarketListing.purchases + 1)
+        .returning(MarketListing.purchases)
+        .execution_options(synchronize_session=False)
+    )
+    purchases = result.scalar_one_or_none()
+    if purchases is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED if expected is not None else status.HTTP_409_CONFLICT,
+            detail="Listing changed during purchase"
+        )
+    await record_listing_event(
+        db, listing.id, listing.seller_id,
+        sales=1,
+        revenue_points=listing.price if listing.currency_type == "points" else 0,
+        revenue_crystals=listing.price if listing.currency_type == "rune_crystals" else 0,
+    )
 
     await db.commit()
     await db.refresh(copied_skill)
     await db.refresh(transaction)
+    await leaderboards.record_sale(
+        listing.id, listing.seller_id, original_skill.world_tier, _skill_material(original_skill), purchases
+    )
 
     # Return purchased skill
-    return PurchasedSkillResponse(
-        transaction_id=transaction.id,
-        skill=SkillResponse(
-            id=copied_skill.id,
-            skill_id=copied_skill.skill_id,
-            name=copied_skill.name,
-            world_tier=copied_skill.world_tier,
-            combat_budget=copied_skill.combat_budget,
-            vfx_budget=copied_skill.vfx_budget,
-            mechanics=copied_skill.mechanics,
-            vfx=copied_skill.vfx,
-            stats=copied_skill.stats,
-            times_used=copied_skill.times_used,
-        ),
-        amount_paid=transaction.amount,
-        currency_type=transaction.currency_type,
-        purchased_at=transaction.created_at,
+    return json_response({
+        "transaction_id": transaction.id,
+        "skill": skill_dict(copied_skill),
+        "amount_paid": transaction.amount,
+        "currency_type": transaction.currency_type,
+        "purchased_at": transaction.created_at,
+    })
+
+
+@router.post("/rate", response_model=RatingResponse, dependencies=[Depends(market_write_rate_limit)])
+async def rate_skill(
+    request: RateSkillRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Rate a purchased listing (once per buyer)"""
+
+    # Only buyers of the listing may rate it
+    result = await db.execute(
+        select(Transaction.id).where(
+            Transaction.listing_id == request.listing_id,
+            Transaction.buyer_id == current_user.id,
+            Transaction.is_successful.is_(True),
+        ).limit(1)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only buyers can rate this skill"
+        )
+
+    # Uniqueness is enforced by uq_skill_ratings_listing_buyer, not a pre-check
+    result = await db.execute(
+        pg_insert(SkillRating)
+        .values(listing_id=request.listing_id, buyer_id=current_user.id, rating=request.rating)
+        .on_conflict_do_nothing(constraint="uq_skill_ratings_listing_buyer")
+        .returning(SkillRating.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You already rated this skill"
+        )
+
+    # Atomic aggregate update; the Bayesian average is derived from the new totals in the same statement
+    result = await db.execute(
+        update(MarketListing)
+        .where(MarketListing.id == request.listing_id)
+        .values(
+            total_rating=MarketListing.total_rating + request.rating,
+            rating_count=MarketListing.rating_count + 1,
+            bayesian_rating=(
+                RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT + MarketListing.total_rating + request.rating
+            ) / (RATING_PRIOR_WEIGHT + MarketListing.rating_count + 1),
+        )
+        .returning(
+            MarketListing.seller_id,
+            MarketListing.total_rating,
+            MarketListing.rating_count,
+            MarketListing.bayesian_rating,
+            MarketListing.status,
+            leaderboards.LISTING_TIER,
+            leaderboards.LISTING_MATERIAL,
+        )
+    )
+    seller_id, total_rating, rating_count, bayesian_rating, listing_status, world_tier, material = result.one()
+
+    await record_listing_event(
+        db, request.listing_id, seller_id,
+        rating_sum=request.rating, rating_count=1,
+    )
+    await db.commit()
+    if listing_status == ListingStatus.ACTIVE:
+        await leaderboards.record_rating(request.listing_id, world_tier, material, bayesian_rating)
+
+    return json_response({
+        "listing_id": request.listing_id,
+        "average_rating": total_rating / rating_count,
+        "bayesian_rating": bayesian_rating,
+        "rating_count": rating_count,
+    })
+
+
+@router.post(
+    "/listings/{listing_id}/cancel",
+    response_model=MarketListingResponse,
+    dependencies=[Depends(market_write_rate_limit)],
+)
+async def cancel_listing(
+    listing_id: int,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Take an active listing off the market"""
+    expected = if_match_version(if_match)
+
+    conditions = [
+        MarketListing.id == listing_id,
+        MarketListing.seller_id == current_user.id,
+        MarketListing.status == ListingStatus.ACTIVE,
+    ]
+    if expected is not None:
+        conditions.append(MarketListing.version == expected)
+    result = await db.execute(
+        update(MarketListing)
+        .where(*conditions)
+        .values(
+            status=ListingStatus.CANCELLED,
+            expires_at=None,
+            updated_at=datetime.utcnow(),
+            version=MarketListing.version + 1,
+        )
+        .returning(leaderboards.LISTING_TIER, leaderboards.LISTING_MATERIAL)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise await _offer_conflict(db, listing_id, expected, "Listing not found or not active")
+    await db.commit()
+    await leaderboards.remove_listing(listing_id, *row)
+
+    payload = await _listing_payload(db, listing_id)
+    return json_response(payload, headers={"ETag": version_etag(payload["version"])})
+
+
+@router.post(
+    "/listings/{listing_id}/relist",
+    response_model=MarketListingResponse,
+    dependencies=[Depends(market_write_rate_limit)],
+)
+async def relist_listing(
+    listing_id: int,
+    request: RelistRequest,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Put a cancelled or expired listing back on the market"""
+    expected = if_match_version(if_match)
+
+    values = {
+        "status": ListingStatus.ACTIVE,
+        "expires_at": _listing_expiry(),
+        "updated_at": datetime.utcnow(),
+        "version": MarketListing.version + 1,
+    }
+    if request.price is not None:
+        values["price"] = request.price
+
+    conditions = [
+        MarketListing.id == listing_id,
+        MarketListing.seller_id == current_user.id,
+        MarketListing.status.in_([ListingStatus.CANCELLED, ListingStatus.EXPIRED]),
+    ]
+    if expected is not None:
+        conditions.append(MarketListing.version == expected)
+    result = await db.execute(
+        update(MarketListing)
+        .where(*conditions)
+        .values(**values)
+        .returning(
+            leaderboards.LISTING_TIER,
+            leaderboards.LISTING_MATERIAL,
+            MarketListing.purchases,
+            MarketListing.bayesian_rating,
+        )
     )
+    row = result.one_or_none()
+    if row is None:
+        raise await _offer_conflict(db, listing_id, expected, "Listing not found or not cancelled/expired")
+    await db.commit()
+    await leaderboards.record_listing(listing_id, *row)
+
+    payload = await _listing_payload(db, listing_id)
+    return json_response(payload, headers={"ETag": version_etag(payload["version"])})
 
 
 @router.get("/my-listings", response_model=List[MarketListingResponse])
 async def get_my_listings(
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get current user's market listings"""
 
     result = await db.execute(
-        select(MarketListing, Skill).join(
+        select(
+            *LISTING_COLUMNS, *SKILL_COLUMNS, literal(current_user.username).label("seller_username")
+        ).join(
             Skill, MarketListing.skill_id == Skill.id
         ).where(
             MarketListing.seller_id == current_user.id
@@ -394,35 +681,68 @@ async def get_my_listings(
             MarketListing.created_at.desc()
         )
     )
-
     rows = result.all()
 
-    listings = []
-    for listing, skill in rows:
-        listings.append(MarketListingResponse(
-            id=listing.id,
-            skill=SkillResponse(
-                id=skill.id,
-                skill_id=skill.skill_id,
-                name=skill.name,
-                world_tier=skill.world_tier,
-                combat_budget=skill.combat_budget,
-                vfx_budget=skill.vfx_budget,
-                mechanics=skill.mechanics,
-                vfx=skill.vfx,
-                stats=skill.stats,
-                times_used=skill.times_used,
-            ),
-            seller_username=current_user.username,
-            seller_id=current_user.id,
-            price=listing.price,
-            currency_type=listing.currency_type,
-            status=listing.status.value,
-            views=listing.views,
-            purchases=listing.purchases,
-            average_rating=listing.average_rating,
-            rating_count=listing.rating_count,
-            created_at=listing.created_at,
-        ))
-
-    return listings
+    return cached_json(
+        lambda: listing_rows(rows), rows_etag(rows, LISTING_FINGERPRINT), PRIVATE_LIST_CACHE, if_none_match
+    )
+
+
+@router.get("/purchases", response_model=PurchaseHistoryResponse)
+async def get_purchase_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """The current user's purchases, newest first, paginated by keyset cursor"""
+    try:
+        rows, next_cursor = await purchase_history(db, current_user.id, limit, cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return json_response({
+        "items": [
+            {
+                "transaction_id": r.id,
+                "listing_id": r.listing_id,
+                "amount": r.amount,
+                "currency_type": r.currency_type,
+                "purchased_at": r.created_at,
+                "skill_id": r.skill_id,
+                "skill_name": r.name,
+                "world_tier": r.world_tier,
+            }
+            for r in rows
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/listings/{listing_id}", response_model=MarketListingResponse)
+async def get_listing(
+    listing_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a single listing and count the view (buffered, see app.services.view_counts)"""
+
+    payload = await _listing_payload(db, listing_id)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Listing not found"
+        )
+    record_view(listing_id)
+    return json_response(payload, headers={"ETag": version_etag(payload["version"])})
+
+
+@router.get("/analytics", response_model=SellerAnalyticsResponse)
+async def get_analytics(
+    days: int = Query(30, ge=1, le=90),
+    listing_limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Seller dashboard: revenue, sales per day, rating and conversion from rollups"""
+
+    return json_response(await seller_analytics(db, current_user.id, days=days, listing_limit=listing_limit))
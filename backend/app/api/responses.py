@@ -0,0 +1,233 @@
+"""
+Shared response layer - builds plain dicts from ORM objects / Rows and
+encodes them to JSON bytes without constructing intermediate Pydantic models.
+
+Routes keep their `response_model` for the OpenAPI schema but return
+`json_response(...)` directly, which FastAPI passes through untouched.
+"""
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+import hashlib
+import json
+import os
+
+from fastapi import Response
+
+from app.models import Skill, MarketListing, User
+from app.services.compression import etag_matches, NOT_MODIFIED
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+BROWSE_CACHE_MAX_AGE = int(os.getenv("BROWSE_CACHE_MAX_AGE", "15"))
+BROWSE_STALE_WHILE_REVALIDATE = int(os.getenv("BROWSE_STALE_WHILE_REVALIDATE", "60"))
+
+# Anonymous browse pages are the same for everyone, so shared caches may hold them briefly
+PUBLIC_LIST_CACHE = f"public, max-age={BROWSE_CACHE_MAX_AGE}, stale-while-revalidate={BROWSE_STALE_WHILE_REVALIDATE}"
+# Per-user lists: never shared, always revalidated (cheap with the weak ETag)
+PRIVATE_LIST_CACHE = "private, no-cache"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "value"):  # str enums
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    """Wrap already-serializable content in a FastJSONResponse"""
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+# ── Column sets for Row-based queries ──
+
+SKILL_COLUMNS = (
+    Skill.id.label("skill_pk"),
+    Skill.skill_id,
+    Skill.name,
+    Skill.world_tier,
+    Skill.combat_budget,
+    Skill.vfx_budget,
+    Skill.mechanics,
+    Skill.vfx,
+    Skill.stats,
+    Skill.times_used,
+    Skill.vfx_bundle,
+    Skill.version.label("skill_version"),
+)
+
+LISTING_COLUMNS = (
+    MarketListing.id,
+    MarketListing.seller_id,
+    MarketListing.price,
+    MarketListing.currency_type,
+    MarketListing.status,
+    MarketListing.views,
+    MarketListing.purchases,
+    MarketListing.total_rating,
+    MarketListing.rating_count,
+    MarketListing.created_at,
+    MarketListing.version,
+)
+
+# Everything a listing row shows that can change without its id changing:
+# the offer (version), the counters, and the embedded skill (skill_version).
+LISTING_FINGERPRINT = (
+    "id", "status", "version", "views", "purchases", "total_rating", "rating_count",
+    "skill_version", "times_used", "vfx_bundle",
+)
+SKILL_FINGERPRINT = ("id", "version", "times_used", "vfx_bundle")
+
+
+# ── Builders ──
+
+def skill_dict(skill: Skill) -> dict:
+    """SkillResponse-shaped dict from a Skill instance"""
+    return {
+        "id": skill.id,
+        "skill_id": skill.skill_id,
+        "name": skill.name,
+        "world_tier": skill.world_tier,
+        "combat_budget": skill.combat_budget,
+        "vfx_budget": skill.vfx_budget,
+        "mechanics": skill.mechanics,
+        "vfx": skill.vfx,
+        "stats": skill.stats,
+        "times_used": skill.times_used,
+        "vfx_bundle": skill.vfx_bundle,
+        "version": skill.version,
+    }
+
+
+def listing_dict(listing: MarketListing, skill: Skill, seller_username: str) -> dict:
+    """MarketListingResponse-shaped dict from ORM instances"""
+    return {
+        "id": listing.id,
+        "skill": skill_dict(skill),
+        "seller_username": seller_username,
+        "seller_id": listing.seller_id,
+        "price": listing.price,
+        "currency_type": listing.currency_type,
+        "status": listing.status.value,
+        "views": listing.views,
+        "purchases": listing.purchases,
+        "average_rating": listing.average_rating,
+        "rating_count": listing.rating_count,
+        "created_at": listing.created_at,
+        "version": listing.version,
+    }
+
+
+def listing_rows(rows: Iterable[Any]) -> list[dict]:
+    """MarketListingResponse-shaped dicts from Rows of LISTING_COLUMNS + SKILL_COLUMNS + seller_username"""
+    out = []
+    append = out.append
+    for r in rows:
+        append({
+            "id": r.id,
+            "skill": {
+                "id": r.skill_pk,
+                "skill_id": r.skill_id,
+                "name": r.name,
+                "world_tier": r.world_tier,
+                "combat_budget": r.combat_budget,
+                "vfx_budget": r.vfx_budget,
+                "mechanics": r.mechanics,
+                "vfx": r.vfx,
+                "stats": r.stats,
+                "times_used": r.times_used,
+                "vfx_bundle": r.vfx_bundle,
+                "version": r.skill_version,
+            },
+            "seller_username": r.seller_username,
+            "seller_id": r.seller_id,
+            "price": r.price,
+            "currency_type": r.currency_type,
+            "status": r.status.value,
+            "views": r.views,
+            "purchases": r.purchases,
+            "average_rating": r.total_rating / r.rating_count if r.rating_count else 0.0,
+            "rating_count": r.rating_count,
+            "created_at": r.created_at,
+            "version": r.version,
+        })
+    return out
+
+
+def user_dict(user: User) -> dict:
+    """UserResponse-shaped dict from a User instance"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "world_tier": user.world_tier,
+        "player_level": user.player_level,
+        "points": user.points,
+        "rune_crystals": user.rune_crystals,
+    }
+
+
+# ── Conditional requests ──
+
+def version_etag(version: int) -> str:
+    """Strong ETag for a row version (skills.version / market_listings.version)"""
+    return f'"v{version}"'
+
+
+def if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """
+    Row version an If-Match header requires; None when absent or "*".
+
+    Tags that are not ours (or weak) map to 0, which no row carries, so the
+    conditional write fails with 412 as RFC 9110 requires.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith('"v') and tag.endswith('"') and tag[2:-1].isdigit():
+            return int(tag[2:-1])
+    return 0
+
+
+def rows_etag(rows: Iterable[Any], fields: tuple[str, ...], *extra: Any) -> str:
+    """
+    Weak ETag for a list response from a few scalar columns per row.
+
+    Hashing ids, versions and counters costs a fraction of encoding the rows
+    (mechanics / vfx JSON never enters the hash), so a revalidation can be
+    answered before the body is built. `extra` mixes in anything else the
+    body depends on.
+    """
+    h = hashlib.blake2b(repr(extra).encode(), digest_size=12)
+    for row in rows:
+        h.update(repr(tuple(getattr(row, f) for f in fields)).encode())
+    return f'W/"{h.hexdigest()}"'
+
+
+def cached_json(build: Callable[[], Any], etag: str, cache_control: str,
+                if_none_match: Optional[str] = None) -> Response:
+    """304 when the client already has `etag`, otherwise json_response(build()) with validators"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if if_none_match and etag_matches(if_none_match, etag):
+        NOT_MODIFIED.inc("route")
+        return Response(status_code=304, headers=headers)
+    return json_response(build(), headers=headers)
@@ -1,9 +1,10 @@
 """
 Skills API routes - save/load skills to database
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel
 from typing import Optional, List
 import uuid
@@ -11,6 +12,18 @@ import uuid
 from app.database.session import get_db
 from app.models import User, Skill
 from app.api.auth import get_current_user
+from app.api.responses import (
+    json_response,
+    skill_dict,
+    version_etag,
+    cached_json,
+    rows_etag,
+    SKILL_FINGERPRINT,
+    PRIVATE_LIST_CACHE,
+)
+from app.services.blueprint_codec import PackedBlueprint, BlueprintCodecError, MEDIA_TYPE
+from app.services import leaderboards
+from app.services.vfx_prebake import prebake
 
 router = APIRouter(prefix="/api/skills", tags=["skills"])
 
@@ -44,6 +57,8 @@ class SkillResponse(BaseModel):
     vfx: dict
     stats: dict
     times_used: int
+    vfx_bundle: Optional[str] = None  # GET /api/vfx/bundles/{vfx_bundle}
+    version: int
 
 
 # ── Routes ──
@@ -55,50 +70,48 @@ async def save_skill(
     db: AsyncSession = Depends(get_db),
 ):
     """Save a compiled skill to the database"""
-    # Check if skill already saved (idempotent)
-    existing = await db.execute(
-        select(Skill).where(Skill.skill_id == request.skill_id, Skill.owner_id == current_user.id)
+    # skill_id is unique: a duplicate save (or a racing retry) is a conflict, not a pre-check
+    result = await db.execute(
+        pg_insert(Skill)
+        .values(
+            owner_id=current_user.id,
+            skill_id=request.skill_id,
+            name=request.name,
+            user_input=request.user_input,
+            seed=request.seed,
+            world_tier=request.world_tier,
+            combat_budget=request.combat_budget,
+            combat_budget_max=request.combat_budget_max,
+            vfx_budget=request.vfx_budget,
+            vfx_budget_base=request.vfx_budget_base,
+            vfx_budget_paid=request.vfx_budget_paid,
+            mechanics=request.mechanics,
+            vfx=request.vfx,
+            stats=request.stats,
+            vfx_bundle=await prebake(db, request.mechanics, request.vfx, request.vfx_budget),
+        )
+        .on_conflict_do_nothing(index_elements=["skill_id"])
+        .returning(Skill)
     )
-    if existing.scalar_one_or_none():
+    skill = result.scalar_one_or_none()
+    if skill is None:
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Skill already saved")
-
-    skill = Skill(
-        owner_id=current_user.id,
-        skill_id=request.skill_id,
-        name=request.name,
-        user_input=request.user_input,
-        seed=request.seed,
-        world_tier=request.world_tier,
-        combat_budget=request.combat_budget,
-        combat_budget_max=request.combat_budget_max,
-        vfx_budget=request.vfx_budget,
-        vfx_budget_base=request.vfx_budget_base,
-        vfx_budget_paid=request.vfx_budget_paid,
-        mechanics=request.mechanics,
-        vfx=request.vfx,
-        stats=request.stats,
+    await db.commit()
+    await leaderboards.record_skill(
+        skill.id, skill.world_tier, (skill.vfx or {}).get("material"), skill.combat_budget, skill.combat_budget_max
     )
 
-    db.add(skill)
-    await db.commit()
-    await db.refresh(skill)
-
-    return SkillResponse(
-        id=skill.id,
-        skill_id=skill.skill_id,
-        name=skill.name,
-        world_tier=skill.world_tier,
-        combat_budget=skill.combat_budget,
-        vfx_budget=skill.vfx_budget,
-        mechanics=skill.mechanics,
-        vfx=skill.vfx,
-        stats=skill.stats,
-        times_used=skill.times_used,
+    return json_response(
+        skill_dict(skill),
+        status_code=status.HTTP_201_CREATED,
+        headers={"ETag": version_etag(skill.version)},
     )
 
 
 @router.get("/my", response_model=List[SkillResponse])
 async def get_my_skills(
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -108,18 +121,37 @@ async def get_my_skills(
     )
     skills = result.scalars().all()
 
-    return [
-        SkillResponse(
-            id=s.id,
-            skill_id=s.skill_id,
-            name=s.name,
-            world_tier=s.world_tier,
-            combat_budget=s.combat_budget,
-            vfx_budget=s.vfx_budget,
-            mechanics=s.mechanics,
-            vfx=s.vfx,
-            stats=s.stats,
-            times_used=s.times_used,
+    return cached_json(
+        lambda: [skill_dict(s) for s in skills], rows_etag(skills, SKILL_FINGERPRINT),
+        PRIVATE_LIST_CACHE, if_none_match,
+    )
+
+
+@router.get("/{skill_id}/blueprint")
+async def get_skill_blueprint(
+    skill_id: str,
+    accept: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a skill's blueprint, packed when the client accepts application/x-runesmith-blueprint"""
+    result = await db.execute(
+        select(Skill.mechanics, Skill.vfx).where(
+            Skill.skill_id == skill_id, Skill.owner_id == current_user.id
         )
-        for s in skills
-    ]
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+
+    try:
+        packed = PackedBlueprint.from_dict(row.mechanics, row.vfx)
+    except BlueprintCodecError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    headers = {"ETag": f'"{packed.digest()}"', "Vary": "Accept"}
+    if accept and MEDIA_TYPE in accept:
+        return Response(content=packed.to_bytes(), media_type=MEDIA_TYPE, headers=headers)
+
+    mechanics, vfx = packed.to_dict()
+    return json_response({"hash": packed.digest(), "mechanics": mechanics, "vfx": vfx}, headers=headers)
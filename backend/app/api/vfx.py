@@ -0,0 +1,64 @@
+"""
+VFX API routes - prebaked preview bundles addressed by content hash
+
+A bundle URL never changes meaning (the hash is of the body), so responses
+are cacheable forever by browsers and CDNs; market grids fetch the
+`vfx_bundle` of each listing and render without rebuilding blocks or audio.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import get_db
+from app.services.blueprint_codec import BlueprintCodecError
+from app.services.vfx_bundle import bake
+from app.services.vfx_prebake import get_bundle
+
+router = APIRouter(prefix="/api/vfx", tags=["vfx"])
+
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+# ── Schemas ──
+
+class BakeRequest(BaseModel):
+    mechanics: dict
+    vfx: dict
+    vfx_budget: float
+
+
+# ── Routes ──
+
+@router.get("/bundles/{bundle_hash}")
+async def get_vfx_bundle(
+    bundle_hash: str = Path(..., regex="^[0-9a-f]{32}$"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Render-ready bundle: blocks, limits, audio envelope and palette"""
+    etag = f'"{bundle_hash}"'
+    headers = {"ETag": etag, "Cache-Control": _IMMUTABLE_CACHE}
+    # The hash is the content: a matching validator needs no lookup at all
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = await get_bundle(db, bundle_hash)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown VFX bundle")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/bundles/bake")
+async def bake_vfx_bundle(request: BakeRequest):
+    """Bake an unsaved blueprint (Forge preview); the ETag is the hash it will have once saved"""
+    try:
+        digest, body = bake(request.mechanics, request.vfx, request.vfx_budget)
+    except BlueprintCodecError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": f'"{digest}"', "Cache-Control": "no-store"},
+    )
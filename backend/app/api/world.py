@@ -0,0 +1,38 @@
+"""
+World API routes - static affinity / degradation tables for clients and CDNs
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from app.api.responses import dumps
+from app.services.world import WORLD_TABLES, WORLD_TABLES_VERSION
+
+router = APIRouter(prefix="/api/world", tags=["world"])
+
+# Tables only change with a deploy: encode once, revalidate daily, pin forever by version
+_BODY = dumps({"version": WORLD_TABLES_VERSION, **WORLD_TABLES})
+_ETAG = f'"{WORLD_TABLES_VERSION}"'
+_LATEST_CACHE = "public, max-age=86400, stale-while-revalidate=604800"
+_PINNED_CACHE = "public, max-age=31536000, immutable"
+
+
+def _tables_response(if_none_match: Optional[str], cache_control: str) -> Response:
+    headers = {"ETag": _ETAG, "Cache-Control": cache_control}
+    if if_none_match and _ETAG in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=_BODY, media_type="application/json", headers=headers)
+
+
+@router.get("/tables")
+async def get_world_tables(if_none_match: Optional[str] = Header(None)):
+    """Worlds, affinity[world][attack][defense] and degradation[skill tier][current tier]"""
+    return _tables_response(if_none_match, _LATEST_CACHE)
+
+
+@router.get("/tables/{version}")
+async def get_world_tables_version(version: str, if_none_match: Optional[str] = Header(None)):
+    """Immutable copy of the tables at `version` (404 once a deploy changed them)"""
+    if version != WORLD_TABLES_VERSION:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown world tables version")
+    return _tables_response(if_none_match, _PINNED_CACHE)
@@ -0,0 +1,107 @@
+"""
+Schema version check against Alembic migrations (replaces create_all on boot)
+
+The head revision is read straight from the version files, so a boot whose
+database is already current never imports Alembic itself. A database built by
+the old create_all boot has tables but no alembic_version; auto-migrate stamps
+it at BASELINE_REVISION (the schema create_all produced) before upgrading.
+"""
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+VERSIONS_DIR = BACKEND_DIR / "migrations" / "versions"
+
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn").lower()  # off | warn | strict
+
+_REVISION = re.compile(r'^revision\s*=\s*["\']([^"\']+)["\']', re.MULTILINE)
+_DOWN_REVISION = re.compile(r'^down_revision\s*=\s*["\']([^"\']+)["\']', re.MULTILINE)
+
+# Last check result, reported by readiness
+schema_status: dict = {"checked": False}
+
+
+def head_revision(versions_dir: Path = VERSIONS_DIR) -> Optional[str]:
+    """The revision no other revision points back to (linear history assumed)"""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        match = _REVISION.search(source)
+        if match:
+            revisions.add(match.group(1))
+            parents.update(_DOWN_REVISION.findall(source))
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise RuntimeError(f"Multiple migration heads: {sorted(heads)}")
+    return heads.pop() if heads else None
+
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    async with engine.connect() as conn:
+        if (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar() is None:
+            return None
+        return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+BASELINE_REVISION = "0001_initial"
+
+# Serializes boot-time upgrades when several workers start at once
+MIGRATION_LOCK_ID = 0x52534D47
+
+
+async def upgrade_to_head(engine: AsyncEngine) -> None:
+    """Run `alembic upgrade head` on a connection from the app's engine, stamping a create_all schema first"""
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        await conn.run_sync(_upgrade)
+
+
+def _upgrade(sync_conn) -> None:
+    from alembic import command
+
+    config = alembic_config(sync_conn)
+    tables = inspect(sync_conn)
+    if not tables.has_table("alembic_version") and tables.has_table("users"):
+        command.stamp(config, BASELINE_REVISION)
+        print(f"[OK] Unversioned create_all schema stamped at {BASELINE_REVISION}")
+    command.upgrade(config, "head")
+
+
+async def ensure_schema(engine: AsyncEngine, auto_migrate: bool = False) -> dict:
+    if SCHEMA_CHECK == "off":
+        schema_status.update(checked=False, ok=True)
+        return schema_status
+
+    head = head_revision()
+    current = await current_revision(engine)
+    if current != head and auto_migrate:
+        await upgrade_to_head(engine)
+        print(f"[OK] Database migrated {current or 'unversioned'} -> {head}")
+        current = await current_revision(engine)
+
+    schema_status.update(checked=True, ok=current == head, current=current, head=head)
+    if current == head:
+        print(f"[OK] Database schema at {head}")
+    else:
+        hint = "alembic upgrade head" if current else f"alembic upgrade head (after `alembic stamp {BASELINE_REVISION}` for a create_all schema)"
+        message = f"Database schema at {current or 'unversioned'}, migrations head is {head} - run `{hint}`"
+        if SCHEMA_CHECK == "strict":
+            raise RuntimeError(message)
+        print(f"[WARN] {message}")
+    return schema_status
@@ -1,18 +1,33 @@
-from pathlib import Path
+import asyncio
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
 
 from app.api.compile import router as compile_router
 from app.api.auth import router as auth_router
 from app.api.market import router as market_router
 from app.api.skills import router as skills_router
-from app.database.session import init_db, close_db
-
-# Load environment variables from .env file in project root
-env_path = Path(__file__).parent.parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+from app.api.metrics import router as metrics_router
+from app.api.health import router as health_router
+from app.api.world import router as world_router
+from app.api.combat import router as combat_router
+from app.api.leaderboards import router as leaderboards_router
+from app.api.vfx import router as vfx_router
+from app.database.session import init_db, close_db, engine
+from app.services.listing_sweeper import run_sweeper
+from app.services.metrics import MetricsMiddleware, monitor_event_loop
+from app.services.compression import CompressionMiddleware
+from app.services import query_profiler
+from app.services.compile_jobs import start_workers
+from app.services.combat import shutdown_replays
+from app.services.leaderboards import run_leaderboards
+from app.services.vfx_prebake import run_prebake
+from app.services.ledger import run_ledger_maintenance
+from app.services.view_counts import run_view_flusher, flush_views
+from app.services.startup_profile import PROFILE, StartupProfileMiddleware
+from app.services.health import db_probe
+from app.services.serving import worker_count
 
 
 # Lifespan context manager for startup/shutdown
@@ -20,9 +35,33 @@ load_dotenv(dotenv_path=env_path)
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    PROFILE.mark("schema")
     print("[OK] Database initialized")
+    # Per-worker warm-up: opens the first pooled connection and primes the readiness cache
+    await db_probe.check()
+    if worker_count() > 1 and not os.getenv("REDIS_URL"):
+        print(f"[WARN] {worker_count()} workers without REDIS_URL: rate limits, compile jobs and leaderboards are per worker")
+    background = [asyncio.create_task(monitor_event_loop())]
+    background.extend(start_workers())
+    if os.getenv("LISTING_SWEEPER_ENABLED", "true").lower() == "true":
+        background.append(asyncio.create_task(run_sweeper()))
+        print("[OK] Listing sweeper started")
+    background.append(asyncio.create_task(run_leaderboards()))
+    if os.getenv("VFX_PREBAKE_ENABLED", "true").lower() == "true":
+        background.append(asyncio.create_task(run_prebake()))
+    background.append(asyncio.create_task(run_ledger_maintenance()))
+    background.append(asyncio.create_task(run_view_flusher()))
+    PROFILE.mark("background")
     yield
     # Shutdown
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    try:
+        await flush_views()
+    except Exception as e:
+        print(f"[WARN] Final view count flush failed: {e}")
+    await shutdown_replays()
     await close_db()
     print("[OK] Database connections closed")
 
@@ -41,6 +80,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Inside MetricsMiddleware, so request latency includes compression time
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(StartupProfileMiddleware)
+
+# Opt-in SQL profiling (SQL_PROFILER=dev|prod)
+if query_profiler.PROFILER_MODE in ("dev", "prod"):
+    query_profiler.install(engine)
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
 
 
 # Include routers
@@ -48,8 +96,11 @@ app.include_router(compile_router)
 app.include_router(auth_router)
 app.include_router(market_router)
 app.include_router(skills_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+app.include_router(world_router)
+app.include_router(combat_router)
+app.include_router(leaderboards_router)
+app.include_router(vfx_router)
 
-
-@app.get("/health")
-async def health_check():
-    return {"status": "ok", "service": "runesmith-api", "version": "0.1.1", "database": "connected"}
+PROFILE.mark("imports")
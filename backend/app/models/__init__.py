@@ -3,13 +3,38 @@ Export all models
 """
 from app.models.user import User
 from app.models.skill import Skill
-from app.models.market import MarketListing, Transaction, ListingStatus, TransactionType
+from app.models.market import (
+    MarketListing,
+    Transaction,
+    SkillRating,
+    ListingStatus,
+    TransactionType,
+    RATING_PRIOR_MEAN,
+    RATING_PRIOR_WEIGHT,
+    LISTING_TTL_DAYS,
+)
+from app.models.analytics import StatsRollup, RollupScope, RollupGranularity, ROLLUP_EPOCH
+from app.models.combat import CombatLog, CombatVerification
+from app.models.leaderboard import LeaderboardEntry
+from app.models.vfx_bundle import VfxBundle
 
 __all__ = [
     "User",
     "Skill",
     "MarketListing",
     "Transaction",
+    "SkillRating",
     "ListingStatus",
     "TransactionType",
+    "RATING_PRIOR_MEAN",
+    "RATING_PRIOR_WEIGHT",
+    "LISTING_TTL_DAYS",
+    "StatsRollup",
+    "RollupScope",
+    "RollupGranularity",
+    "ROLLUP_EPOCH",
+    "CombatLog",
+    "CombatVerification",
+    "LeaderboardEntry",
+    "VfxBundle",
 ]
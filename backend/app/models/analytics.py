@@ -0,0 +1,48 @@
+"""
+Analytics rollup models - incrementally maintained seller/listing counters
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, Float, Enum
+import enum
+from app.database.session import Base
+
+
+class RollupScope(str, enum.Enum):
+    LISTING = "listing"
+    SELLER = "seller"
+
+
+class RollupGranularity(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+    ALL = "all"  # running total, bucket = ROLLUP_EPOCH
+
+
+ROLLUP_EPOCH = datetime(1970, 1, 1)
+
+
+class StatsRollup(Base):
+    """
+    One row per (scope, scope_id, granularity, bucket).
+
+    Rows are only ever upserted with `col = col + excluded.col`, so readers
+    read a bounded range of the primary key no matter how long the history is.
+    """
+    __tablename__ = "stats_rollups"
+
+    scope = Column(Enum(RollupScope), primary_key=True)
+    scope_id = Column(Integer, primary_key=True)  # listing id or seller (user) id
+    granularity = Column(Enum(RollupGranularity), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)  # truncated to hour/day
+
+    sales = Column(Integer, default=0, nullable=False)
+    revenue_points = Column(Integer, default=0, nullable=False)
+    revenue_crystals = Column(Integer, default=0, nullable=False)
+    views = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Float, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<StatsRollup {self.scope.value}:{self.scope_id} {self.granularity.value} {self.bucket}>"
@@ -0,0 +1,54 @@
+"""
+Combat log model - one row per submitted fight, with its columnar event batch
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON, Float, Boolean, Enum, UniqueConstraint
+import enum
+from app.database.session import Base
+
+
+class CombatVerification(str, enum.Enum):
+    PENDING = "pending"    # sampled, replay queued
+    SKIPPED = "skipped"    # not sampled; trusted as submitted
+    VERIFIED = "verified"  # replay matched
+    REJECTED = "rejected"  # replay mismatch, rewards and stats reverted
+
+
+class CombatLog(Base):
+    __tablename__ = "combat_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    client_log_id = Column(String(64), nullable=False)  # Client-generated; makes retries idempotent
+
+    # Fight context
+    world_tier = Column(Integer, nullable=False)
+    stage = Column(Integer, nullable=False)
+    victory = Column(Boolean, nullable=False)
+    seed = Column(BigInteger, nullable=False)
+    turns_played = Column(Integer, nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+
+    # Server-computed from the events, never taken from the client
+    total_damage_dealt = Column(Float, nullable=False)
+    total_damage_taken = Column(Float, nullable=False)
+    xp_awarded = Column(Integer, nullable=False)
+    points_awarded = Column(Integer, nullable=False)
+    skill_stats = Column(JSON, nullable=False)  # {skill pk: [uses, damage]} applied to skills
+
+    # Columnar batch as submitted (see app.services.combat_replay)
+    event_count = Column(Integer, nullable=False)
+    events = Column(JSON, nullable=False)
+
+    verification = Column(Enum(CombatVerification), default=CombatVerification.SKIPPED, nullable=False)
+    verification_error = Column(String(200), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    verified_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_log_id", name="uq_combat_logs_user_client_log"),
+    )
+
+    def __repr__(self):
+        return f"<CombatLog {self.id} user={self.user_id} ({self.verification.value})>"
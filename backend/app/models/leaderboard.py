@@ -0,0 +1,24 @@
+"""
+Leaderboard snapshot model - persisted copy of the in-process top-K boards
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Float
+from app.database.session import Base
+
+
+class LeaderboardEntry(Base):
+    """
+    One ranked member of one board (e.g. board "skills:3:Fire", member a skill id).
+
+    Written by the snapshot loop and read back on boot; requests are served
+    from memory (or Redis), never from this table.
+    """
+    __tablename__ = "leaderboard_entries"
+
+    board = Column(String(64), primary_key=True)
+    member = Column(String(100), primary_key=True)
+    score = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<LeaderboardEntry {self.board} {self.member}={self.score}>"
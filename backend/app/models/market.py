@@ -2,7 +2,7 @@
 Market models for skill marketplace
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean, Enum, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 import enum
 from app.database.session import Base
@@ -21,6 +21,15 @@ class TransactionType(str, enum.Enum):
     REFUND = "refund"
 
 
+# Bayesian average prior: unrated listings sit at PRIOR_MEAN and need
+# roughly PRIOR_WEIGHT ratings before their own mean dominates.
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 5
+
+# Default lifetime of an active listing
+LISTING_TTL_DAYS = 30
+
+
 class MarketListing(Base):
     __tablename__ = "market_listings"
 
@@ -40,16 +49,33 @@ class MarketListing(Base):
     # Ratings (added after purchases)
     total_rating = Column(Float, default=0, nullable=False)
     rating_count = Column(Integer, default=0, nullable=False)
+    bayesian_rating = Column(Float, default=RATING_PRIOR_MEAN, nullable=False)  # Maintained by the rating path
+
+    # Optimistic concurrency: bumped when the offer (status, price) changes, not by
+    # views/purchases/ratings; sent as ETag "v<version>" and checked against If-Match
+    version = Column(Integer, default=1, server_default="1", nullable=False)
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     sold_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)  # Swept to EXPIRED by the listing sweeper
 
     # Relationships
     skill = relationship("Skill", back_populates="market_listing")
     seller = relationship("User", back_populates="market_listings")
     transactions = relationship("Transaction", back_populates="listing", cascade="all, delete-orphan")
+    ratings = relationship("SkillRating", back_populates="listing", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_market_listings_status_bayesian", "status", "bayesian_rating"),
+        # Sweeper scan: only active listings carry a live expiry
+        Index(
+            "ix_market_listings_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     @property
     def average_rating(self) -> float:
@@ -62,11 +88,17 @@ class MarketListing(Base):
 
 
 class Transaction(Base):
+    """
+    Purchase ledger, range-partitioned by month on created_at (transactions_pYYYYMM).
+
+    The partition key has to be part of the primary key; partitions are
+    created ahead and archived when cold by app.services.ledger.
+    """
     __tablename__ = "transactions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     listing_id = Column(Integer, ForeignKey("market_listings.id"), nullable=False, index=True)
-    buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Transaction details
     transaction_type = Column(Enum(TransactionType), default=TransactionType.PURCHASE, nullable=False)
@@ -80,12 +112,39 @@ class Transaction(Base):
     is_successful = Column(Boolean, default=True, nullable=False)
     error_message = Column(String(500), nullable=True)
 
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Timestamps (partition key)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
 
     # Relationships
     listing = relationship("MarketListing", back_populates="transactions")
     buyer = relationship("User", back_populates="transactions")
 
+    __table_args__ = (
+        # Keyset purchase history
+        Index("ix_transactions_buyer_created", "buyer_id", created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def __repr__(self):
         return f"<Transaction {self.id} ({self.transaction_type.value}, {self.amount} {self.currency_type})>"
+
+
+class SkillRating(Base):
+    __tablename__ = "skill_ratings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    listing_id = Column(Integer, ForeignKey("market_listings.id"), nullable=False, index=True)
+    buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    rating = Column(Float, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    listing = relationship("MarketListing", back_populates="ratings")
+
+    __table_args__ = (
+        UniqueConstraint("listing_id", "buyer_id", name="uq_skill_ratings_listing_buyer"),
+    )
+
+    def __repr__(self):
+        return f"<SkillRating {self.listing_id} by {self.buyer_id}: {self.rating}>"
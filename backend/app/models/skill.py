@@ -2,7 +2,7 @@
 Skill model for storing player-created skills
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON, Float, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON, Float, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from app.database.session import Base
 
@@ -31,12 +31,16 @@ class Skill(Base):
     mechanics = Column(JSON, nullable=False)  # delivery, effects[], keywords[]
     vfx = Column(JSON, nullable=False)  # material, geometry, motion, rhythm, blocks[]
     stats = Column(JSON, nullable=False)  # cooldown, manaCost, castTime, risk
+    vfx_bundle = Column(String(32), nullable=True)  # vfx_bundles.hash; NULL until prebaked
 
     # Usage tracking
     times_used = Column(Integer, default=0, nullable=False)
     total_damage = Column(Float, default=0, nullable=False)
     times_evolved = Column(Integer, default=0, nullable=False)
 
+    # Optimistic concurrency: bumped by edits to the skill, not by usage counters (ETag "v<version>")
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -45,5 +49,10 @@ class Skill(Base):
     owner = relationship("User", back_populates="skills")
     market_listing = relationship("MarketListing", back_populates="skill", uselist=False)
 
+    __table_args__ = (
+        # Prebake backfill scan: only skills without a bundle
+        Index("ix_skills_vfx_bundle_missing", "id", postgresql_where=text("vfx_bundle IS NULL")),
+    )
+
     def __repr__(self):
         return f"<Skill {self.name} (World {self.world_tier}, Owner: {self.owner_id})>"
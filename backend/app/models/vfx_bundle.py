@@ -0,0 +1,23 @@
+"""
+VFX bundle model - prebaked preview bundles keyed by content hash
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, LargeBinary
+from app.database.session import Base
+
+
+class VfxBundle(Base):
+    """
+    Canonical JSON bytes of one bundle (see app.services.vfx_bundle).
+
+    Rows are immutable: the key is the hash of the body, so a changed bake
+    produces a new row and skills point at it through skills.vfx_bundle.
+    """
+    __tablename__ = "vfx_bundles"
+
+    hash = Column(String(32), primary_key=True)
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<VfxBundle {self.hash} ({len(self.body)} bytes)>"
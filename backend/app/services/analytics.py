@@ -0,0 +1,255 @@
+"""
+Seller analytics - incremental rollup maintenance and bounded reads
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    MarketListing,
+    Transaction,
+    StatsRollup,
+    RollupScope,
+    RollupGranularity,
+    ROLLUP_EPOCH,
+)
+
+COUNTER_COLUMNS = ("sales", "revenue_points", "revenue_crystals", "views", "rating_sum", "rating_count")
+
+MAX_SERIES_DAYS = 90
+
+# Postgres orders enum values by declaration, not by label
+_SCOPE_ORDER = {scope: i for i, scope in enumerate(RollupScope)}
+_GRANULARITY_ORDER = {granularity: i for i, granularity in enumerate(RollupGranularity)}
+
+
+def _buckets(at: datetime) -> tuple[tuple[RollupGranularity, datetime], ...]:
+    hour = at.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    return (
+        (RollupGranularity.HOUR, hour),
+        (RollupGranularity.DAY, day),
+        (RollupGranularity.ALL, ROLLUP_EPOCH),
+    )
+
+
+async def record_listing_event(
+    db: AsyncSession,
+    listing_id: int,
+    seller_id: int,
+    *,
+    sales: int = 0,
+    revenue_points: int = 0,
+    revenue_crystals: int = 0,
+    views: int = 0,
+    rating_sum: float = 0,
+    rating_count: int = 0,
+    at: Optional[datetime] = None,
+) -> None:
+    """
+    Add deltas to the hourly/daily/total rollups of a listing and its seller.
+
+    Runs as a single multi-row upsert inside the caller's transaction, so the
+    counters commit (or roll back) together with the event that caused them.
+    """
+    deltas = {
+        "sales": sales,
+        "revenue_points": revenue_points,
+        "revenue_crystals": revenue_crystals,
+        "views": views,
+        "rating_sum": rating_sum,
+        "rating_count": rating_count,
+    }
+    now = datetime.utcnow()
+    rows = [
+        {"scope": scope, "scope_id": scope_id, "granularity": granularity, "bucket": bucket,
+         "updated_at": now, **deltas}
+        for scope, scope_id in ((RollupScope.LISTING, listing_id), (RollupScope.SELLER, seller_id))
+        for granularity, bucket in _buckets(at or now)
+    ]
+
+    await _upsert_rollups(db, rows)
+
+
+async def record_views(db: AsyncSession, views: Iterable[tuple[int, int, datetime, int]]) -> None:
+    """
+    Add buffered view counts, (listing id, seller id, hour, views) tuples, to the rollups.
+
+    Deltas for the same rollup row are summed first, since one upsert may not
+    touch a row twice.
+    """
+    totals: dict[tuple, int] = defaultdict(int)
+    for listing_id, seller_id, hour, count in views:
+        for scope, scope_id in ((RollupScope.LISTING, listing_id), (RollupScope.SELLER, seller_id)):
+            for granularity, bucket in _buckets(hour):
+                totals[(scope, scope_id, granularity, bucket)] += count
+    if not totals:
+        return
+
+    now = datetime.utcnow()
+    zero = {col: 0 for col in COUNTER_COLUMNS}
+    await _upsert_rollups(db, [
+        {**zero, "scope": scope, "scope_id": scope_id, "granularity": granularity, "bucket": bucket,
+         "views": count, "updated_at": now}
+        for (scope, scope_id, granularity, bucket), count in totals.items()
+    ])
+
+
+def _lock_order(row: dict) -> tuple:
+    return (_SCOPE_ORDER[row["scope"]], row["scope_id"], _GRANULARITY_ORDER[row["granularity"]], row["bucket"])
+
+
+async def _upsert_rollups(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Rows are upserted in primary-key order, so purchases, ratings and view
+    flushes touching the same listing or seller lock them in the same order
+    and cannot deadlock each other.
+    """
+    stmt = pg_insert(StatsRollup).values(sorted(rows, key=_lock_order))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatsRollup.scope, StatsRollup.scope_id, StatsRollup.granularity, StatsRollup.bucket],
+        set_={
+            **{col: getattr(StatsRollup, col) + getattr(stmt.excluded, col) for col in COUNTER_COLUMNS},
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await db.execute(stmt)
+
+
+def _summary(row: Optional[StatsRollup]) -> dict:
+    if row is None:
+        return {"sales": 0, "revenue_points": 0, "revenue_crystals": 0, "views": 0,
+                "conversion": 0.0, "average_rating": 0.0, "rating_count": 0}
+    return {
+        "sales": row.sales,
+        "revenue_points": row.revenue_points,
+        "revenue_crystals": row.revenue_crystals,
+        "views": row.views,
+        "conversion": row.sales / row.views if row.views else 0.0,
+        "average_rating": row.rating_sum / row.rating_count if row.rating_count else 0.0,
+        "rating_count": row.rating_count,
+    }
+
+
+async def seller_analytics(db: AsyncSession, seller_id: int, days: int = 30, listing_limit: int = 50) -> dict:
+    """
+    Dashboard payload for one seller.
+
+    Reads at most 1 + `days` seller rows and `listing_limit` listing totals,
+    all by primary key range - cost is independent of transaction history.
+    """
+    days = max(1, min(days, MAX_SERIES_DAYS))
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+
+    result = await db.execute(
+        select(StatsRollup).where(
+            StatsRollup.scope == RollupScope.SELLER,
+            StatsRollup.scope_id == seller_id,
+            StatsRollup.granularity == RollupGranularity.ALL,
+            StatsRollup.bucket == ROLLUP_EPOCH,
+        )
+    )
+    totals = result.scalar_one_or_none()
+
+    result = await db.execute(
+        select(StatsRollup).where(
+            StatsRollup.scope == RollupScope.SELLER,
+            StatsRollup.scope_id == seller_id,
+            StatsRollup.granularity == RollupGranularity.DAY,
+            StatsRollup.bucket >= since,
+        ).order_by(StatsRollup.bucket)
+    )
+    by_day = {r.bucket: r for r in result.scalars().all()}
+
+    daily = []
+    for i in range(days):
+        bucket = since + timedelta(days=i)
+        r = by_day.get(bucket)
+        daily.append({
+            "date": bucket.date().isoformat(),
+            "sales": r.sales if r else 0,
+            "revenue_points": r.revenue_points if r else 0,
+            "revenue_crystals": r.revenue_crystals if r else 0,
+            "views": r.views if r else 0,
+        })
+
+    # Per-listing totals: listing ids come from the seller index, counters from the rollup PK
+    listing_ids = (
+        select(MarketListing.id, MarketListing.created_at)
+        .where(MarketListing.seller_id == seller_id)
+        .order_by(MarketListing.created_at.desc())
+        .limit(listing_limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(listing_ids.c.id, listing_ids.c.created_at, StatsRollup)
+        .outerjoin(
+            StatsRollup,
+            (StatsRollup.scope == RollupScope.LISTING)
+            & (StatsRollup.scope_id == listing_ids.c.id)
+            & (StatsRollup.granularity == RollupGranularity.ALL)
+            & (StatsRollup.bucket == ROLLUP_EPOCH),
+        )
+        .order_by(listing_ids.c.created_at.desc())
+    )
+    now = datetime.utcnow()
+    listings = []
+    for listing_id, created_at, rollup in result.all():
+        age_days = max((now - created_at).total_seconds() / 86400, 1.0)
+        summary = _summary(rollup)
+        listings.append({
+            "listing_id": listing_id,
+            **summary,
+            "sales_per_day": summary["sales"] / age_days,
+        })
+
+    return {
+        "seller_id": seller_id,
+        "totals": _summary(totals),
+        "daily": daily,
+        "listings": listings,
+    }
+
+
+async def backfill_rollups(db: AsyncSession) -> int:
+    """
+    Rebuild sales/revenue rollups from `transactions` (one-off, for data that
+    predates the rollup tables). Returns the number of transactions replayed.
+    """
+    await db.execute(delete(StatsRollup))
+
+    result = await db.stream(
+        select(Transaction.listing_id, MarketListing.seller_id, Transaction.amount,
+               Transaction.currency_type, Transaction.created_at)
+        .join(MarketListing, Transaction.listing_id == MarketListing.id)
+        .where(Transaction.is_successful.is_(True))
+        .execution_options(yield_per=1000)
+    )
+    count = 0
+    async for listing_id, seller_id, amount, currency_type, created_at in result:
+        await record_listing_event(
+            db, listing_id, seller_id,
+            sales=1,
+            revenue_points=amount if currency_type == "points" else 0,
+            revenue_crystals=amount if currency_type == "rune_crystals" else 0,
+            at=created_at,
+        )
+        count += 1
+
+    # Views and ratings only exist as running totals on the listing
+    result = await db.execute(
+        select(MarketListing.id, MarketListing.seller_id, MarketListing.views,
+               MarketListing.total_rating, MarketListing.rating_count)
+        .where((MarketListing.views > 0) | (MarketListing.rating_count > 0))
+    )
+    for listing_id, seller_id, views, total_rating, rating_count in result.all():
+        await record_listing_event(
+            db, listing_id, seller_id,
+            views=views, rating_sum=total_rating, rating_count=rating_count,
+            at=ROLLUP_EPOCH,
+        )
+    return count
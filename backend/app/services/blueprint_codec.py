@@ -0,0 +1,347 @@
+"""
+Compact binary codec for skill blueprints (mechanics + vfx core)
+
+Wire format v1, little-endian:
+
+    magic "RSB" | version u8
+    delivery u8 | material u8 | geometry u8 | motion u8 | rhythm u8
+    intensity f32 | primary u32 (0xRRGGBB) | secondary u32
+    n_effects u8 | n_keywords u8
+    effect_type u8 * n_effects
+    effect_params f32 * (n_effects * 5)   value, duration, percent, distance, bonus (NaN = absent)
+    keyword u8 * n_keywords
+    keyword_n i16 * n_keywords            (-1 = absent)
+
+Derived VFX data (blocks, audio) is not part of the blueprint; clients
+rebuild it from these fields. Packing only accepts values that decode back
+unchanged: numbers must survive f32 storage and keyword counts must fit i16.
+"""
+import hashlib
+import math
+import struct
+import sys
+from array import array
+from typing import Any
+
+from app.services.skill_enums import (
+    DELIVERY_TYPES,
+    EFFECT_TYPES,
+    EFFECT_PARAMS,
+    KEYWORDS,
+    GEOMETRIES,
+    MOTIONS,
+    MATERIALS,
+    RHYTHMS,
+    build_index,
+)
+
+MEDIA_TYPE = "application/x-runesmith-blueprint"
+MAGIC = b"RSB"
+VERSION = 1
+
+_HEADER = struct.Struct("<3sBBBBBBfIIBB")
+_F32 = struct.Struct("<f")
+_KEYWORD_N_MAX = 32767
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_N_PARAMS = len(EFFECT_PARAMS)
+_NAN = float("nan")
+_SWAP = sys.byteorder == "big"
+
+_DELIVERY_IDS = build_index(DELIVERY_TYPES)
+_EFFECT_IDS = build_index(EFFECT_TYPES)
+_KEYWORD_IDS = build_index(KEYWORDS)
+_GEOMETRY_IDS = build_index(GEOMETRIES)
+_MOTION_IDS = build_index(MOTIONS)
+_MATERIAL_IDS = build_index(MATERIALS)
+_RHYTHM_IDS = build_index(RHYTHMS)
+
+
+class BlueprintCodecError(ValueError):
+    """Raised when a blueprint cannot be packed or unpacked"""
+
+
+def _lookup(ids: dict[str, int], value: Any, field: str) -> int:
+    try:
+        return ids[value]
+    except (KeyError, TypeError):
+        raise BlueprintCodecError(f"Unknown {field}: {value!r}") from None
+
+
+def _name(table: tuple[str, ...], idx: int, field: str) -> str:
+    if idx >= len(table):
+        raise BlueprintCodecError(f"Unknown {field} id: {idx}")
+    return table[idx]
+
+
+def _parse_hex(color: Any) -> int:
+    if not isinstance(color, str) or not color.startswith("#"):
+        raise BlueprintCodecError(f"Invalid palette color: {color!r}")
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) != 6 or not all(c in _HEX_DIGITS for c in digits):
+        raise BlueprintCodecError(f"Invalid palette color: {color!r}")
+    return int(digits, 16)
+
+
+def _unpack_number(x: float) -> float | int:
+    # f32 storage: trim float noise so 0.3 decodes back to 0.3
+    x = round(x, 4)
+    return int(x) if x.is_integer() else x
+
+
+def _pack_number(value: Any, field: str) -> float:
+    """A JSON number as stored in f32; rejects anything that would not decode back to itself"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise BlueprintCodecError(f"Invalid {field}: {value!r}")
+    try:
+        stored = _F32.unpack(_F32.pack(value))[0]
+    except (OverflowError, struct.error):
+        raise BlueprintCodecError(f"{field} out of float32 range: {value!r}") from None
+    if not math.isfinite(stored) or _unpack_number(stored) != value:
+        raise BlueprintCodecError(f"{field} does not survive float32 storage: {value!r}")
+    return stored
+
+
+def _pack_count(value: Any, field: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= _KEYWORD_N_MAX:
+        raise BlueprintCodecError(f"Invalid {field}: {value!r}")
+    return value
+
+
+def _list(value: Any, field: str) -> list:
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise BlueprintCodecError(f"Invalid {field}: expected a list of objects")
+    if len(value) > 255:
+        raise BlueprintCodecError(f"Too many {field}: {len(value)}")
+    return value
+
+
+def _le(arr: array) -> bytes:
+    if _SWAP:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class PackedBlueprint:
+    """Array-backed in-memory form of a blueprint"""
+
+    __slots__ = (
+        "delivery", "material", "geometry", "motion", "rhythm",
+        "intensity", "primary", "secondary",
+        "effect_types", "effect_params", "keywords", "keyword_n",
+        "_digest",
+    )
+
+    def __init__(
+        self,
+        delivery: int,
+        material: int,
+        geometry: int,
+        motion: int,
+        rhythm: int,
+        intensity: float,
+        primary: int,
+        secondary: int,
+        effect_types: array,
+        effect_params: array,
+        keywords: array,
+        keyword_n: array,
+    ):
+        self.delivery = delivery
+        self.material = material
+        self.geometry = geometry
+        self.motion = motion
+        self.rhythm = rhythm
+        self.intensity = intensity
+        self.primary = primary
+        self.secondary = secondary
+        self.effect_types = effect_types
+        self.effect_params = effect_params
+        self.keywords = keywords
+        self.keyword_n = keyword_n
+        self._digest: str | None = None
+
+    # ── JSON <-> packed ──
+
+    @classmethod
+    def from_dict(cls, mechanics: dict, vfx: dict) -> "PackedBlueprint":
+        """Pack the JSON `mechanics` / `vfx` columns of a skill"""
+        if not isinstance(mechanics, dict) or not isinstance(vfx, dict):
+            raise BlueprintCodecError("mechanics and vfx must be objects")
+        effects = _list(mechanics.get("effects"), "effects")
+        keywords = _list(mechanics.get("keywords"), "keywords")
+
+        effect_types = array("B")
+        effect_params = array("f")
+        for effect in effects:
+            effect_types.append(_lookup(_EFFECT_IDS, effect.get("type"), "effect type"))
+            for key in EFFECT_PARAMS:
+                value = effect.get(key)
+                effect_params.append(_NAN if value is None else _pack_number(value, f"effect {key}"))
+
+        keyword_ids = array("B")
+        keyword_n = array("h")
+        for kw in keywords:
+            keyword_ids.append(_lookup(_KEYWORD_IDS, kw.get("keyword"), "keyword"))
+            n = kw.get("n")
+            keyword_n.append(-1 if n is None else _pack_count(n, "keyword n"))
+
+        palette = vfx.get("palette") or {}
+        if not isinstance(palette, dict):
+            raise BlueprintCodecError(f"Invalid palette: {palette!r}")
+        return cls(
+            delivery=_lookup(_DELIVERY_IDS, mechanics.get("delivery"), "delivery"),
+            material=_lookup(_MATERIAL_IDS, vfx.get("material"), "material"),
+            geometry=_lookup(_GEOMETRY_IDS, vfx.get("geometry"), "geometry"),
+            motion=_lookup(_MOTION_IDS, vfx.get("motion"), "motion"),
+            rhythm=_lookup(_RHYTHM_IDS, vfx.get("rhythm"), "rhythm"),
+            intensity=_pack_number(vfx.get("intensity", 0.7), "intensity"),
+            primary=_parse_hex(palette.get("primary")),
+            secondary=_parse_hex(palette.get("secondary")),
+            effect_types=effect_types,
+            effect_params=effect_params,
+            keywords=keyword_ids,
+            keyword_n=keyword_n,
+        )
+
+    def to_dict(self) -> tuple[dict, dict]:
+        """Expand back to (mechanics, vfx) dicts"""
+        effects = []
+        for i, type_id in enumerate(self.effect_types):
+            effect: dict[str, Any] = {"type": _name(EFFECT_TYPES, type_id, "effect type")}
+            base = i * _N_PARAMS
+            for j, key in enumerate(EFFECT_PARAMS):
+                value = self.effect_params[base + j]
+                if not math.isnan(value):
+                    effect[key] = _unpack_number(value)
+            effects.append(effect)
+
+        keywords = []
+        for kw_id, n in zip(self.keywords, self.keyword_n):
+            kw: dict[str, Any] = {"keyword": _name(KEYWORDS, kw_id, "keyword")}
+            if n >= 0:
+                kw["n"] = n
+            keywords.append(kw)
+
+        mechanics = {
+            "delivery": _name(DELIVERY_TYPES, self.delivery, "delivery"),
+            "effects": effects,
+            "keywords": keywords,
+        }
+        vfx = {
+            "geometry": _name(GEOMETRIES, self.geometry, "geometry"),
+            "motion": _name(MOTIONS, self.motion, "motion"),
+            "material": _name(MATERIALS, self.material, "material"),
+            "rhythm": _name(RHYTHMS, self.rhythm, "rhythm"),
+            "palette": {
+                "primary": f"#{self.primary:06x}",
+                "secondary": f"#{self.secondary:06x}",
+            },
+            "intensity": _unpack_number(self.intensity),
+        }
+        return mechanics, vfx
+
+    # ── bytes <-> packed ──
+
+    def to_bytes(self) -> bytes:
+        """Serialize to the canonical v1 wire format"""
+        header = _HEADER.pack(
+            MAGIC, VERSION,
+            self.delivery, self.material, self.geometry, self.motion, self.rhythm,
+            self.intensity, self.primary, self.secondary,
+            len(self.effect_types), len(self.keywords),
+        )
+        return b"".join((
+            header,
+            self.effect_types.tobytes(),
+            _le(self.effect_params),
+            self.keywords.tobytes(),
+            _le(self.keyword_n),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PackedBlueprint":
+        """Parse the canonical wire format"""
+        if len(data) < _HEADER.size:
+            raise BlueprintCodecError("Truncated blueprint header")
+        (
+            magic, version,
+            delivery, material, geometry, motion, rhythm,
+            intensity, primary, secondary,
+            n_effects, n_keywords,
+        ) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise BlueprintCodecError("Not a RuneSmith blueprint")
+        if version != VERSION:
+            raise BlueprintCodecError(f"Unsupported blueprint version: {version}")
+
+        expected = _HEADER.size + n_effects * (1 + 4 * _N_PARAMS) + n_keywords * 3
+        if len(data) != expected:
+            raise BlueprintCodecError("Blueprint length mismatch")
+
+        view = memoryview(data)
+        pos = _HEADER.size
+
+        effect_types = array("B", view[pos:pos + n_effects])
+        pos += n_effects
+        effect_params = array("f")
+        effect_params.frombytes(view[pos:pos + n_effects * 4 * _N_PARAMS])
+        pos += n_effects * 4 * _N_PARAMS
+        keyword_ids = array("B", view[pos:pos + n_keywords])
+        pos += n_keywords
+        keyword_n = array("h")
+        keyword_n.frombytes(view[pos:pos + n_keywords * 2])
+        if _SWAP:
+            effect_params.byteswap()
+            keyword_n.byteswap()
+
+        return cls(
+            delivery=delivery,
+            material=material,
+            geometry=geometry,
+            motion=motion,
+            rhythm=rhythm,
+            intensity=intensity,
+            primary=primary,
+            secondary=secondary,
+            effect_types=effect_types,
+            effect_params=effect_params,
+            keywords=keyword_ids,
+            keyword_n=keyword_n,
+        )
+
+    def digest(self) -> str:
+        """Content hash of the canonical encoding (cached)"""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.to_bytes(), digest_size=16).hexdigest()
+        return self._digest
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedBlueprint):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    def __hash__(self) -> int:
+        return hash(self.digest())
+
+    def __repr__(self):
+        return f"<PackedBlueprint {self.digest()[:12]} ({len(self.effect_types)} effects)>"
+
+
+def encode_blueprint(mechanics: dict, vfx: dict) -> bytes:
+    """Pack JSON mechanics/vfx straight to bytes"""
+    return PackedBlueprint.from_dict(mechanics, vfx).to_bytes()
+
+
+def decode_blueprint(data: bytes) -> tuple[dict, dict]:
+    """Unpack bytes back to (mechanics, vfx) dicts"""
+    return PackedBlueprint.from_bytes(data).to_dict()
+
+
+def blueprint_hash(mechanics: dict, vfx: dict) -> str:
+    """Content hash of a blueprint, stable across JSON key order and whitespace"""
+    return PackedBlueprint.from_dict(mechanics, vfx).digest()
@@ -0,0 +1,238 @@
+"""
+Combat result ingestion - rewards and skill stats in one transaction,
+sampled replay verification off the request path
+
+A submission is written with three statements (log insert, user reward
+update, one executemany over the used skills). A deterministic sample of
+submissions is then replayed in a process pool; a mismatch marks the log
+rejected and reverts exactly what it applied.
+"""
+import asyncio
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, bindparam, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import AsyncSessionLocal
+from app.models import User, Skill, CombatLog, CombatVerification
+from app.services.combat_replay import replay_combat
+from app.services.metrics import counter
+
+COMBAT_REPLAY_SAMPLE_RATE = float(os.getenv("COMBAT_REPLAY_SAMPLE_RATE", "0.1"))
+COMBAT_REPLAY_WORKERS = int(os.getenv("COMBAT_REPLAY_WORKERS", "2"))
+
+REPLAYS = counter("runesmith_combat_replays_total", "Sampled combat replays by result", ("result",))
+
+
+class DuplicateCombatLog(Exception):
+    """This client_log_id was already submitted by the user"""
+
+
+def combat_rewards(world_tier: int, stage: int, victory: bool) -> tuple[int, int]:
+    """(xp, points) - server-side; the client's xpEarned/pointsEarned are not trusted"""
+    base = 20 * world_tier * (1 + 0.25 * (stage - 1))
+    if stage == 5:  # boss stage
+        base *= 2
+    if not victory:
+        base *= 0.25
+    return round(base), round(base / 2)
+
+
+def replay_sampled(user_id: int, client_log_id: str) -> bool:
+    """Deterministic per submission, so resubmitting cannot dodge (or force) a replay"""
+    digest = hashlib.blake2b(f"{user_id}:{client_log_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64 < COMBAT_REPLAY_SAMPLE_RATE
+
+
+# Skill usage deltas for many skills in one executemany; negative deltas revert
+_SKILL_STATS = Skill.__table__
+SKILL_STATS_UPDATE = (
+    update(_SKILL_STATS)
+    .where(_SKILL_STATS.c.id == bindparam("pk"))
+    .values(
+        times_used=func.greatest(_SKILL_STATS.c.times_used + bindparam("uses"), 0),
+        total_damage=func.greatest(_SKILL_STATS.c.total_damage + bindparam("dmg"), 0),
+    )
+)
+
+
+async def known_skills(db: AsyncSession, user_id: int, skill_ids: list[str]) -> dict[str, dict]:
+    """skill_id -> replay inputs, for the submitted skills the user owns (presets are not stored)"""
+    if not skill_ids:
+        return {}
+    result = await db.execute(
+        select(Skill.id, Skill.skill_id, Skill.combat_budget, Skill.world_tier, Skill.vfx_budget, Skill.vfx)
+        .where(Skill.owner_id == user_id, Skill.skill_id.in_(skill_ids))
+    )
+    return {
+        row.skill_id: {
+            "pk": row.id,
+            "combat_budget": row.combat_budget,
+            "world_tier": row.world_tier,
+            "vfx_budget": row.vfx_budget,
+            "material": (row.vfx or {}).get("material"),
+        }
+        for row in result
+    }
+
+
+async def ingest_combat(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    client_log_id: str,
+    world_tier: int,
+    stage: int,
+    victory: bool,
+    seed: int,
+    turns_played: int,
+    duration_ms: int,
+    events: dict,
+    event_count: int,
+    summary: dict,
+    skill_pks: dict[int, int],
+) -> dict:
+    """
+    Persist one fight and apply its rewards and skill stats atomically.
+
+    skill_pks maps the submission's skill index to Skill.id for owned skills;
+    usage of other skills (presets) is recorded in the log only.
+    """
+    xp, points = combat_rewards(world_tier, stage, victory)
+    stats = {
+        skill_pks[idx]: [summary["uses"].get(idx, 0), summary["damage"].get(idx, 0.0)]
+        for idx in set(summary["uses"]) | set(summary["damage"])
+        if idx in skill_pks
+    }
+    sampled = replay_sampled(user_id, client_log_id)
+
+    result = await db.execute(
+        pg_insert(CombatLog)
+        .values(
+            user_id=user_id,
+            client_log_id=client_log_id,
+            world_tier=world_tier,
+            stage=stage,
+            victory=victory,
+            seed=seed,
+            turns_played=turns_played,
+            duration_ms=duration_ms,
+            total_damage_dealt=summary["damage_dealt"],
+            total_damage_taken=summary["damage_taken"],
+            xp_awarded=xp,
+            points_awarded=points,
+            skill_stats={str(pk): value for pk, value in stats.items()},
+            event_count=event_count,
+            events=events,
+            verification=CombatVerification.PENDING if sampled else CombatVerification.SKIPPED,
+            created_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(constraint="uq_combat_logs_user_client_log")
+        .returning(CombatLog.id)
+    )
+    log_id = result.scalar_one_or_none()
+    if log_id is None:
+        raise DuplicateCombatLog(client_log_id)
+
+    await db.execute(
+        update(User).where(User.id == user_id).values(xp=User.xp + xp, points=User.points + points)
+    )
+    if stats:
+        await db.execute(
+            SKILL_STATS_UPDATE,
+            [{"pk": pk, "uses": uses, "dmg": dmg} for pk, (uses, dmg) in stats.items()],
+        )
+    await db.commit()
+
+    return {
+        "id": log_id,
+        "xp_awarded": xp,
+        "points_awarded": points,
+        "total_damage_dealt": summary["damage_dealt"],
+        "total_damage_taken": summary["damage_taken"],
+        "verification": (CombatVerification.PENDING if sampled else CombatVerification.SKIPPED).value,
+        "sampled": sampled,
+        "stats": stats,
+    }
+
+
+# ── Replay workers ──
+
+_pool = None  # ProcessPoolExecutor, created (and multiprocessing imported) on the first sampled replay
+_tasks: set[asyncio.Task] = set()
+
+
+def _replay_pool():
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+
+        # spawn: children import only combat_replay/world, never the running event loop's state
+        _pool = ProcessPoolExecutor(max_workers=COMBAT_REPLAY_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+def schedule_replay(log_id: int, user_id: int, payload: dict, xp: int, points: int, stats: dict) -> None:
+    task = asyncio.create_task(_verify(log_id, user_id, payload, xp, points, stats))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _verify(log_id: int, user_id: int, payload: dict, xp: int, points: int, stats: dict) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        error = await loop.run_in_executor(_replay_pool(), replay_combat, payload)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        REPLAYS.inc("error")
+        print(f"[WARN] Combat replay of log {log_id} failed: {e}")
+        return
+
+    async with AsyncSessionLocal() as db:
+        if error is None:
+            await db.execute(
+                update(CombatLog)
+                .where(CombatLog.id == log_id, CombatLog.verification == CombatVerification.PENDING)
+                .values(verification=CombatVerification.VERIFIED, verified_at=datetime.utcnow())
+            )
+        else:
+            # Only the transition out of PENDING reverts, so a second replay cannot double-revert
+            result = await db.execute(
+                update(CombatLog)
+                .where(CombatLog.id == log_id, CombatLog.verification == CombatVerification.PENDING)
+                .values(
+                    verification=CombatVerification.REJECTED,
+                    verification_error=error[:200],
+                    verified_at=datetime.utcnow(),
+                )
+                .returning(CombatLog.id)
+            )
+            if result.scalar_one_or_none() is not None:
+                await db.execute(
+                    update(User).where(User.id == user_id).values(
+                        xp=func.greatest(User.xp - xp, 0),
+                        points=func.greatest(User.points - points, 0),
+                    )
+                )
+                if stats:
+                    await db.execute(
+                        SKILL_STATS_UPDATE,
+                        [{"pk": pk, "uses": -uses, "dmg": -dmg} for pk, (uses, dmg) in stats.items()],
+                    )
+        await db.commit()
+    REPLAYS.inc("verified" if error is None else "rejected")
+
+
+async def shutdown_replays() -> None:
+    """Cancel in-flight replays (their logs stay PENDING) and stop the process pool"""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
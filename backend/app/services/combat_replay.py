@@ -0,0 +1,153 @@
+"""
+Combat log decoding and deterministic replay
+
+A fight arrives as equal-length event columns instead of an array of objects:
+
+    {"type": [0, 1, ...], "turn": [...], "t": [...], "skill": [...], "target": [...], "damage": [...]}
+
+- type:   index into COMBAT_EVENT_TYPES (wire ids, append-only)
+- t:      milliseconds since the previous event (delta-encoded)
+- skill:  index into the submission's `skills` list, -1 when none
+- target: index into the submission's `targets` list, -1 when none
+
+This module has no database or framework imports so replay_combat() can run
+in a process pool.
+"""
+import math
+from typing import Optional
+
+from app.services.world import affinity_multiplier, vfx_degradation
+
+COMBAT_EVENT_TYPES = (
+    "skill_use", "damage_dealt", "damage_taken", "heal", "dodge",
+    "enemy_attack", "enemy_defeat", "wave_clear", "victory", "defeat",
+)
+EVENT_COLUMNS = ("type", "turn", "t", "skill", "target", "damage")
+MAX_EVENTS = 5000
+
+SKILL_USE, DAMAGE_DEALT, DAMAGE_TAKEN = 0, 1, 2
+VICTORY, DEFEAT = 8, 9
+
+# Mirrors calculateSkillDamage in apps/web/src/lib/combat/combat-engine.ts
+BASE_DAMAGE_RATIO = 0.8
+CRIT_CHANCE = 0.15
+CRIT_MULTIPLIER = 1.5
+ENEMY_ELEMENTS = ("Fire", "Ice", "Lightning", "Water", "Nature", "Earth", "Wind")
+
+
+class CombatLogError(ValueError):
+    """Malformed or inconsistent combat log"""
+
+
+def _js_round(x: float) -> int:
+    return math.floor(x + 0.5)
+
+
+def validate_columns(events: dict, skill_count: int, target_count: int) -> int:
+    """Structural checks done on the request path; returns the event count"""
+    missing = [c for c in EVENT_COLUMNS if c not in events]
+    if missing:
+        raise CombatLogError(f"Missing event columns: {', '.join(missing)}")
+    n = len(events["type"])
+    if n > MAX_EVENTS:
+        raise CombatLogError(f"Too many events ({n} > {MAX_EVENTS})")
+    if any(len(events[c]) != n for c in EVENT_COLUMNS):
+        raise CombatLogError("Event columns must have equal length")
+
+    previous_turn = 0
+    for i in range(n):
+        if not 0 <= events["type"][i] < len(COMBAT_EVENT_TYPES):
+            raise CombatLogError(f"Event {i}: unknown type {events['type'][i]}")
+        if events["turn"][i] < previous_turn:
+            raise CombatLogError(f"Event {i}: turns must not go backwards")
+        previous_turn = events["turn"][i]
+        if events["t"][i] < 0 or events["damage"][i] < 0:
+            raise CombatLogError(f"Event {i}: negative time or damage")
+        if not -1 <= events["skill"][i] < skill_count:
+            raise CombatLogError(f"Event {i}: skill index out of range")
+        if not -1 <= events["target"][i] < target_count:
+            raise CombatLogError(f"Event {i}: target index out of range")
+    return n
+
+
+def summarize(events: dict) -> dict:
+    """Totals and per-skill usage computed from the events (client totals are ignored)"""
+    dealt = taken = 0.0
+    uses: dict[int, int] = {}
+    damage: dict[int, float] = {}
+    outcome = None
+    for kind, skill, amount in zip(events["type"], events["skill"], events["damage"]):
+        if kind == SKILL_USE and skill >= 0:
+            uses[skill] = uses.get(skill, 0) + 1
+        elif kind == DAMAGE_DEALT:
+            dealt += amount
+            if skill >= 0:
+                damage[skill] = damage.get(skill, 0.0) + amount
+        elif kind == DAMAGE_TAKEN:
+            taken += amount
+        elif kind in (VICTORY, DEFEAT):
+            outcome = kind == VICTORY
+    return {"damage_dealt": dealt, "damage_taken": taken, "uses": uses, "damage": damage, "victory": outcome}
+
+
+def expected_damage(skill: dict, target: dict, world_tier: int) -> tuple[int, int]:
+    """(normal, critical) damage for one hit, with the client's operation order"""
+    base = skill["combat_budget"] * BASE_DAMAGE_RATIO
+    affinity = affinity_multiplier(skill["material"], target["element"], world_tier)
+    degradation = vfx_degradation(skill["world_tier"], world_tier, skill["vfx_budget"])
+    def_reduction = max(0.3, 1 - target["defense"] / 200)
+    normal = _js_round(base * affinity * degradation * 1.0 * def_reduction)
+    critical = _js_round(base * affinity * degradation * CRIT_MULTIPLIER * def_reduction)
+    return normal, critical
+
+
+def replay_combat(payload: dict) -> Optional[str]:
+    """
+    Recompute every damage_dealt event of a server-known skill.
+
+    payload: world_tier, events, targets [{element, defense}], skills {index: {combat_budget,
+    world_tier, vfx_budget, material}} (only skills the server holds). Returns None when the
+    log is consistent, else the first mismatch.
+
+    Crits are rolled with Math.random() on the client, so a hit may match either branch;
+    the crit share is instead bounded at 3 sigma above CRIT_CHANCE.
+    """
+    world_tier = payload["world_tier"]
+    events = payload["events"]
+    targets = payload["targets"]
+    skills = {int(k): v for k, v in payload["skills"].items()}
+
+    expected_defense = _js_round(5 * world_tier)
+    for i, target in enumerate(targets):
+        if target["element"] not in ENEMY_ELEMENTS:
+            return f"Target {i}: element {target['element']} cannot spawn"
+        if target["defense"] != expected_defense:
+            return f"Target {i}: defense {target['defense']} != {expected_defense}"
+
+    used_this_turn: set[int] = set()
+    current_turn = None
+    hits = crits = 0
+    for i, (kind, turn, skill, target, amount) in enumerate(
+        zip(events["type"], events["turn"], events["skill"], events["target"], events["damage"])
+    ):
+        if turn != current_turn:
+            current_turn, used_this_turn = turn, set()
+        if kind == SKILL_USE:
+            used_this_turn.add(skill)
+        elif kind == DAMAGE_DEALT and skill in skills:
+            if skill not in used_this_turn:
+                return f"Event {i}: damage from skill {skill} without a skill_use this turn"
+            if target < 0:
+                return f"Event {i}: damage without a target"
+            normal, critical = expected_damage(skills[skill], targets[target], world_tier)
+            if amount == critical and amount != normal:
+                crits += 1
+            elif amount != normal:
+                return f"Event {i}: damage {amount} != {normal} (crit {critical})"
+            hits += 1
+
+    if hits >= 20:
+        bound = CRIT_CHANCE + 3 * math.sqrt(CRIT_CHANCE * (1 - CRIT_CHANCE) / hits)
+        if crits / hits > bound:
+            return f"Crit rate {crits}/{hits} above {bound:.2f}"
+    return None
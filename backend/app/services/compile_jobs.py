@@ -0,0 +1,341 @@
+"""
+Asynchronous compile jobs - priority queue, worker coroutines and result store
+
+Backends:
+- MemoryJobBackend: asyncio priority queue + dict, per worker process (default)
+- RedisJobBackend:  sorted-set queue + JSON job records shared by all workers
+                    (used when REDIS_URL is set)
+
+Both reject new jobs with QueueFullError once `COMPILE_QUEUE_MAX` jobs are waiting.
+
+Completion callbacks (COMPILE_CALLBACKS_ENABLED) only go to public addresses:
+the host is resolved, every address must be globally routable, and the POST
+is sent to the checked address so a second DNS answer cannot redirect it.
+COMPILE_CALLBACK_HOSTS optionally restricts callbacks to listed hosts
+(".example.com" also allows its subdomains). Redirects are not followed.
+"""
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from app.services.metrics import counter, gauge, histogram
+
+COMPILE_WORKERS = int(os.getenv("COMPILE_WORKERS", "4"))
+COMPILE_QUEUE_MAX = int(os.getenv("COMPILE_QUEUE_MAX", "200"))
+COMPILE_JOB_TTL_SECONDS = int(os.getenv("COMPILE_JOB_TTL_SECONDS", "3600"))
+COMPILE_CALLBACKS_ENABLED = os.getenv("COMPILE_CALLBACKS_ENABLED", "false").lower() == "true"
+COMPILE_CALLBACK_HOSTS = tuple(
+    host.strip().lower() for host in os.getenv("COMPILE_CALLBACK_HOSTS", "").split(",") if host.strip()
+)
+
+JOBS_TOTAL = counter("runesmith_compile_jobs_total", "Compile jobs by final status", ("status",))
+JOB_WAIT = histogram("runesmith_compile_job_queue_seconds", "Time from enqueue to worker pickup")
+
+
+class QueueFullError(Exception):
+    """The compile queue is at capacity - caller should back off"""
+
+
+class CallbackURLError(ValueError):
+    """Callback URL points at a host that is not allowed or not public"""
+
+
+@dataclass
+class CompileJob:
+    user_input: str
+    world_tier: int = 1
+    extra_vfx_budget: int = 0
+    owner_id: Optional[str] = None
+    callback_url: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | succeeded | failed
+    priority: int = 0
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def public(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("callback_url")
+        data.pop("owner_id")
+        return data
+
+
+def job_priority(world_tier: int, extra_vfx_budget: int) -> int:
+    """Higher world tiers first, then paid VFX budget (bounded to 0..599)"""
+    return max(1, min(world_tier, 5)) * 100 + max(0, min(extra_vfx_budget // 10, 99))
+
+
+# ── Backends ──
+
+class MemoryJobBackend:
+    def __init__(self, maxsize: int = COMPILE_QUEUE_MAX, ttl: int = COMPILE_JOB_TTL_SECONDS):
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._available = asyncio.Condition()
+        self._jobs: dict[str, CompileJob] = {}
+        self._done: dict[str, asyncio.Event] = {}
+        self._maxsize = maxsize
+        self._ttl = ttl
+
+    async def enqueue(self, job: CompileJob) -> int:
+        self._prune()
+        if len(self._heap) >= self._maxsize:
+            raise QueueFullError("Compile queue is full")
+        self._jobs[job.id] = job
+        self._done[job.id] = asyncio.Event()
+        async with self._available:
+            heapq.heappush(self._heap, (-job.priority, next(self._seq), job.id))
+            self._available.notify()
+        return len(self._heap)
+
+    async def dequeue(self) -> CompileJob:
+        async with self._available:
+            while not self._heap:
+                await self._available.wait()
+            _, _, job_id = heapq.heappop(self._heap)
+        return self._jobs[job_id]
+
+    async def save(self, job: CompileJob) -> None:
+        self._jobs[job.id] = job
+        if job.finished and job.id in self._done:
+            self._done[job.id].set()
+
+    async def get(self, job_id: str) -> Optional[CompileJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[CompileJob]:
+        event = self._done.get(job_id)
+        if event is not None and not event.is_set():
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._ttl
+        expired = [jid for jid, j in self._jobs.items() if j.finished and (j.finished_at or 0) < cutoff]
+        for jid in expired:
+            self._jobs.pop(jid, None)
+            self._done.pop(jid, None)
+
+
+_ENQUEUE_SCRIPT = """
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+  return -1
+end
+redis.call('SET', KEYS[2], ARGV[3], 'EX', tonumber(ARGV[4]))
+redis.call('ZADD', KEYS[1], tonumber(ARGV[2]), ARGV[5])
+return redis.call('ZCARD', KEYS[1])
+"""
+
+
+class RedisJobBackend:
+    """Queue is a sorted set scored by (-priority, enqueue time); jobs are JSON strings with a TTL"""
+
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, url: str, maxsize: int = COMPILE_QUEUE_MAX, ttl: int = COMPILE_JOB_TTL_SECONDS,
+                 prefix: str = "runesmith:compile:"):
+        import redis.asyncio as redis  # optional dependency, only needed with REDIS_URL
+
+        self._redis = redis.from_url(url)
+        self._enqueue = self._redis.register_script(_ENQUEUE_SCRIPT)
+        self._queue_key = prefix + "queue"
+        self._prefix = prefix + "job:"
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._depth = 0
+
+    async def enqueue(self, job: CompileJob) -> int:
+        # Score stays exact in a double for priority < 900 with millisecond timestamps
+        score = -job.priority * 10**13 + int(job.created_at * 1000)
+        depth = await self._enqueue(
+            keys=[self._queue_key, self._prefix + job.id],
+            args=[self._maxsize, score, json.dumps(asdict(job)), self._ttl, job.id],
+        )
+        if depth == -1:
+            raise QueueFullError("Compile queue is full")
+        self._depth = depth
+        return depth
+
+    async def dequeue(self) -> CompileJob:
+        while True:
+            popped = await self._redis.bzpopmin(self._queue_key, timeout=5)
+            if popped is None:
+                continue
+            job = await self.get(popped[1].decode())
+            if job is not None:  # record may have expired while queued
+                return job
+
+    async def save(self, job: CompileJob) -> None:
+        await self._redis.set(self._prefix + job.id, json.dumps(asdict(job)), ex=self._ttl)
+
+    async def get(self, job_id: str) -> Optional[CompileJob]:
+        raw = await self._redis.get(self._prefix + job_id)
+        return CompileJob(**json.loads(raw)) if raw else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[CompileJob]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None or job.finished or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def depth(self) -> int:
+        return self._depth  # last observed; exact depth is ZCARD on the queue key
+
+
+_backend = None
+
+
+def get_job_backend():
+    global _backend
+    if _backend is None:
+        url = os.getenv("REDIS_URL")
+        _backend = RedisJobBackend(url) if url else MemoryJobBackend()
+    return _backend
+
+
+QUEUE_DEPTH = gauge(
+    "runesmith_compile_queue_depth", "Compile jobs waiting",
+    collect=lambda: {(): get_job_backend().depth()} if _backend is not None else {},
+)
+
+
+# ── Callbacks ──
+
+def callback_host_allowed(host: str, allowed: tuple[str, ...] = COMPILE_CALLBACK_HOSTS) -> bool:
+    if not allowed:
+        return True
+    host = host.lower().rstrip(".")
+    return any(host == entry or (entry.startswith(".") and host.endswith(entry)) for entry in allowed)
+
+
+def public_address(address: str) -> bool:
+    """Globally routable unicast (rejects private, loopback, link-local, CGNAT, reserved, IPv4-mapped internal)"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve_callback(url: str) -> str:
+    """The address a callback URL may be sent to; raises CallbackURLError otherwise"""
+    parts = urlsplit(url)
+    host = parts.hostname
+    if parts.scheme not in ("http", "https") or not host:
+        raise CallbackURLError("Callback URL must be http(s) with a host")
+    if not callback_host_allowed(host):
+        raise CallbackURLError(f"Callback host {host} is not allowed")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError) as e:
+        raise CallbackURLError(f"Cannot resolve callback host {host}: {e}") from None
+    addresses = [info[4][0] for info in infos]
+    blocked = [address for address in addresses if not public_address(address)]
+    if not addresses or blocked:
+        raise CallbackURLError(f"Callback host {host} resolves to a non-public address")
+    return addresses[0]
+
+
+async def _notify(job: CompileJob) -> None:
+    if not (COMPILE_CALLBACKS_ENABLED and job.callback_url):
+        return
+    import httpx
+
+    try:
+        address = await resolve_callback(job.callback_url)
+        parts = urlsplit(job.callback_url)
+        # Connect to the checked address; Host header and TLS SNI/verification keep the original name
+        netloc = f"[{address}]" if ":" in address else address
+        if parts.port:
+            netloc = f"{netloc}:{parts.port}"
+        pinned = urlunsplit((parts.scheme, netloc, parts.path, parts.query, ""))
+        host = parts.hostname if not parts.port else f"{parts.hostname}:{parts.port}"
+        async with httpx.AsyncClient(timeout=5.0, follow_redirects=False) as client:
+            await client.post(
+                pinned,
+                json=job.public(),
+                headers={"Host": host},
+                extensions={"sni_hostname": parts.hostname},
+            )
+    except Exception as e:
+        print(f"[WARN] Compile job {job.id} callback failed: {e}")
+
+
+# ── Workers ──
+
+async def submit(job: CompileJob) -> int:
+    """Enqueue a job (raises QueueFullError when saturated); returns queue depth"""
+    job.priority = job_priority(job.world_tier, job.extra_vfx_budget)
+    return await get_job_backend().enqueue(job)
+
+
+async def _run_job(job: CompileJob) -> None:
+    from app.services.llm_compiler import TokenUsage, get_compiler
+
+    backend = get_job_backend()
+    job.status = "running"
+    job.started_at = time.time()
+    JOB_WAIT.observe(job.started_at - job.created_at)
+    await backend.save(job)
+
+    try:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY not set")
+        usage = TokenUsage()
+        llm_output = await get_compiler(api_key).compile(job.user_input, usage)
+        job.result = {
+            "llm_output": llm_output,
+            "world_tier": job.world_tier,
+            "extra_vfx_budget": job.extra_vfx_budget,
+            "usage": usage.as_dict(),
+        }
+        job.status = "succeeded"
+    except asyncio.CancelledError:
+        job.status, job.error = "failed", "worker shutting down"
+        raise
+    except Exception as e:
+        job.status, job.error = "failed", str(e)
+    finally:
+        job.finished_at = time.time()
+        JOBS_TOTAL.inc(job.status)
+        await asyncio.shield(backend.save(job))
+    await _notify(job)
+
+
+async def worker_loop(worker_id: int) -> None:
+    backend = get_job_backend()
+    while True:
+        job = await backend.dequeue()
+        try:
+            await _run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Compile worker {worker_id} failed on job {job.id}: {e}")
+
+
+def start_workers(count: int = COMPILE_WORKERS) -> list[asyncio.Task]:
+    return [asyncio.create_task(worker_loop(i)) for i in range(count)]
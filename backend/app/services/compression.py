@@ -0,0 +1,247 @@
+"""
+Response compression and conditional GET - pure ASGI middleware
+
+Buffered (non-streaming) responses above COMPRESSION_MIN_BYTES are encoded
+with the best codec both sides support, server preference zstd > br > gzip.
+brotli and zstandard are optional packages; without them only gzip is offered.
+The level is picked by payload size: small bodies compress fast at any level,
+so they get a strong one, while large bodies get a cheap one to keep CPU per
+request bounded. Bodies above COMPRESSION_THREAD_BYTES compress off the loop.
+
+The middleware also answers If-None-Match on GET/HEAD with 304 whenever the
+response carries a matching ETag, so every route that sets one gets
+revalidation for free. Routes that can compute their ETag before building the
+body (app.api.responses.cached_json) return the 304 themselves and skip
+serialization as well.
+"""
+import asyncio
+import gzip
+import os
+import re
+from typing import Callable, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.services.metrics import counter
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_THREAD_BYTES = int(os.getenv("COMPRESSION_THREAD_BYTES", "262144"))
+
+SERVER_PREFERENCE = ("zstd", "br", "gzip")
+
+# (max payload bytes, level) per codec, smallest payloads first
+COMPRESSION_LEVELS = {
+    "zstd": ((16_384, 9), (262_144, 3), (None, 1)),
+    "br": ((16_384, 6), (262_144, 4), (None, 1)),
+    "gzip": ((16_384, 6), (262_144, 4), (None, 1)),
+}
+
+# Row-version tags (app.api.responses.version_etag) identify a row state, not bytes
+ROW_VERSION_ETAG = re.compile(r'^"v\d+"$')
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+COMPRESSED_BYTES = counter(
+    "runesmith_http_compression_bytes_total", "Response bytes before/after compression", ("encoding", "stage")
+)
+NOT_MODIFIED = counter("runesmith_http_not_modified_total", "Conditional GETs answered with 304", ("source",))
+
+
+# ── Codecs ──
+
+_codecs: Optional[dict[str, Callable[[bytes, int], bytes]]] = None
+
+
+def available_codecs() -> dict[str, Callable[[bytes, int], bytes]]:
+    """Codec name -> compress(data, level), built once; optional packages are probed here"""
+    global _codecs
+    if _codecs is not None:
+        return _codecs
+
+    codecs: dict[str, Callable[[bytes, int], bytes]] = {
+        "gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    }
+    try:
+        import brotli
+
+        codecs["br"] = lambda data, level: brotli.compress(data, quality=level)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        compressors: dict[int, "zstandard.ZstdCompressor"] = {}
+
+        def zstd_compress(data: bytes, level: int) -> bytes:
+            compressor = compressors.get(level)
+            if compressor is None:
+                compressor = compressors[level] = zstandard.ZstdCompressor(level=level)
+            return compressor.compress(data)
+
+        codecs["zstd"] = zstd_compress
+    except ImportError:
+        pass
+    _codecs = codecs
+    return codecs
+
+
+def compression_level(encoding: str, size: int) -> int:
+    for limit, level in COMPRESSION_LEVELS[encoding]:
+        if limit is None or size <= limit:
+            return level
+    return COMPRESSION_LEVELS[encoding][-1][1]
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if level is None:
+        level = compression_level(encoding, len(data))
+    return available_codecs()[encoding](data, level)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Best available coding for an Accept-Encoding header, or None for identity.
+
+    Highest q-value wins; ties go to SERVER_PREFERENCE. "*" covers codings
+    the header does not name.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    codecs = available_codecs()
+    best, best_q = None, 0.0
+    for name in SERVER_PREFERENCE:
+        if name not in codecs:
+            continue
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+# ── Validators ──
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored on both sides"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _weaken(etag: str) -> str:
+    # A compressed body is a different representation: a strong tag would claim byte equality.
+    # Row-version tags stay strong, since If-Match writes need them back unchanged.
+    if etag.startswith("W/") or ROW_VERSION_ETAG.match(etag):
+        return etag
+    return f"W/{etag}"
+
+
+# ── Middleware ──
+
+class CompressionMiddleware:
+    """
+    Buffers the response, then turns it into a 304 or compresses it.
+
+    Streaming responses (first body message with more_body) pass through
+    untouched, as do bodies that already have a Content-Encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+            elif name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if scope["method"] not in ("GET", "HEAD"):
+            if_none_match = None
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if message.get("more_body", False):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            await self._finish(start_message, message.get("body", b""), encoding, if_none_match, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _finish(self, start_message, body: bytes, encoding: Optional[str],
+                      if_none_match: Optional[str], send) -> None:
+        headers = MutableHeaders(scope=start_message)
+        status_code = start_message["status"]
+
+        etag = headers.get("etag")
+        if if_none_match and status_code == 200 and etag and etag_matches(if_none_match, etag):
+            NOT_MODIFIED.inc("middleware")
+            headers.add_vary_header("Accept-Encoding")
+            for name in ("content-length", "content-type", "content-encoding"):
+                if name in headers:
+                    del headers[name]
+            await send({**start_message, "status": 304})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        content_type = headers.get("content-type", "")
+        if status_code == 304:  # answered by the route (cached_json)
+            headers.add_vary_header("Accept-Encoding")
+        elif (
+            200 <= status_code < 300
+            and status_code != 204
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            headers.add_vary_header("Accept-Encoding")
+            if encoding and len(body) >= self.minimum_size:
+                if len(body) > COMPRESSION_THREAD_BYTES:
+                    compressed = await asyncio.to_thread(compress, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    COMPRESSED_BYTES.inc(encoding, "in", amount=len(body))
+                    COMPRESSED_BYTES.inc(encoding, "out", amount=len(compressed))
+                    body = compressed
+                    headers["content-encoding"] = encoding
+                    headers["content-length"] = str(len(body))
+                    if etag:
+                        headers["etag"] = _weaken(etag)
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,99 @@
+"""
+Liveness / readiness checks
+
+Readiness is computed from cheap in-process signals first (pool saturation)
+and only then from a cached `SELECT 1`, so frequent probes from the load
+balancer do not turn into a query per probe.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.database.migrations import schema_status
+from app.database.session import engine
+
+READY_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "5"))
+READY_FAILURE_CACHE_SECONDS = float(os.getenv("READINESS_FAILURE_CACHE_SECONDS", "1"))
+DB_PROBE_TIMEOUT_SECONDS = float(os.getenv("READINESS_DB_TIMEOUT", "1.0"))
+POOL_SATURATION_LIMIT = float(os.getenv("READINESS_POOL_SATURATION", "0.9"))
+
+
+def pool_status() -> Optional[dict]:
+    """Checked-out vs capacity for QueuePool engines; None for NullPool"""
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "capacity": capacity,
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
+
+
+class DatabaseProbe:
+    """`SELECT 1` with a timeout, cached and single-flight across concurrent callers"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._checked_at = 0.0
+        self._result: dict = {"ok": False, "error": "not checked yet"}
+
+    def _fresh(self) -> bool:
+        ttl = READY_CACHE_SECONDS if self._result["ok"] else READY_FAILURE_CACHE_SECONDS
+        return time.monotonic() - self._checked_at < ttl
+
+    async def check(self) -> dict:
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if self._fresh():  # another probe refreshed it while we waited
+                return self._result
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._select_one(), timeout=DB_PROBE_TIMEOUT_SECONDS)
+                self._result = {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+            except asyncio.TimeoutError:
+                self._result = {"ok": False, "error": f"timeout after {DB_PROBE_TIMEOUT_SECONDS}s"}
+            except Exception as e:
+                self._result = {"ok": False, "error": str(e)[:200]}
+            self._checked_at = time.monotonic()
+            return self._result
+
+    @staticmethod
+    async def _select_one() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+
+db_probe = DatabaseProbe()
+
+
+def llm_status() -> dict:
+    # Imported lazily: the breaker lives with the OpenAI client module
+    from app.services.llm_compiler import LLM_BREAKER
+
+    return {"configured": bool(os.getenv("OPENAI_API_KEY")), "breaker": LLM_BREAKER.snapshot()}
+
+
+async def readiness() -> tuple[bool, dict]:
+    """(ready, report) - a saturated pool fails fast without touching the DB"""
+    pool = pool_status()
+    if pool is not None and pool["saturation"] >= POOL_SATURATION_LIMIT:
+        database = {"ok": False, "error": "connection pool saturated", "skipped": True}
+    else:
+        database = await db_probe.check()
+
+    ready = database["ok"]
+    return ready, {
+        "status": "ready" if ready else "unavailable",
+        "database": database,
+        "pool": pool,
+        "schema": schema_status,
+        "llm": llm_status(),
+    }
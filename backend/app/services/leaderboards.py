@@ -0,0 +1,421 @@
+"""
+Leaderboards - incrementally maintained top-K boards
+
+Boards:
+- skills:{tier}:{material|all}          saved skills by combat budget efficiency (budget / tier max)
+- listings_sales:{tier}:{material|all}  active listings by purchases
+- listings_rating:{tier}:{material|all} active listings by Bayesian rating
+- sellers:sales                         sellers by total sales
+
+Backends:
+- MemoryLeaderboards: per-process bounded sorted lists, snapshotted to
+                      leaderboard_entries and reloaded on boot (default).
+                      With several workers each serves its own copy until
+                      the next rebuild; set REDIS_URL to share one.
+- RedisLeaderboards:  sorted sets shared by all workers (used when REDIS_URL is set)
+
+Save/buy/rate/cancel and the expiry sweeper update the boards in place; a
+periodic rebuild from the source tables corrects drift (members evicted from
+a full board, updates lost to a failed hook).
+"""
+import asyncio
+import heapq
+import os
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database.session import AsyncSessionLocal
+from app.models import LeaderboardEntry, MarketListing, Skill
+
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "1000"))  # deepest rank served
+LEADERBOARD_CAPACITY = LEADERBOARD_SIZE * 2  # buffer so score drops do not immediately hide members
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("LEADERBOARD_SNAPSHOT_INTERVAL", "60"))
+REBUILD_INTERVAL_SECONDS = float(os.getenv("LEADERBOARD_REBUILD_INTERVAL", "3600"))
+
+LEADERBOARD_LOCK_ID = 0x52534C42  # one snapshot writer at a time across workers
+
+SELLERS_BOARD = "sellers:sales"
+LISTING_METRICS = ("sales", "rating")
+
+
+# Board keys of a listing's skill, for RETURNING clauses of listing UPDATEs
+LISTING_TIER = (
+    select(Skill.world_tier).where(Skill.id == MarketListing.skill_id).correlate(MarketListing).scalar_subquery()
+)
+LISTING_MATERIAL = (
+    select(Skill.vfx["material"].as_string())
+    .where(Skill.id == MarketListing.skill_id)
+    .correlate(MarketListing)
+    .scalar_subquery()
+)
+
+
+def skill_board(world_tier: int, material: Optional[str] = None) -> str:
+    return f"skills:{world_tier}:{material or 'all'}"
+
+
+def listing_board(metric: str, world_tier: int, material: Optional[str] = None) -> str:
+    return f"listings_{metric}:{world_tier}:{material or 'all'}"
+
+
+def budget_efficiency(combat_budget: float, combat_budget_max: float) -> float:
+    return combat_budget / combat_budget_max if combat_budget_max else 0.0
+
+
+# ── Backends ──
+
+class TopK:
+    """Scores by member plus a list sorted by (-score, member): O(log K) rank, O(1) page slicing"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.scores: dict[str, float] = {}
+        self.order: list[tuple[float, str]] = []
+
+    def set(self, member: str, score: float) -> None:
+        old = self.scores.get(member)
+        if old is not None:
+            if old == score:
+                return
+            del self.order[bisect_left(self.order, (-old, member))]
+        elif len(self.order) >= self.capacity and (-score, member) >= self.order[-1]:
+            return  # below the cut
+        self.scores[member] = score
+        insort(self.order, (-score, member))
+        if len(self.order) > self.capacity:
+            _, evicted = self.order.pop()
+            del self.scores[evicted]
+
+    def remove(self, member: str) -> None:
+        old = self.scores.pop(member, None)
+        if old is not None:
+            del self.order[bisect_left(self.order, (-old, member))]
+
+    def rank(self, member: str) -> Optional[int]:
+        score = self.scores.get(member)
+        return None if score is None else bisect_left(self.order, (-score, member))
+
+    def page(self, offset: int, limit: int) -> list[tuple[str, float]]:
+        return [(member, -neg) for neg, member in self.order[offset:offset + limit]]
+
+
+class MemoryLeaderboards:
+    def __init__(self, capacity: int = LEADERBOARD_CAPACITY):
+        self._boards: dict[str, TopK] = defaultdict(lambda: TopK(capacity))
+        self.dirty: set[str] = set()
+
+    async def set(self, board: str, member: str, score: float) -> None:
+        self._boards[board].set(member, score)
+        self.dirty.add(board)
+
+    async def incr(self, board: str, member: str, delta: float) -> None:
+        top = self._boards[board]
+        top.set(member, top.scores.get(member, 0.0) + delta)
+        self.dirty.add(board)
+
+    async def remove(self, board: str, member: str) -> None:
+        if board in self._boards:
+            self._boards[board].remove(member)
+            self.dirty.add(board)
+
+    async def page(self, board: str, offset: int, limit: int) -> list[tuple[str, float]]:
+        top = self._boards.get(board)
+        return top.page(offset, limit) if top else []
+
+    async def rank(self, board: str, member: str) -> Optional[int]:
+        top = self._boards.get(board)
+        return top.rank(member) if top else None
+
+    async def size(self, board: str) -> int:
+        top = self._boards.get(board)
+        return min(len(top.order), LEADERBOARD_SIZE) if top else 0
+
+    async def replace(self, board: str, entries: list[tuple[str, float]]) -> None:
+        top = TopK(self._boards[board].capacity)
+        for member, score in entries:
+            top.set(member, score)
+        self._boards[board] = top
+        self.dirty.add(board)
+
+    def entries(self, board: str) -> list[tuple[str, float]]:
+        return self._boards[board].page(0, LEADERBOARD_CAPACITY)
+
+
+class RedisLeaderboards:
+    """One sorted set per board, trimmed to LEADERBOARD_CAPACITY after writes"""
+
+    def __init__(self, url: str, prefix: str = "runesmith:lb:"):
+        import redis.asyncio as redis  # optional dependency, only needed with REDIS_URL
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    def _key(self, board: str) -> str:
+        return self._prefix + board
+
+    async def _write(self, board: str, op) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            op(pipe, self._key(board))
+            pipe.zremrangebyrank(self._key(board), 0, -(LEADERBOARD_CAPACITY + 1))
+            await pipe.execute()
+
+    async def set(self, board: str, member: str, score: float) -> None:
+        await self._write(board, lambda pipe, key: pipe.zadd(key, {member: score}))
+
+    async def incr(self, board: str, member: str, delta: float) -> None:
+        await self._write(board, lambda pipe, key: pipe.zincrby(key, delta, member))
+
+    async def remove(self, board: str, member: str) -> None:
+        await self._redis.zrem(self._key(board), member)
+
+    async def page(self, board: str, offset: int, limit: int) -> list[tuple[str, float]]:
+        rows = await self._redis.zrevrange(self._key(board), offset, offset + limit - 1, withscores=True)
+        return [(member.decode(), score) for member, score in rows]
+
+    async def rank(self, board: str, member: str) -> Optional[int]:
+        return await self._redis.zrevrank(self._key(board), member)
+
+    async def size(self, board: str) -> int:
+        return min(await self._redis.zcard(self._key(board)), LEADERBOARD_SIZE)
+
+    async def replace(self, board: str, entries: list[tuple[str, float]]) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(board))
+            if entries:
+                pipe.zadd(self._key(board), dict(entries))
+            await pipe.execute()
+
+    async def claim_rebuild(self, ttl: float) -> bool:
+        """Only one worker per interval rebuilds the shared boards"""
+        return bool(await self._redis.set(self._prefix + "rebuilt", "1", nx=True, ex=max(int(ttl), 1)))
+
+
+_backend = None
+
+
+def get_leaderboards():
+    global _backend
+    if _backend is None:
+        url = os.getenv("REDIS_URL")
+        _backend = RedisLeaderboards(url) if url else MemoryLeaderboards()
+    return _backend
+
+
+# ── Event hooks (called after the write commits) ──
+
+async def _apply(updates) -> None:
+    """Leaderboards are derived data: a failed update is logged, never surfaced to the request"""
+    backend = get_leaderboards()
+    try:
+        for method, *args in updates:
+            await getattr(backend, method)(*args)
+    except Exception as e:
+        print(f"[WARN] Leaderboard update failed: {e}")
+
+
+async def record_skill(skill_pk: int, world_tier: int, material: Optional[str],
+                       combat_budget: float, combat_budget_max: float) -> None:
+    score = budget_efficiency(combat_budget, combat_budget_max)
+    await _apply([
+        ("set", skill_board(world_tier, material), str(skill_pk), score),
+        ("set", skill_board(world_tier), str(skill_pk), score),
+    ])
+
+
+async def record_sale(listing_id: int, seller_id: int, world_tier: int, material: Optional[str],
+                      purchases: int) -> None:
+    member = str(listing_id)
+    await _apply([
+        ("set", listing_board("sales", world_tier, material), member, purchases),
+        ("set", listing_board("sales", world_tier), member, purchases),
+        ("incr", SELLERS_BOARD, str(seller_id), 1),
+    ])
+
+
+async def record_rating(listing_id: int, world_tier: int, material: Optional[str], bayesian_rating: float) -> None:
+    member = str(listing_id)
+    await _apply([
+        ("set", listing_board("rating", world_tier, material), member, bayesian_rating),
+        ("set", listing_board("rating", world_tier), member, bayesian_rating),
+    ])
+
+
+async def record_listing(listing_id: int, world_tier: int, material: Optional[str],
+                         purchases: int, bayesian_rating: float) -> None:
+    """A listing (re)entering the market"""
+    member = str(listing_id)
+    await _apply([
+        ("set", listing_board(metric, world_tier, m), member, score)
+        for metric, score in (("sales", purchases), ("rating", bayesian_rating))
+        for m in (material, None)
+    ])
+
+
+async def remove_listing(listing_id: int, world_tier: int, material: Optional[str]) -> None:
+    member = str(listing_id)
+    await _apply([
+        ("remove", listing_board(metric, world_tier, m), member)
+        for metric in LISTING_METRICS for m in (material, None)
+    ])
+
+
+# ── Rebuild / snapshot ──
+
+# Top rows per (tier, material) partition; the "all" boards are merged from these,
+# since a tier's global top-K is contained in the union of its per-material top-Ks
+_SKILLS_TOP = text("""
+SELECT member, world_tier, material, score FROM (
+    SELECT s.id::text AS member, s.world_tier, s.vfx->>'material' AS material,
+           s.combat_budget / NULLIF(s.combat_budget_max, 0) AS score,
+           row_number() OVER (
+               PARTITION BY s.world_tier, s.vfx->>'material'
+               ORDER BY s.combat_budget / NULLIF(s.combat_budget_max, 0) DESC NULLS LAST
+           ) AS rn
+    FROM skills s
+    WHERE NOT EXISTS (SELECT 1 FROM transactions t WHERE t.buyer_skill_id = s.id)  -- originals, not bought copies
+) ranked
+WHERE rn <= :capacity AND score IS NOT NULL
+""")
+
+_LISTINGS_TOP = """
+SELECT member, world_tier, material, score FROM (
+    SELECT l.id::text AS member, s.world_tier, s.vfx->>'material' AS material, {score} AS score,
+           row_number() OVER (PARTITION BY s.world_tier, s.vfx->>'material' ORDER BY {score} DESC) AS rn
+    FROM market_listings l JOIN skills s ON s.id = l.skill_id
+    WHERE l.status = 'ACTIVE'
+) ranked
+WHERE rn <= :capacity
+"""
+_LISTINGS_TOP_BY = {
+    "sales": text(_LISTINGS_TOP.format(score="l.purchases")),
+    "rating": text(_LISTINGS_TOP.format(score="l.bayesian_rating")),
+}
+
+_SELLERS_TOP = text("""
+SELECT scope_id::text AS member, sales AS score FROM stats_rollups
+WHERE scope = 'SELLER' AND granularity = 'ALL'
+ORDER BY sales DESC
+LIMIT :capacity
+""")
+
+
+def _partitioned(rows, board_for) -> dict[str, list[tuple[str, float]]]:
+    boards: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    per_tier: dict[int, list[tuple[str, float]]] = defaultdict(list)
+    for row in rows:
+        boards[board_for(row.world_tier, row.material)].append((row.member, float(row.score)))
+        per_tier[row.world_tier].append((row.member, float(row.score)))
+    for tier, entries in per_tier.items():
+        boards[board_for(tier, None)] = heapq.nlargest(LEADERBOARD_CAPACITY, entries, key=lambda e: e[1])
+    return boards
+
+
+async def rebuild() -> int:
+    """Recompute every board from the source tables (off the request path)"""
+    params = {"capacity": LEADERBOARD_CAPACITY}
+    async with AsyncSessionLocal() as db:
+        boards = _partitioned((await db.execute(_SKILLS_TOP, params)).all(), skill_board)
+        for metric, query in _LISTINGS_TOP_BY.items():
+            boards.update(_partitioned(
+                (await db.execute(query, params)).all(),
+                lambda tier, material, metric=metric: listing_board(metric, tier, material),
+            ))
+        boards[SELLERS_BOARD] = [(r.member, float(r.score)) for r in (await db.execute(_SELLERS_TOP, params)).all()]
+
+    backend = get_leaderboards()
+    for board, entries in boards.items():
+        await backend.replace(board, entries)
+    return len(boards)
+
+
+async def snapshot() -> int:
+    """
+    Persist boards changed since the last snapshot (memory backend only).
+
+    Rows are upserted under a transaction-scoped advisory lock, then members
+    that left a board are deleted, so workers snapshotting the same board
+    take turns instead of colliding on (board, member). Boards go back into
+    the dirty set when the lock is taken or the write fails.
+    """
+    backend = get_leaderboards()
+    if not isinstance(backend, MemoryLeaderboards) or not backend.dirty:
+        return 0
+    dirty, backend.dirty = backend.dirty, set()
+    now = datetime.utcnow()
+    rows = [
+        {"board": board, "member": member, "score": score, "updated_at": now}
+        for board in dirty for member, score in backend.entries(board)
+    ]
+    try:
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                lock = text("SELECT pg_try_advisory_xact_lock(:id)")
+                if not (await db.execute(lock, {"id": LEADERBOARD_LOCK_ID})).scalar():
+                    backend.dirty |= dirty
+                    return 0
+                if rows:
+                    stmt = pg_insert(LeaderboardEntry)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[LeaderboardEntry.board, LeaderboardEntry.member],
+                        set_={"score": stmt.excluded.score, "updated_at": stmt.excluded.updated_at},
+                    )
+                    await db.execute(stmt, rows)
+                await db.execute(
+                    delete(LeaderboardEntry).where(
+                        LeaderboardEntry.board.in_(sorted(dirty)),
+                        LeaderboardEntry.updated_at != now,
+                    )
+                )
+    except BaseException:
+        backend.dirty |= dirty
+        raise
+    return len(dirty)
+
+
+async def load_snapshot() -> int:
+    backend = get_leaderboards()
+    boards: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(LeaderboardEntry.board, LeaderboardEntry.member, LeaderboardEntry.score))
+        for board, member, score in result:
+            boards[board].append((member, score))
+    for board, entries in boards.items():
+        await backend.replace(board, entries)
+    if isinstance(backend, MemoryLeaderboards):
+        backend.dirty.clear()
+    return len(boards)
+
+
+async def run_leaderboards() -> None:
+    """Background loop from the app lifespan: warm, then snapshot and periodically rebuild"""
+    backend = get_leaderboards()
+    last_rebuild = 0.0
+    try:
+        if isinstance(backend, MemoryLeaderboards):
+            if await load_snapshot() == 0:
+                await rebuild()
+            last_rebuild = time.monotonic()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[WARN] Leaderboard warm-up failed: {e}")
+
+    while True:
+        try:
+            if time.monotonic() - last_rebuild >= REBUILD_INTERVAL_SECONDS:
+                if isinstance(backend, MemoryLeaderboards) or await backend.claim_rebuild(REBUILD_INTERVAL_SECONDS):
+                    boards = await rebuild()
+                    print(f"[OK] Leaderboards rebuilt ({boards} boards)")
+                last_rebuild = time.monotonic()
+            await snapshot()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Leaderboard maintenance failed: {e}")
+        await asyncio.sleep(SNAPSHOT_INTERVAL_SECONDS)
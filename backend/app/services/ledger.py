@@ -0,0 +1,313 @@
+"""
+Transaction ledger - monthly partitions, keyset purchase history, cold archival
+
+transactions is range-partitioned by month (migration 0006). The maintenance
+loop keeps TRANSACTION_PARTITIONS_AHEAD months of partitions ready (moving
+any rows transactions_default already caught for a new month into it) and,
+when enabled, archives partitions older than TRANSACTION_RETENTION_MONTHS:
+
+    detach -> COPY TO STDOUT streamed into <dir>/transactions_pYYYYMM.csv.gz
+           -> row count check -> manifest.jsonl entry -> drop
+
+The export is chunked straight from the COPY stream into gzip, so memory use
+does not depend on partition size. A failed export re-attaches the partition.
+Archived purchases no longer count for rating eligibility or for telling
+bought copies apart in leaderboard rebuilds.
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database.session import engine
+from app.models import Transaction, Skill
+
+TRANSACTION_PARTITIONS_AHEAD = int(os.getenv("TRANSACTION_PARTITIONS_AHEAD", "3"))
+TRANSACTION_RETENTION_MONTHS = int(os.getenv("TRANSACTION_RETENTION_MONTHS", "24"))
+TRANSACTION_ARCHIVE_ENABLED = os.getenv("TRANSACTION_ARCHIVE_ENABLED", "false").lower() == "true"
+TRANSACTION_ARCHIVE_DIR = Path(os.getenv("TRANSACTION_ARCHIVE_DIR", "archive/transactions"))
+TRANSACTION_ARCHIVE_GZIP_LEVEL = int(os.getenv("TRANSACTION_ARCHIVE_GZIP_LEVEL", "6"))
+LEDGER_MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("LEDGER_MAINTENANCE_INTERVAL", "21600"))
+
+PARTITION_PREFIX = "transactions_p"
+DEFAULT_PARTITION = "transactions_default"
+LEDGER_LOCK_ID = 0x52534C47  # one maintainer at a time across workers
+_PARTITION_NAME = re.compile(r"^transactions_p(\d{4})(\d{2})$")
+
+
+class CursorError(ValueError):
+    """Malformed purchase-history cursor"""
+
+
+# ── Months and partition DDL ──
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_between(first: date, last: date) -> Iterator[date]:
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_bounds(month: date) -> str:
+    return f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+def create_partition_sql(month: date) -> str:
+    """Idempotent DDL for one month (also used by benchmarks.datagen before backdated COPYs)"""
+    return f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF transactions {partition_bounds(month)}"
+
+
+async def ensure_partitions(conn: AsyncConnection, since: Optional[date] = None,
+                            months_ahead: int = TRANSACTION_PARTITIONS_AHEAD) -> int:
+    """Create any missing monthly partitions from `since` (default: this month) to months_ahead"""
+    this_month = month_start(date.today())
+    existing = {name for name, _ in await list_partitions(conn)}
+    created = 0
+    for month in months_between(since or this_month, add_months(this_month, months_ahead)):
+        if partition_name(month) in existing:
+            continue
+        if await _default_has_rows(conn, month):
+            await _split_default(conn, month)
+        else:
+            await conn.execute(text(create_partition_sql(month)))
+        created += 1
+    return created
+
+
+async def _default_has_rows(conn: AsyncConnection, month: date) -> bool:
+    result = await conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi)"),
+        {"lo": month, "hi": add_months(month, 1)},
+    )
+    return bool(result.scalar())
+
+
+async def _split_default(conn: AsyncConnection, month: date) -> None:
+    """
+    Create a month's partition when transactions_default already holds rows for it.
+
+    Postgres refuses to add a partition whose range has rows in the default
+    partition, so the default is detached, the partition created, the rows
+    moved across and the default re-attached (which re-checks it), all in the
+    caller's transaction. Writes to transactions wait until it commits.
+    """
+    name = partition_name(month)
+    bounds = {"lo": month, "hi": add_months(month, 1)}
+    await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    await conn.execute(text(f"ALTER TABLE transactions DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF transactions {partition_bounds(month)}"))
+    moved = await conn.execute(
+        text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """),
+        bounds,
+    )
+    await conn.execute(text(f"ALTER TABLE transactions ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    print(f"[OK] Moved {moved.rowcount} rows from {DEFAULT_PARTITION} into new partition {name}")
+
+
+async def list_partitions(conn: AsyncConnection) -> list[tuple[str, date]]:
+    """Attached monthly partitions, oldest first (the default partition is not listed)"""
+    result = await conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'transactions'::regclass
+    """))
+    partitions = []
+    for (name,) in result:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def cold_partitions(partitions: list[tuple[str, date]], today: Optional[date] = None,
+                    retention_months: int = TRANSACTION_RETENTION_MONTHS) -> list[tuple[str, date]]:
+    """Partitions whose whole month lies before the retention window"""
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    return [(name, month) for name, month in partitions if add_months(month, 1) <= cutoff]
+
+
+# ── Purchase history (keyset pagination) ──
+
+def encode_cursor(created_at: datetime, transaction_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, transaction_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError("Invalid cursor") from None
+
+
+async def purchase_history(db: AsyncSession, buyer_id: int, limit: int,
+                           cursor: Optional[str] = None) -> tuple[list, Optional[str]]:
+    """
+    One page of a buyer's purchases, newest first, and the cursor of the next page.
+
+    The (created_at, id) bound lets Postgres prune partitions newer than the
+    cursor and walk ix_transactions_buyer_created without an OFFSET.
+    """
+    query = (
+        select(
+            Transaction.id,
+            Transaction.listing_id,
+            Transaction.amount,
+            Transaction.currency_type,
+            Transaction.created_at,
+            Skill.skill_id,
+            Skill.name,
+            Skill.world_tier,
+        )
+        .outerjoin(Skill, Skill.id == Transaction.buyer_skill_id)
+        .where(Transaction.buyer_id == buyer_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, transaction_id = decode_cursor(cursor)
+        query = query.where(tuple_(Transaction.created_at, Transaction.id) < (created_at, transaction_id))
+
+    rows = (await db.execute(query)).all()
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# ── Archival ──
+
+class _HashingWriter:
+    """File wrapper that hashes the (compressed) bytes as they are written"""
+
+    def __init__(self, f):
+        self._f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+async def _export(name: str, path: Path) -> tuple[int, str]:
+    """Stream one table through COPY into gzip; returns (rows, sha256 of the file)"""
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        with open(path, "wb") as f:
+            sink = _HashingWriter(f)
+            with gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=TRANSACTION_ARCHIVE_GZIP_LEVEL, mtime=0) as gz:
+
+                async def write_chunk(chunk: bytes) -> None:
+                    # Compression and disk writes off the event loop, one COPY chunk at a time
+                    await asyncio.to_thread(gz.write, chunk)
+
+                status = await raw.driver_connection.copy_from_table(
+                    name, output=write_chunk, format="csv", header=True
+                )
+            f.flush()
+            os.fsync(f.fileno())
+    return int(status.split()[-1]), sink.digest.hexdigest()
+
+
+async def archive_partition(name: str, month: date, archive_dir: Path = TRANSACTION_ARCHIVE_DIR) -> dict:
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    final = archive_dir / f"{name}.csv.gz"
+    partial = archive_dir / f"{name}.csv.gz.partial"
+
+    # Detached first: the export then reads a table nothing else can write to
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        await conn.execute(text(f"ALTER TABLE transactions DETACH PARTITION {name}"))
+    try:
+        async with engine.connect() as conn:
+            expected = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+        rows, sha256 = await _export(name, partial)
+        if rows != expected:
+            raise RuntimeError(f"{name}: exported {rows} rows, table has {expected}")
+        os.replace(partial, final)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"ALTER TABLE transactions ATTACH PARTITION {name} {partition_bounds(month)}"))
+        raise
+
+    entry = {
+        "partition": name,
+        "from": month.isoformat(),
+        "to": add_months(month, 1).isoformat(),
+        "rows": rows,
+        "file": final.name,
+        "bytes": final.stat().st_size,
+        "sha256": sha256,
+        "archived_at": datetime.utcnow().isoformat(),
+    }
+    with open(archive_dir / "manifest.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {name}"))
+    return entry
+
+
+async def maintain_ledger() -> dict:
+    """Create upcoming partitions and archive cold ones; a no-op while another worker holds the lock"""
+    async with engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": LEDGER_LOCK_ID})).scalar()
+        await lock_conn.commit()
+        if not locked:
+            return {"created": 0, "archived": []}
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_partitions(conn)
+                cold = cold_partitions(await list_partitions(conn)) if TRANSACTION_ARCHIVE_ENABLED else []
+            archived = [await archive_partition(name, month) for name, month in cold]
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": LEDGER_LOCK_ID})
+            await lock_conn.commit()
+    return {"created": created, "archived": archived}
+
+
+async def run_ledger_maintenance(interval: float = LEDGER_MAINTENANCE_INTERVAL_SECONDS) -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown"""
+    while True:
+        try:
+            report = await maintain_ledger()
+            if report["created"]:
+                print(f"[OK] Created {report['created']} transaction partitions")
+            for entry in report["archived"]:
+                print(f"[OK] Archived {entry['partition']} ({entry['rows']} rows, {entry['bytes']} bytes)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Ledger maintenance failed: {e}")
+        await asyncio.sleep(interval)
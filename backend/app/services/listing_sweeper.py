@@ -0,0 +1,81 @@
+"""
+Listing sweeper - moves stale ACTIVE listings to EXPIRED in small batches
+"""
+import asyncio
+import os
+from datetime import datetime
+
+from sqlalchemy import select, update, text
+
+from app.database.session import AsyncSessionLocal
+from app.models import MarketListing, ListingStatus
+from app.services import leaderboards
+
+SWEEP_INTERVAL_SECONDS = float(os.getenv("LISTING_SWEEP_INTERVAL", "60"))
+SWEEP_BATCH_SIZE = int(os.getenv("LISTING_SWEEP_BATCH_SIZE", "500"))
+SWEEP_MAX_BATCHES = int(os.getenv("LISTING_SWEEP_MAX_BATCHES", "20"))
+
+
+async def expire_batch(batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Expire up to `batch_size` overdue listings in one short transaction.
+
+        UPDATE market_listings SET status = 'EXPIRED'
+        WHERE id IN (SELECT id ... LIMIT n FOR UPDATE SKIP LOCKED)
+
+    Rows locked by a concurrent buy/cancel are skipped rather than waited on,
+    and the next sweep picks them up. Expired listings get a new version (so
+    stale If-Match writes fail) and leave the listing leaderboards.
+    """
+    now = datetime.utcnow()
+    overdue = (
+        select(MarketListing.id)
+        .where(
+            MarketListing.status == ListingStatus.ACTIVE,
+            MarketListing.expires_at < now,
+        )
+        .order_by(MarketListing.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(text("SET LOCAL lock_timeout = '1s'"))
+            result = await session.execute(
+                update(MarketListing)
+                .where(MarketListing.id.in_(overdue.scalar_subquery()))
+                .values(status=ListingStatus.EXPIRED, updated_at=now, version=MarketListing.version + 1)
+                .returning(MarketListing.id, leaderboards.LISTING_TIER, leaderboards.LISTING_MATERIAL)
+                .execution_options(synchronize_session=False)
+            )
+            expired = result.all()
+
+    for listing_id, world_tier, material in expired:
+        await leaderboards.remove_listing(listing_id, world_tier, material)
+    return len(expired)
+
+
+async def sweep_once(batch_size: int = SWEEP_BATCH_SIZE, max_batches: int = SWEEP_MAX_BATCHES) -> int:
+    """Run batches until the backlog is drained or `max_batches` is reached"""
+    total = 0
+    for _ in range(max_batches):
+        expired = await expire_batch(batch_size)
+        total += expired
+        if expired < batch_size:
+            break
+        await asyncio.sleep(0)  # let request handlers run between batches
+    return total
+
+
+async def run_sweeper(interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown"""
+    while True:
+        try:
+            expired = await sweep_once()
+            if expired:
+                print(f"[OK] Listing sweeper expired {expired} listings")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Listing sweeper failed: {e}")
+        await asyncio.sleep(interval)
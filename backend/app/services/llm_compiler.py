@@ -1,8 +1,33 @@
+import asyncio
+import copy
 import json
 import hashlib
-from typing import Any
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Optional
 
-from openai import AsyncOpenAI
+from app.services.metrics import LLM_COMPILE_TOKENS, LLM_LATENCY, LLM_TOKENS, counter, record_cache
+from app.services import prompt_builder
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyWindow,
+    backoff_delay,
+)
+
+MODEL = "gpt-4o"
+
+# compact: prompt_builder's stable prefix + hinted enums, short output keys expanded locally
+# full: the original SKILL_COMPILER_SYSTEM prompt and output schema (kept for comparison / rollback)
+LLM_PROMPT_MODE = os.getenv("LLM_PROMPT_MODE", "compact")
+DEFAULT_MAX_TOKENS = {"compact": 400, "full": 1000}  # compact answers are ~150-250 tokens
+MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", str(DEFAULT_MAX_TOKENS[LLM_PROMPT_MODE])))
+# Routes requests sharing the stable prefix to the same upstream cache (OpenAI prompt_cache_key); empty disables
+LLM_PROMPT_CACHE_KEY = os.getenv("LLM_PROMPT_CACHE_KEY", f"runesmith-compile-v{prompt_builder.PROMPT_VERSION}")
+
+LLM_HEDGES = counter("runesmith_llm_hedged_requests_total", "Hedged second LLM requests", ("model",))
 
 SKILL_COMPILER_SYSTEM = """You are a game skill compiler for RuneSmith. Convert natural language skill descriptions into a fixed JSON schema.
 
@@ -71,28 +96,246 @@ SKILL_COMPILER_SYSTEM = """You are a game skill compiler for RuneSmith. Convert
 - Crystal: #e879f9, #67e8f9"""
 
 
+# ── Resilience settings ──
+
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "30"))        # whole compile() budget
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "20"))  # single upstream call
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+LLM_FALLBACK_CACHE_SIZE = int(os.getenv("LLM_FALLBACK_CACHE_SIZE", "512"))
+
+LLM_BREAKER = CircuitBreaker(
+    "openai",
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+)
+_latencies = LatencyWindow()
+
+# Last good result per prompt, served only while the upstream is failing
+_fallback_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+# Filled in with the SDK's transient error types by _load_openai()
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (asyncio.TimeoutError,)
+_openai = None
+
+
+def _load_openai():
+    """Import the OpenAI SDK on first compiler construction, keeping it off the boot path"""
+    global _openai, RETRYABLE_ERRORS
+    if _openai is None:
+        import openai
+
+        RETRYABLE_ERRORS = (
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+            asyncio.TimeoutError,
+        )
+        _openai = openai
+    return _openai
+
+
+class LLMDeadlineExceeded(Exception):
+    """compile() ran out of its overall deadline across retries"""
+
+
+@dataclass
+class TokenUsage:
+    """Tokens billed for one compile, summed over retries and hedged duplicates"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # part of prompt_tokens served from the upstream prefix cache
+    completion_tokens: int = 0
+
+    def add(self, usage: Any) -> None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.calls += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+        self.completion_tokens += usage.completion_tokens
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _remember(user_input: str, result: dict[str, Any]) -> None:
+    _fallback_cache[user_input] = result
+    _fallback_cache.move_to_end(user_input)
+    while len(_fallback_cache) > LLM_FALLBACK_CACHE_SIZE:
+        _fallback_cache.popitem(last=False)
+
+
+def _fallback(user_input: str) -> Optional[dict[str, Any]]:
+    cached = _fallback_cache.get(user_input)
+    record_cache("llm_fallback", cached is not None)
+    return copy.deepcopy(cached) if cached is not None else None
+
+
 class LLMCompiler:
-    def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(self, api_key: str, base_url: Optional[str] = None, breaker: CircuitBreaker = LLM_BREAKER,
+                 prompt_mode: str = LLM_PROMPT_MODE):
+        # Retries/timeouts are handled here, not by the SDK
+        self.client = _load_openai().AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or os.getenv("OPENAI_BASE_URL") or None,
+            max_retries=0,
+        )
+        self.breaker = breaker
+        self.prompt_mode = prompt_mode
+        self.max_tokens = MAX_TOKENS if prompt_mode == LLM_PROMPT_MODE else DEFAULT_MAX_TOKENS[prompt_mode]
 
-    async def compile(self, user_input: str) -> dict[str, Any]:
+    async def compile(self, user_input: str, usage: Optional[TokenUsage] = None) -> dict[str, Any]:
+        """Compiler output for a description; `usage` (if given) accumulates the tokens it cost"""
+        usage = usage if usage is not None else TokenUsage()
         seed = int(hashlib.md5(user_input.encode()).hexdigest()[:8], 16)
 
-        response = await self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SKILL_COMPILER_SYSTEM},
-                {"role": "user", "content": user_input},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3,
-            max_tokens=1000,
-        )
+        if not self.breaker.allow():
+            cached = _fallback(user_input)
+            if cached is not None:
+                return cached
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_after())
+
+        try:
+            content = await self._call_with_retries(user_input, usage)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except (LLMDeadlineExceeded, *RETRYABLE_ERRORS):
+            cached = _fallback(user_input)
+            if cached is not None:
+                return cached
+            raise
+        finally:
+            if usage.calls:
+                LLM_COMPILE_TOKENS.observe(usage.prompt_tokens, MODEL, "prompt")
+                LLM_COMPILE_TOKENS.observe(usage.completion_tokens, MODEL, "completion")
+
+        result = json.loads(content)
+        if self.prompt_mode == "compact":
+            result = prompt_builder.expand(result)
+        result["seed"] = seed
+        _remember(user_input, result)
+        return copy.deepcopy(result)
+
+    async def _call_with_retries(self, user_input: str, usage: TokenUsage) -> str:
+        deadline = time.monotonic() + LLM_DEADLINE_SECONDS
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMDeadlineExceeded(f"LLM compile exceeded {LLM_DEADLINE_SECONDS}s")
+            try:
+                content = await self._hedged(user_input, usage, min(remaining, LLM_ATTEMPT_TIMEOUT_SECONDS))
+                self.breaker.record_success()
+                return content
+            except RETRYABLE_ERRORS:
+                self.breaker.record_failure()
+                if attempt >= LLM_MAX_RETRIES or not self.breaker.allow():
+                    raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Upstream answered (e.g. 400/401) - not a health signal against it
+                self.breaker.record_success()
+                raise
+            delay = backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                raise LLMDeadlineExceeded(f"LLM compile exceeded {LLM_DEADLINE_SECONDS}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _hedged(self, user_input: str, usage: TokenUsage, timeout: float) -> str:
+        """One logical attempt; optionally races a second request after the p95 delay"""
+        if not LLM_HEDGE_ENABLED:
+            return await asyncio.wait_for(self._request(user_input, usage), timeout)
+
+        p95 = _latencies.percentile(0.95)
+        hedge_delay = max(LLM_HEDGE_MIN_DELAY_SECONDS, p95 if p95 is not None else LLM_HEDGE_MIN_DELAY_SECONDS)
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + timeout
+
+        tasks = {asyncio.create_task(self._request(user_input, usage))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=min(hedge_delay, timeout))
+            if not done:
+                LLM_HEDGES.inc(MODEL)
+                tasks.add(asyncio.create_task(self._request(user_input, usage)))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                remaining = give_up_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            if error is not None:
+                raise error
+            raise asyncio.TimeoutError()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _messages(self, user_input: str) -> list[dict[str, str]]:
+        if self.prompt_mode == "compact":
+            return prompt_builder.build_messages(user_input)
+        return [
+            {"role": "system", "content": SKILL_COMPILER_SYSTEM},
+            {"role": "user", "content": user_input},
+        ]
+
+    async def _request(self, user_input: str, usage: TokenUsage) -> str:
+        start = time.perf_counter()
+        try:
+            response = await self.client.chat.completions.create(
+                model=MODEL,
+                messages=self._messages(user_input),
+                response_format={"type": "json_object"},
+                temperature=0.3,
+                max_tokens=self.max_tokens,
+                extra_body={"prompt_cache_key": LLM_PROMPT_CACHE_KEY} if LLM_PROMPT_CACHE_KEY else None,
+            )
+        except asyncio.CancelledError:
+            LLM_LATENCY.observe(time.perf_counter() - start, MODEL, "cancelled")
+            raise
+        except Exception:
+            LLM_LATENCY.observe(time.perf_counter() - start, MODEL, "error")
+            raise
+        elapsed = time.perf_counter() - start
+        LLM_LATENCY.observe(elapsed, MODEL, "ok")
+        _latencies.add(elapsed)
+
+        if response.usage is not None:
+            cached_before = usage.cached_tokens
+            usage.add(response.usage)
+            LLM_TOKENS.inc(MODEL, "prompt", amount=response.usage.prompt_tokens)
+            LLM_TOKENS.inc(MODEL, "cached", amount=usage.cached_tokens - cached_before)
+            LLM_TOKENS.inc(MODEL, "completion", amount=response.usage.completion_tokens)
 
         content = response.choices[0].message.content
         if content is None:
             raise ValueError("LLM returned empty response")
+        return content
 
-        result = json.loads(content)
-        result["seed"] = seed
-        return result
+
+def estimate_tokens(user_input: str) -> int:
+    """Upper-bound token cost of one compile (~4 chars/token + full completion budget)"""
+    if LLM_PROMPT_MODE == "compact":
+        return prompt_builder.prompt_chars(user_input) // 4 + MAX_TOKENS
+    return (len(SKILL_COMPILER_SYSTEM) + len(user_input)) // 4 + MAX_TOKENS
+
+
+_compilers: dict[str, LLMCompiler] = {}
+
+
+def get_compiler(api_key: str) -> LLMCompiler:
+    """Shared compiler per API key, so the HTTP connection pool is reused across requests"""
+    compiler = _compilers.get(api_key)
+    if compiler is None:
+        compiler = _compilers[api_key] = LLMCompiler(api_key)
+    return compiler
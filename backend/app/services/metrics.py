@@ -0,0 +1,235 @@
+"""
+In-process metrics registry with Prometheus text exposition
+
+Kept deliberately small: counters, gauges (optionally computed at scrape
+time) and fixed-bucket histograms keyed by label tuples. Recording a sample
+is a dict lookup plus a bisect, so it is cheap enough for every request.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 200, 400, 600, 800, 1000, 1500, 2000, 3000, 5000)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _fmt_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        collect: Optional[Callable[[], dict[tuple, float]]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+        self._collect = collect  # computed at scrape time instead of on every change
+
+    def set(self, value: float, *label_values) -> None:
+        self._values[label_values] = value
+
+    def render(self) -> list[str]:
+        values = self._values
+        if self._collect is not None:
+            try:
+                values = self._collect()
+            except Exception:
+                values = {}
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # label tuple -> [bucket counts..., sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="%s"' % _fmt_value(bound)
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(series[-2])}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            body = metric.render()
+            if body:
+                lines.extend(metric.header())
+                lines.extend(body)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labels))
+
+
+def gauge(name: str, help: str, labels: Iterable[str] = (), collect=None) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labels, collect))
+
+
+def histogram(name: str, help: str, labels: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labels, buckets))
+
+
+# ── Application metrics ──
+
+HTTP_REQUESTS = counter("runesmith_http_requests_total", "HTTP requests", ("method", "route", "status"))
+HTTP_LATENCY = histogram("runesmith_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+
+LLM_LATENCY = histogram("runesmith_llm_call_duration_seconds", "LLM call latency", ("model", "outcome"), LLM_BUCKETS)
+LLM_TOKENS = counter("runesmith_llm_tokens_total", "LLM tokens used", ("model", "kind"))
+LLM_COMPILE_TOKENS = histogram(
+    "runesmith_llm_compile_tokens", "Tokens per compile, all attempts included", ("model", "kind"), TOKEN_BUCKETS
+)
+
+CACHE_REQUESTS = counter("runesmith_cache_requests_total", "Cache lookups", ("cache", "result"))
+
+LOOP_LAG = histogram("runesmith_event_loop_lag_seconds", "Event loop scheduling lag", buckets=LAG_BUCKETS)
+LOOP_LAG_LAST = gauge("runesmith_event_loop_lag_last_seconds", "Most recent event loop lag sample")
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup; hit rate = hit / (hit + miss)"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def _pool_stats() -> dict[tuple, float]:
+    from app.database.session import engine
+
+    pool = engine.sync_engine.pool
+    stats = {}
+    for name in ("size", "checkedout", "overflow", "checkedin"):
+        fn = getattr(pool, name, None)  # NullPool has none of these
+        if fn is not None:
+            stats[(name,)] = fn()
+    return stats
+
+
+DB_POOL = gauge("runesmith_db_pool_connections", "DB pool connections by state", ("state",), collect=_pool_stats)
+
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """Sleep `interval` and record how late the loop woke us up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_LAST.set(lag)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency.
+
+    Routes are labelled by their path template (e.g. /api/market/listings/{listing_id}),
+    which FastAPI leaves in scope["route"] after matching, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_LATENCY.observe(elapsed, method, path)
+            HTTP_REQUESTS.inc(method, path, status_code)
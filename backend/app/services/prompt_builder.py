@@ -0,0 +1,219 @@
+"""
+Compile prompt builder - compact schema, hinted enum sections, local expansion
+
+The compact prompt is three messages:
+
+    system  STABLE_PREFIX      byte-identical on every call (prefix-cacheable)
+    system  hint section       delivery / material choices for this prompt
+    user    the description
+
+A cheap keyword pass over the description (English and Korean) picks the
+delivery groups and materials it mentions; only those enum values go into the
+hint section, and a category with no hint gets its full list. Everything that
+does not depend on the description sits in the stable prefix, ahead of
+anything that varies, so upstream prefix caches keep matching it.
+
+The model answers with short keys (COMPACT_SCHEMA); expand() restores the
+intent / mechanics / vfx shape the rest of the app uses, filling the palette
+from ELEMENT_COLORS when the model leaves it out.
+
+No framework imports: the benchmarks and the stub server use this directly.
+"""
+import re
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from app.services.skill_enums import (
+    DELIVERY_TYPES,
+    EFFECT_TYPES,
+    KEYWORDS,
+    GEOMETRIES,
+    MOTIONS,
+    MATERIALS,
+    RHYTHMS,
+    ELEMENT_COLORS,
+)
+
+PROMPT_VERSION = 1  # bump with any change to STABLE_PREFIX (used in the prompt cache key)
+
+# Same grouping as the comments in skill_enums.DELIVERY_TYPES
+DELIVERY_GROUPS = {
+    "single": ("Projectile", "Bolt", "Beam", "Strike"),
+    "area": ("AoE_Circle", "AoE_Cone", "AoE_Line", "AoE_Ring", "AoE_Nova"),
+    "persistent": ("Zone", "Wall", "Trap"),
+    "summon": ("Minion", "Turret", "Totem"),
+    "self": ("Buff",),
+}
+
+# Hint words: ASCII ones match at a word start ("freez" -> freeze, freezing),
+# Korean ones anywhere (particles attach to the noun). A hint narrows the
+# choices the model sees, so words that commonly mean something else
+# (single syllables like 불 / 물) are left out: a missed hint only costs
+# the full list, a false one can hide the right value.
+DELIVERY_HINTS = {
+    "single": ("projectile", "fireball", "bolt", "arrow", "missile", "shot", "shoot", "ball", "spear", "lance",
+               "dart", "beam", "ray", "laser", "strike", "slash", "stab", "punch", "smash", "melee",
+               "화살", "투사체", "발사", "광선", "베기", "찌르"),
+    "area": ("aoe", "area", "explo", "nova", "blast", "cone", "breath", "circle", "ring", "rain", "meteor",
+             "quake", "shockwave", "폭발", "광역", "범위", "충격파"),
+    "persistent": ("zone", "field", "pool", "wall", "barrier", "trap", "mine", "장판", "함정", "장벽"),
+    "summon": ("summon", "minion", "golem", "familiar", "turret", "totem", "소환", "포탑", "토템"),
+    "self": ("buff", "aura", "self", "empower", "enhance", "버프", "강화", "오라"),
+}
+
+MATERIAL_HINTS = {
+    "Fire": ("fire", "flame", "burn", "ember", "inferno", "blaze", "lava", "magma", "화염", "불꽃", "용암"),
+    "Ice": ("ice", "frost", "freez", "frozen", "cold", "snow", "glacier", "얼음", "냉기", "서리"),
+    "Lightning": ("lightning", "thunder", "electr", "spark", "volt", "번개", "전격", "뇌전"),
+    "Void": ("void", "abyss", "cosmic", "singularity", "공허", "심연"),
+    "Nature": ("nature", "vine", "thorn", "leaf", "poison", "toxic", "forest", "자연", "덩굴", "맹독"),
+    "Arcane": ("arcane", "magic", "mana", "rune", "mystic", "비전", "마력", "룬"),
+    "Water": ("water", "tide", "tidal", "ocean", "aqua", "torrent", "물줄기", "해일", "파도"),
+    "Earth": ("earth", "stone", "rock", "boulder", "sand", "대지", "바위", "모래"),
+    "Wind": ("wind", "gust", "tornado", "cyclone", "gale", "바람", "회오리", "돌풍"),
+    "Holy": ("holy", "divine", "sacred", "angel", "radian", "smite", "신성", "성스러"),
+    "Shadow": ("shadow", "dark", "shade", "night", "그림자", "어둠"),
+    "Blood": ("blood", "vampir", "crimson", "hemo", "흡혈", "혈액", "피의"),
+    "Metal": ("metal", "steel", "iron", "blade", "강철", "금속"),
+    "Crystal": ("crystal", "gem", "prism", "diamond", "보석", "크리스탈"),
+}
+
+
+def _pattern(words: tuple[str, ...]) -> re.Pattern:
+    ascii_words = [re.escape(w) for w in words if w.isascii()]
+    other = [re.escape(w) for w in words if not w.isascii()]
+    parts = []
+    if ascii_words:
+        parts.append(r"\b(?:" + "|".join(ascii_words) + ")")
+    if other:
+        parts.append("|".join(other))
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+_DELIVERY_PATTERNS = {group: _pattern(words) for group, words in DELIVERY_HINTS.items()}
+_MATERIAL_PATTERNS = {material: _pattern(words) for material, words in MATERIAL_HINTS.items()}
+
+
+class PromptHints(NamedTuple):
+    """Delivery groups and materials a description mentions; empty means no hint"""
+    delivery_groups: tuple[str, ...]
+    materials: tuple[str, ...]
+
+
+def classify(user_input: str) -> PromptHints:
+    return PromptHints(
+        tuple(group for group, pattern in _DELIVERY_PATTERNS.items() if pattern.search(user_input)),
+        tuple(material for material, pattern in _MATERIAL_PATTERNS.items() if pattern.search(user_input)),
+    )
+
+
+# ── Prompt text ──
+
+COMPACT_SCHEMA = (
+    '{"n":name (max 20 chars),"d":1-2 sentence description,"t":[tags],'
+    '"dl":delivery,'
+    '"e":[{"y":effect type,"v":value,"du":duration ms,"pc":percent,"di":distance,"b":bonus}],'
+    '"k":[{"k":keyword,"n":count}],'
+    '"g":geometry,"mo":motion,"ma":material,"r":rhythm,'
+    '"c":["#primary","#secondary"],"i":intensity 0.0-1.0}'
+)
+
+STABLE_PREFIX = f"""You are the RuneSmith skill compiler. Convert a skill description into ONE JSON object with exactly these short keys (no markdown):
+{COMPACT_SCHEMA}
+
+Omit effect fields that do not apply. "n" on a keyword only for Chain, Split, Multi_Hit. Omit "c" to use the material's default colors.
+
+Effect types: {"|".join(EFFECT_TYPES)}
+Keywords: {"|".join(KEYWORDS)}
+Geometry: {"|".join(GEOMETRIES)}
+Motion: {"|".join(MOTIONS)}
+Rhythm: {"|".join(RHYTHMS)}
+
+Rules:
+1. Choose the delivery that best matches the skill.
+2. Reasonable values: damage 50-200, durations 1000-5000 ms.
+3. Keywords only if explicitly or strongly implied.
+4. Geometry, motion and material must visually match the concept.
+5. Intensity from described power: 0.3 subtle, 0.7 normal, 1.0 epic."""
+
+
+@lru_cache(maxsize=256)
+def hint_section(hints: PromptHints) -> str:
+    deliveries = [d for group in hints.delivery_groups for d in DELIVERY_GROUPS[group]] or DELIVERY_TYPES
+    materials = hints.materials or MATERIALS
+    return f"Delivery: {'|'.join(deliveries)}\nMaterial: {'|'.join(materials)}"
+
+
+def build_messages(user_input: str) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": STABLE_PREFIX},
+        {"role": "system", "content": hint_section(classify(user_input))},
+        {"role": "user", "content": user_input},
+    ]
+
+
+def prompt_chars(user_input: str) -> int:
+    """Characters sent for one compact compile (for token estimates)"""
+    return len(STABLE_PREFIX) + len(hint_section(classify(user_input))) + len(user_input)
+
+
+# ── Compact <-> full output ──
+
+_EFFECT_KEYS = {"y": "type", "v": "value", "du": "duration", "pc": "percent", "di": "distance", "b": "bonus"}
+
+
+def expand(data: dict[str, Any]) -> dict[str, Any]:
+    """Full compiler output from the compact keys; output already in the full shape passes through"""
+    if "intent" in data or "mechanics" in data:
+        return data
+
+    material = data.get("ma", "Fire")
+    colors = data.get("c")
+    if not (isinstance(colors, list) and len(colors) == 2):
+        colors = ELEMENT_COLORS.get(material, ELEMENT_COLORS["Fire"])
+
+    effects = []
+    for effect in data.get("e", []):
+        effects.append({full: effect[short] for short, full in _EFFECT_KEYS.items() if effect.get(short) is not None})
+    keywords = []
+    for keyword in data.get("k", []):
+        entry = {"keyword": keyword.get("k")}
+        if keyword.get("n") is not None:
+            entry["n"] = keyword["n"]
+        keywords.append(entry)
+
+    return {
+        "intent": {"name": data.get("n", ""), "description": data.get("d", ""), "tags": data.get("t", [])},
+        "mechanics": {"delivery": data.get("dl"), "effects": effects, "keywords": keywords},
+        "vfx": {
+            "geometry": data.get("g"),
+            "motion": data.get("mo"),
+            "material": material,
+            "rhythm": data.get("r"),
+            "palette": {"primary": colors[0], "secondary": colors[1]},
+            "intensity": data.get("i", 0.7),
+        },
+    }
+
+
+def compact(full: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of expand() (the stub server answers compact prompts with it)"""
+    intent, mechanics, vfx = full["intent"], full["mechanics"], full["vfx"]
+    effect_keys = {v: k for k, v in _EFFECT_KEYS.items()}
+    out = {
+        "n": intent["name"],
+        "d": intent["description"],
+        "t": intent["tags"],
+        "dl": mechanics["delivery"],
+        "e": [{effect_keys[k]: v for k, v in effect.items()} for effect in mechanics["effects"]],
+        "k": [{"k": kw["keyword"], **({"n": kw["n"]} if "n" in kw else {})} for kw in mechanics["keywords"]],
+        "g": vfx["geometry"],
+        "mo": vfx["motion"],
+        "ma": vfx["material"],
+        "r": vfx["rhythm"],
+        "i": vfx["intensity"],
+    }
+    palette = (vfx["palette"]["primary"], vfx["palette"]["secondary"])
+    if palette != ELEMENT_COLORS.get(vfx["material"]):
+        out["c"] = list(palette)
+    return out
@@ -0,0 +1,146 @@
+"""
+Opt-in SQL profiler - per-request query count, DB time, slow statements and
+repeated-statement (N+1) detection via SQLAlchemy engine events.
+
+Enabled with SQL_PROFILER=dev or SQL_PROFILER=prod:
+
+- dev:  adds X-DB-* response headers and prints slow statements with their
+        EXPLAIN plan and any repeated statements
+- prod: aggregates into the /metrics registry only (no EXPLAIN, no headers)
+"""
+import os
+import time
+from collections import Counter as _Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import counter, histogram
+
+PROFILER_MODE = os.getenv("SQL_PROFILER", "off").lower()  # off | dev | prod
+SLOW_QUERY_MS = float(os.getenv("SQL_PROFILER_SLOW_MS", "50"))
+REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILER_REPEAT_THRESHOLD", "3"))
+MAX_SLOW_PER_REQUEST = 5
+
+DB_QUERIES = histogram(
+    "runesmith_db_queries_per_request", "SQL statements issued per request", ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME = histogram("runesmith_db_time_per_request_seconds", "Total DB time per request", ("route",))
+DB_SLOW = counter("runesmith_db_slow_queries_total", "Statements slower than SQL_PROFILER_SLOW_MS", ("route",))
+DB_REPEATED = counter("runesmith_db_repeated_statements_total", "Requests with repeated identical statements", ("route",))
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_time", "statements", "slow")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: _Counter = _Counter()
+        self.slow: list[dict] = []
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> dict[str, int]:
+        """Statements issued at least `threshold` times - the usual N+1 signature"""
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    # Raw DBAPI cursor: bypasses these listeners, and the original cursor's rows are already buffered
+    try:
+        cursor = conn.connection.cursor()
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        cursor.close()
+        return plan
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+def install(engine: AsyncEngine, mode: str = PROFILER_MODE) -> None:
+    """Attach cursor listeners to the engine; no-op when mode is 'off'"""
+    if mode not in ("dev", "prod"):
+        return
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.total_time += elapsed
+        stats.statements[statement] += 1
+
+        if elapsed * 1000 >= SLOW_QUERY_MS and len(stats.slow) < MAX_SLOW_PER_REQUEST:
+            entry = {"sql": statement, "ms": round(elapsed * 1000, 2)}
+            if mode == "dev" and statement.lstrip().upper().startswith("SELECT"):
+                entry["plan"] = _explain(conn, statement, parameters)
+            stats.slow.append(entry)
+
+
+class QueryProfilerMiddleware:
+    """Pure ASGI middleware scoping a RequestQueryStats to each HTTP request"""
+
+    def __init__(self, app, mode: str = PROFILER_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode not in ("dev", "prod"):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.mode == "dev":
+                repeated = stats.repeated()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_time * 1000:.2f}".encode()))
+                headers.append((b"x-db-slow-count", str(len(stats.slow)).encode()))
+                headers.append((b"x-db-repeated", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: RequestQueryStats) -> None:
+        route = getattr(scope.get("route"), "path", "unmatched")
+        repeated = stats.repeated()
+
+        DB_QUERIES.observe(stats.count, route)
+        DB_TIME.observe(stats.total_time, route)
+        if stats.slow:
+            DB_SLOW.inc(route, amount=len(stats.slow))
+        if repeated:
+            DB_REPEATED.inc(route)
+
+        if self.mode != "dev":
+            return
+        for entry in stats.slow:
+            print(f"[SLOW SQL] {scope['method']} {route} {entry['ms']}ms\n{entry['sql']}")
+            if entry.get("plan"):
+                print(entry["plan"])
+        for sql, n in repeated.items():
+            print(f"[N+1?] {scope['method']} {route} ran {n}x: {sql.splitlines()[0][:200]}")
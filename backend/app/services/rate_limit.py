@@ -0,0 +1,195 @@
+"""
+Token-bucket rate limiting - per user, per IP and a global LLM token budget
+
+Backends:
+- MemoryBackend: per-process dict, bounded LRU of buckets (default)
+- RedisBackend:  shared across workers, one atomic Lua script per check
+                 (used when REDIS_URL is set)
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.services.auth import decode_access_token
+from app.services.metrics import counter
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+MEMORY_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+
+RATE_LIMITED = counter("runesmith_rate_limited_total", "Requests rejected by rate limiting", ("policy",))
+
+
+@dataclass(frozen=True)
+class Limit:
+    name: str
+    rate: float   # tokens refilled per second
+    burst: float  # bucket capacity
+
+
+def _per_minute(name: str, env: str, per_minute: float, burst: float) -> Limit:
+    per_minute = float(os.getenv(env, per_minute))
+    return Limit(name, per_minute / 60.0, max(burst, 1.0))
+
+
+COMPILE_PER_USER = _per_minute("compile_user", "RATE_LIMIT_COMPILE_USER_PER_MIN", 10, 5)
+COMPILE_PER_IP = _per_minute("compile_ip", "RATE_LIMIT_COMPILE_IP_PER_MIN", 20, 10)
+MARKET_WRITE_PER_USER = _per_minute("market_write_user", "RATE_LIMIT_MARKET_USER_PER_MIN", 30, 10)
+MARKET_WRITE_PER_IP = _per_minute("market_write_ip", "RATE_LIMIT_MARKET_IP_PER_MIN", 120, 30)
+COMBAT_PER_USER = _per_minute("combat_user", "RATE_LIMIT_COMBAT_USER_PER_MIN", 20, 5)
+COMBAT_PER_IP = _per_minute("combat_ip", "RATE_LIMIT_COMBAT_IP_PER_MIN", 60, 20)
+
+_llm_tokens_per_minute = float(os.getenv("LLM_TOKENS_PER_MINUTE", "150000"))
+LLM_TOKENS_GLOBAL = Limit("llm_tokens", _llm_tokens_per_minute / 60.0, _llm_tokens_per_minute)
+
+
+# ── Backends ──
+
+class MemoryBackend:
+    """Buckets in a bounded OrderedDict; exact within one worker process"""
+
+    def __init__(self, max_buckets: int = MEMORY_MAX_BUCKETS):
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._max_buckets = max_buckets
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [limit.burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self._max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / limit.rate
+
+
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = burst
+  ts = now
+end
+tokens = math.min(burst, tokens + (now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBackend:
+    """Buckets as Redis hashes, refilled and debited atomically server-side"""
+
+    def __init__(self, url: str, prefix: str = "runesmith:rl:"):
+        import redis.asyncio as redis  # optional dependency, only needed with REDIS_URL
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> tuple[bool, float]:
+        allowed, retry_after = await self._script(
+            keys=[self._prefix + key],
+            args=[limit.rate, limit.burst, cost],
+        )
+        return bool(allowed), float(retry_after)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        url = os.getenv("REDIS_URL")
+        _backend = RedisBackend(url) if url else MemoryBackend()
+    return _backend
+
+
+# ── Request helpers ──
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def token_user_id(request: Request) -> Optional[str]:
+    """User id from the bearer token, without a DB lookup (None if absent/invalid)"""
+    auth = request.headers.get("authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        return None
+    payload = decode_access_token(auth[7:])
+    return str(payload["sub"]) if payload and payload.get("sub") is not None else None
+
+
+def _reject(limit: Limit, retry_after: float) -> HTTPException:
+    RATE_LIMITED.inc(limit.name)
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Rate limit exceeded ({limit.name})",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def enforce(key: str, limit: Limit, cost: float = 1.0) -> None:
+    """Debit `cost` from the bucket or raise 429 with Retry-After"""
+    if not RATE_LIMIT_ENABLED:
+        return
+    allowed, retry_after = await get_backend().take(f"{limit.name}:{key}", limit, cost)
+    if not allowed:
+        raise _reject(limit, retry_after)
+
+
+def rate_limit(per_user: Limit, per_ip: Limit):
+    """FastAPI dependency factory: per-user (when a token is present) and per-IP buckets"""
+
+    async def dependency(request: Request) -> None:
+        user_id = token_user_id(request)
+        if user_id is not None:
+            await enforce(user_id, per_user)
+        await enforce(client_ip(request), per_ip)
+
+    return dependency
+
+
+compile_rate_limit = rate_limit(COMPILE_PER_USER, COMPILE_PER_IP)
+market_write_rate_limit = rate_limit(MARKET_WRITE_PER_USER, MARKET_WRITE_PER_IP)
+combat_rate_limit = rate_limit(COMBAT_PER_USER, COMBAT_PER_IP)
+
+
+async def enforce_llm_budget(estimated_tokens: int) -> None:
+    """Global tokens-per-minute budget shared by every compile"""
+    await enforce("global", LLM_TOKENS_GLOBAL, cost=min(estimated_tokens, LLM_TOKENS_GLOBAL.burst))
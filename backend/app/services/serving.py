@@ -0,0 +1,65 @@
+"""
+Process model - worker count and per-worker DB pool sizing
+
+gunicorn.conf.py decides the worker count and exports it as WEB_CONCURRENCY,
+which every worker reads back here to take its share of Postgres connections.
+A plain `uvicorn app.main:app` run is one worker with the whole budget.
+"""
+import math
+import os
+from typing import Optional
+
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "100"))      # Postgres max_connections
+DB_RESERVED_CONNECTIONS = int(os.getenv("DB_RESERVED_CONNECTIONS", "10"))  # admin, migrations, sweeper scripts
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "8"))
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of the container (cgroup v2, then v1), None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="ascii") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="ascii") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="ascii") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """Cores this process may actually use: affinity mask capped by the container quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+def default_worker_count() -> int:
+    """One async worker per usable core (bcrypt, JSON and Pydantic are CPU bound), at most MAX_WORKERS"""
+    return max(1, min(available_cpus(), MAX_WORKERS))
+
+
+def worker_count() -> int:
+    """Workers serving this deployment, as exported by the process manager"""
+    return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+def pool_limits(workers: int) -> tuple[int, int]:
+    """(pool_size, max_overflow) per worker so that workers * (size + overflow) fits the budget"""
+    per_worker = max(2, (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) // workers)
+    pool_size = max(1, min(DB_POOL_SIZE, per_worker))
+    return pool_size, max(0, min(DB_MAX_OVERFLOW, per_worker - pool_size))
@@ -0,0 +1,85 @@
+"""
+Fixed skill vocabularies shared by the compiler, codec and balance helpers.
+
+Order matters: the tuple index is the wire id used by the blueprint codec,
+so new values may only be appended.
+"""
+
+DELIVERY_TYPES = (
+    # Single Target
+    "Projectile", "Bolt", "Beam", "Strike",
+    # Area
+    "AoE_Circle", "AoE_Cone", "AoE_Line", "AoE_Ring", "AoE_Nova",
+    # Persistent
+    "Zone", "Wall", "Trap",
+    # Summon
+    "Minion", "Turret", "Totem",
+    # Self
+    "Buff",
+)
+
+EFFECT_TYPES = (
+    # Damage
+    "FlatDamage", "DoT", "PercentDamage", "Execute", "LifeSteal",
+    # CC
+    "Stun", "Slow", "Root", "Silence", "Knockback", "Pull", "Fear",
+    # Defensive
+    "Shield", "Heal", "HoT", "DamageReduce",
+    # Utility
+    "Haste", "Cleanse", "Mark", "Teleport",
+)
+
+# Optional numeric fields of an effect, in wire order after "value"
+EFFECT_PARAMS = ("value", "duration", "percent", "distance", "bonus")
+
+KEYWORDS = (
+    "Pierce", "Chain", "Homing", "Explosive",
+    "Ricochet", "Split", "Delayed", "Channeled",
+    "Chargeable", "Consume", "Crit_Boost",
+    "Multi_Hit", "Lingering", "Conversion",
+)
+
+GEOMETRIES = (
+    "Spear", "Blade", "Needle", "Arrow", "Shard",
+    "Sphere", "Orb", "Bubble", "Meteor",
+    "Ring", "Disc", "Sigil", "Wave",
+    "Beam_Geo", "Whip", "Chain_Geo", "Arc",
+    "Swarm", "Vortex", "Fractal",
+)
+
+MOTIONS = (
+    "Straight", "Accelerate", "Decelerate",
+    "Spiral", "Wave_Sine", "Boomerang", "Orbit",
+    "Homing_Direct", "Homing_Lazy", "Homing_Swarm",
+    "Expand_Sphere", "Expand_Ring", "Scatter",
+    "Teleport_Blink", "Pendulum", "Float_Rise",
+)
+
+MATERIALS = (
+    "Fire", "Ice", "Lightning", "Void",
+    "Nature", "Arcane", "Water", "Earth",
+    "Wind", "Holy", "Shadow", "Blood",
+    "Metal", "Crystal",
+)
+
+RHYTHMS = (
+    "Burst", "Sustained", "Pulsing",
+    "Ramp_Up", "Ramp_Down", "Staccato",
+    "Delayed", "Cascade", "Heartbeat", "Chaotic",
+)
+
+# Default (primary, secondary) palette per material
+ELEMENT_COLORS = {
+    "Fire": ("#f97316", "#fbbf24"), "Ice": ("#38bdf8", "#e0f2fe"),
+    "Lightning": ("#facc15", "#ffffff"), "Void": ("#6b21a8", "#1e1b4b"),
+    "Nature": ("#22c55e", "#86efac"), "Arcane": ("#a855f7", "#e9d5ff"),
+    "Water": ("#0ea5e9", "#bae6fd"), "Earth": ("#92400e", "#d97706"),
+    "Wind": ("#e2e8f0", "#94a3b8"), "Holy": ("#fef08a", "#ffffff"),
+    "Shadow": ("#171717", "#404040"), "Blood": ("#dc2626", "#450a0a"),
+    "Metal": ("#d4d4d8", "#71717a"), "Crystal": ("#e879f9", "#67e8f9"),
+}
+
+
+def build_index(table: tuple[str, ...]) -> dict[str, int]:
+    """Build a name -> wire id lookup for one of the tables above"""
+    return {name: i for i, name in enumerate(table)}
@@ -0,0 +1,93 @@
+"""
+Startup profile - time spent in each boot phase up to the first served request
+
+Phases (milliseconds):
+- interpreter:   process start -> `import app` (Python startup, uvicorn import)
+- imports:       `import app` -> app.main fully imported (routers, SQLAlchemy, models)
+- schema:        migration head check in the lifespan
+- background:    background tasks started, app accepting requests
+- first_request: ready -> first response sent
+
+Reported once on the first request and at GET /health/startup.
+"""
+import os
+import time
+from typing import Optional
+
+from app import IMPORT_STARTED
+from app.services.metrics import gauge
+
+
+def _process_age_seconds() -> Optional[float]:
+    """Seconds since this process started, from /proc (Linux only)"""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # Fields after the parenthesised command name; starttime is field 22 overall
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfile:
+    def __init__(self, import_started: float):
+        age = _process_age_seconds()
+        self.process_started = time.perf_counter() - age if age is not None else None
+        self.phases: dict[str, float] = {}
+        if self.process_started is not None:
+            self.phases["interpreter"] = (import_started - self.process_started) * 1000
+        self._last = import_started
+        self.reported = False
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = (now - self._last) * 1000
+        self._last = now
+
+    def first_request(self) -> None:
+        if self.reported:
+            return
+        self.mark("first_request")
+        self.reported = True
+        print(f"[OK] Startup profile: {self.summary()}")
+
+    def total_ms(self) -> float:
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.phases.items())
+        return f"{parts} (total {self.total_ms():.0f}ms)"
+
+    def report(self) -> dict:
+        return {
+            "phases_ms": {name: round(ms, 1) for name, ms in self.phases.items()},
+            "total_ms": round(self.total_ms(), 1),
+            "includes_interpreter": "interpreter" in self.phases,
+            "first_request_served": self.reported,
+        }
+
+
+PROFILE = StartupProfile(IMPORT_STARTED)
+
+STARTUP_SECONDS = gauge(
+    "runesmith_startup_phase_seconds", "Boot time per startup phase", ("phase",),
+    collect=lambda: {(name,): ms / 1000 for name, ms in PROFILE.phases.items()},
+)
+
+
+class StartupProfileMiddleware:
+    """Closes the profile when the first HTTP response has been sent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if PROFILE.reported or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PROFILE.first_request()
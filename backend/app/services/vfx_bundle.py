@@ -0,0 +1,167 @@
+"""
+VFX bundles - render-ready preview data baked from a blueprint
+
+Python counterpart of getVfxLimits / autoGenerateBlocks / materialToAudio in
+packages/shared/src/utils/balance-engine.ts. A bundle is everything a preview
+needs beyond the blueprint itself: resolved blocks (with particle counts),
+the budget's limits, the audio envelope and the palette as 0..1 RGB.
+
+Nested field names follow VFXComposition / VFXLimits so the client can hand
+them to the renderer as-is. The encoding is canonical (sorted keys, no
+whitespace), so equal inputs give byte-identical bundles and the same hash.
+
+No database or framework imports: the bake runs anywhere.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from app.services.blueprint_codec import PackedBlueprint
+from app.services.skill_enums import DELIVERY_TYPES, GEOMETRIES, MATERIALS, MOTIONS, RHYTHMS
+
+BUNDLE_VERSION = 1  # bump when the bake output changes; old hashes stay valid for old bundles
+
+# (min budget, limits), highest first
+VFX_LIMITS = (
+    (500, {"maxBlocks": 6, "maxParticles": 5000, "shaderTier": "legendary", "trailLength": "extreme",
+           "postProcessing": ["Bloom", "Distortion", "ChromAb", "RadialBlur"]}),
+    (350, {"maxBlocks": 5, "maxParticles": 2500, "shaderTier": "premium", "trailLength": "very_long",
+           "postProcessing": ["Bloom", "Distortion", "ChromAb"]}),
+    (200, {"maxBlocks": 4, "maxParticles": 1200, "shaderTier": "advanced", "trailLength": "long",
+           "postProcessing": ["Bloom", "Distortion"]}),
+    (100, {"maxBlocks": 3, "maxParticles": 500, "shaderTier": "standard", "trailLength": "medium",
+           "postProcessing": ["Bloom"]}),
+    (0, {"maxBlocks": 2, "maxParticles": 200, "shaderTier": "basic", "trailLength": "short",
+         "postProcessing": []}),
+)
+
+VFX_BLOCK_COSTS = {
+    "CoreMesh": 10, "TrailRibbon": 15, "Particles": 15, "ImpactDecal": 8,
+    "RuneCircle": 12, "Beam": 15, "LightningArc": 20, "AoEField": 12,
+    "DistortionShell": 25, "VolumetricShape": 35, "ShieldDome": 18, "OrbitalSatellites": 15,
+    "ShockwaveRing": 10, "ChainLink": 20, "AfterimageGhost": 12, "ScreenFlash": 5,
+}
+
+AUDIO_PRESETS = {
+    "Fire":      {"attack": 0.3,  "sustain": 0.6,  "decay": 0.8, "filterFreq": 400,  "noiseType": "white"},
+    "Ice":       {"attack": 0.05, "sustain": 0.2,  "decay": 0.5, "filterFreq": 3000, "noiseType": "crackle"},
+    "Lightning": {"attack": 0.01, "sustain": 0.1,  "decay": 0.3, "filterFreq": 120,  "noiseType": "white"},
+    "Void":      {"attack": 0.5,  "sustain": 0.9,  "decay": 1.0, "filterFreq": 80,   "noiseType": "pink"},
+    "Nature":    {"attack": 0.2,  "sustain": 0.7,  "decay": 0.6, "filterFreq": 600,  "noiseType": "pink"},
+    "Arcane":    {"attack": 0.15, "sustain": 0.5,  "decay": 0.7, "filterFreq": 1200, "noiseType": "pink"},
+    "Water":     {"attack": 0.1,  "sustain": 0.6,  "decay": 0.7, "filterFreq": 800,  "noiseType": "white"},
+    "Earth":     {"attack": 0.4,  "sustain": 0.3,  "decay": 0.9, "filterFreq": 200,  "noiseType": "white"},
+    "Wind":      {"attack": 0.05, "sustain": 0.8,  "decay": 0.4, "filterFreq": 2000, "noiseType": "pink"},
+    "Holy":      {"attack": 0.1,  "sustain": 0.7,  "decay": 0.5, "filterFreq": 1500, "noiseType": "pink"},
+    "Shadow":    {"attack": 0.6,  "sustain": 0.8,  "decay": 1.0, "filterFreq": 100,  "noiseType": "pink"},
+    "Blood":     {"attack": 0.3,  "sustain": 0.4,  "decay": 0.6, "filterFreq": 300,  "noiseType": "crackle"},
+    "Metal":     {"attack": 0.02, "sustain": 0.15, "decay": 0.8, "filterFreq": 2500, "noiseType": "white"},
+    "Crystal":   {"attack": 0.05, "sustain": 0.3,  "decay": 0.6, "filterFreq": 3500, "noiseType": "crackle"},
+}
+
+# Delivery -> (block type, start ms, duration ms) for the third block
+_DELIVERY_BLOCKS = {
+    "Projectile": ("TrailRibbon", 0, 1500),
+    "Bolt": ("TrailRibbon", 0, 1500),
+    "Beam": ("Beam", 0, 2000),
+    "Buff": ("RuneCircle", 0, 2500),
+    "Totem": ("RuneCircle", 0, 2500),
+    "Trap": ("RuneCircle", 0, 500),
+}
+_AOE_BLOCK = ("AoEField", 200, 1500)
+_DEFAULT_DELIVERY_BLOCK = ("ShockwaveRing", 100, 800)
+
+# Material -> (block type, start ms, duration ms) for the fourth block
+_MATERIAL_BLOCKS = {
+    "Lightning": ("LightningArc", 100, 600),
+    "Void": ("DistortionShell", 0, 1200),
+    "Arcane": ("DistortionShell", 0, 1200),
+}
+_DEFAULT_MATERIAL_BLOCK = ("ImpactDecal", 500, 2000)
+
+
+def vfx_limits(vfx_budget: float) -> dict:
+    for threshold, limits in VFX_LIMITS:
+        if vfx_budget >= threshold:
+            return limits
+    return VFX_LIMITS[-1][1]
+
+
+def material_to_audio(material: str) -> dict:
+    return AUDIO_PRESETS.get(material, AUDIO_PRESETS["Fire"])
+
+
+def _block(block_type: str, start: int, duration: int, params: Optional[dict] = None) -> dict:
+    return {"type": block_type, "params": params or {}, "timing": {"start": start, "duration": duration}}
+
+
+def auto_generate_blocks(delivery: str, material: str, geometry: str, limits: dict) -> list[dict]:
+    """Same blocks, order and timings as autoGenerateBlocks"""
+    max_blocks = limits["maxBlocks"]
+    blocks = [_block("CoreMesh", 0, 1500, {"geometry": geometry})]
+    if max_blocks >= 2:
+        blocks.append(_block("Particles", 0, 2000, {"count": min(limits["maxParticles"], 500)}))
+    if max_blocks >= 3:
+        if delivery in _DELIVERY_BLOCKS:
+            blocks.append(_block(*_DELIVERY_BLOCKS[delivery]))
+        elif delivery.startswith("AoE"):
+            blocks.append(_block(*_AOE_BLOCK))
+        else:
+            blocks.append(_block(*_DEFAULT_DELIVERY_BLOCK))
+    if max_blocks >= 4:
+        blocks.append(_block(*_MATERIAL_BLOCKS.get(material, _DEFAULT_MATERIAL_BLOCK)))
+    if max_blocks >= 5:
+        blocks.append(_block("ScreenFlash", 0, 200))
+    if max_blocks >= 6:
+        blocks.append(_block("AfterimageGhost", 0, 1000))
+    return blocks[:max_blocks]
+
+
+def vfx_budget_used(blocks: list[dict]) -> int:
+    return sum(VFX_BLOCK_COSTS.get(block["type"], 10) for block in blocks)
+
+
+def _rgb(color: int) -> list[float]:
+    return [round(((color >> shift) & 0xFF) / 255, 4) for shift in (16, 8, 0)]
+
+
+def build_bundle(packed: PackedBlueprint, vfx_budget: float) -> dict:
+    delivery = DELIVERY_TYPES[packed.delivery]
+    material = MATERIALS[packed.material]
+    geometry = GEOMETRIES[packed.geometry]
+    limits = vfx_limits(vfx_budget)
+    blocks = auto_generate_blocks(delivery, material, geometry, limits)
+    return {
+        "version": BUNDLE_VERSION,
+        "delivery": delivery,
+        "geometry": geometry,
+        "motion": MOTIONS[packed.motion],
+        "material": material,
+        "rhythm": RHYTHMS[packed.rhythm],
+        "intensity": round(packed.intensity, 4),
+        "palette": {
+            "primary": f"#{packed.primary:06x}",
+            "secondary": f"#{packed.secondary:06x}",
+            "primaryRgb": _rgb(packed.primary),
+            "secondaryRgb": _rgb(packed.secondary),
+        },
+        "limits": limits,
+        "blocks": blocks,
+        "budgetUsed": vfx_budget_used(blocks),
+        "audio": material_to_audio(material),
+    }
+
+
+def encode_bundle(bundle: dict) -> bytes:
+    """Canonical JSON bytes (the hashed form)"""
+    return json.dumps(bundle, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def bundle_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def bake(mechanics: dict, vfx: dict, vfx_budget: float) -> tuple[str, bytes]:
+    """(hash, body) for a skill's JSON columns; raises BlueprintCodecError on unknown enums"""
+    body = encode_bundle(build_bundle(PackedBlueprint.from_dict(mechanics, vfx), vfx_budget))
+    return bundle_hash(body), body
@@ -0,0 +1,135 @@
+"""
+VFX prebake - stores baked bundles and backfills skills that predate them
+
+save_skill bakes in its own transaction; run_prebake() walks the remaining
+skills (vfx_bundle IS NULL) in small batches off the request path. Reads go
+through a bounded per-process cache of encoded bodies, so a hot bundle is
+served without touching Postgres (and, behind a CDN, without reaching us).
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import AsyncSessionLocal
+from app.models import Skill, VfxBundle
+from app.services.blueprint_codec import BlueprintCodecError
+from app.services.vfx_bundle import bake
+
+VFX_BUNDLE_CACHE_SIZE = int(os.getenv("VFX_BUNDLE_CACHE_SIZE", "2048"))
+PREBAKE_INTERVAL_SECONDS = float(os.getenv("VFX_PREBAKE_INTERVAL", "300"))
+PREBAKE_BATCH_SIZE = int(os.getenv("VFX_PREBAKE_BATCH_SIZE", "200"))
+
+_cache: OrderedDict[str, bytes] = OrderedDict()
+
+
+def _remember(digest: str, body: bytes) -> None:
+    _cache[digest] = body
+    _cache.move_to_end(digest)
+    while len(_cache) > VFX_BUNDLE_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _insert_bundles(rows: list[dict]):
+    return pg_insert(VfxBundle).values(rows).on_conflict_do_nothing(index_elements=["hash"])
+
+
+async def prebake(db: AsyncSession, mechanics: dict, vfx: dict, vfx_budget: float) -> Optional[str]:
+    """Bake and store a bundle in the caller's transaction; None when the blueprint has unknown enums"""
+    try:
+        digest, body = bake(mechanics, vfx, vfx_budget)
+    except BlueprintCodecError:
+        return None
+    await db.execute(_insert_bundles([{"hash": digest, "body": body, "created_at": datetime.utcnow()}]))
+    _remember(digest, body)
+    return digest
+
+
+async def get_bundle(db: AsyncSession, digest: str) -> Optional[bytes]:
+    body = _cache.get(digest)
+    if body is not None:
+        _cache.move_to_end(digest)
+        return body
+    result = await db.execute(select(VfxBundle.body).where(VfxBundle.hash == digest))
+    body = result.scalar_one_or_none()
+    if body is not None:
+        _remember(digest, body)
+    return body
+
+
+# ── Backfill ──
+
+_SET_BUNDLE = (
+    update(Skill.__table__)
+    .where(Skill.__table__.c.id == bindparam("pk"))
+    .values(vfx_bundle=bindparam("bundle"))
+)
+
+
+async def prebake_batch(after_id: int = 0, batch_size: int = PREBAKE_BATCH_SIZE) -> tuple[int, int, int]:
+    """
+    Bake up to `batch_size` skills with id > after_id and no bundle.
+
+    Returns (rows scanned, skills baked, last id). Skills whose blueprint cannot be packed
+    keep NULL and are stepped over via the id cursor.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Skill.id, Skill.mechanics, Skill.vfx, Skill.vfx_budget)
+            .where(Skill.vfx_bundle.is_(None), Skill.id > after_id)
+            .order_by(Skill.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return 0, 0, after_id
+
+        now = datetime.utcnow()
+        bundles: dict[str, bytes] = {}
+        pointers = []
+        for row in rows:
+            try:
+                digest, body = bake(row.mechanics, row.vfx, row.vfx_budget)
+            except BlueprintCodecError:
+                continue
+            bundles[digest] = body  # purchased copies share one bundle
+            pointers.append({"pk": row.id, "bundle": digest})
+
+        if bundles:
+            await db.execute(_insert_bundles([
+                {"hash": digest, "body": body, "created_at": now} for digest, body in bundles.items()
+            ]))
+            await db.execute(_SET_BUNDLE, pointers)
+        await db.commit()
+        return len(rows), len(pointers), rows[-1].id
+
+
+async def prebake_all(batch_size: int = PREBAKE_BATCH_SIZE) -> int:
+    """Walk every skill without a bundle once; returns how many were baked"""
+    total = 0
+    after_id = 0
+    while True:
+        scanned, baked, after_id = await prebake_batch(after_id, batch_size)
+        total += baked
+        if scanned < batch_size:
+            return total
+        await asyncio.sleep(0)  # let request handlers run between batches
+
+
+async def run_prebake(interval: float = PREBAKE_INTERVAL_SECONDS) -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown"""
+    while True:
+        try:
+            baked = await prebake_all()
+            if baked:
+                print(f"[OK] VFX prebake baked {baked} skills")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] VFX prebake failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,103 @@
+"""
+Listing view counter - per-worker buffer flushed to the database in batches
+
+GET /api/market/listings/{id} only bumps an in-memory counter. Every
+VIEW_FLUSH_INTERVAL seconds the buffer is written with one
+UPDATE ... FROM (VALUES ...) on market_listings and one rollup upsert per
+batch. Flushes add deltas, so every worker flushes its own buffer without
+coordination. Views counted since the last flush are lost if a worker dies
+without a clean shutdown; listing and rollup view counts trail by up to one
+interval.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Integer, column, update, values
+
+from app.database.session import AsyncSessionLocal
+from app.models import MarketListing
+from app.services.analytics import record_views
+
+VIEW_FLUSH_INTERVAL_SECONDS = float(os.getenv("VIEW_FLUSH_INTERVAL", "10"))
+# (listing, hour) entries per flush transaction; one entry is up to 6 rollup rows
+# of 11 parameters, which keeps each statement under asyncpg's 32767 parameters
+VIEW_FLUSH_BATCH_SIZE = int(os.getenv("VIEW_FLUSH_BATCH_SIZE", "400"))
+
+# (listing id, hour) -> views not yet written
+_pending: dict[tuple[int, datetime], int] = defaultdict(int)
+
+
+def record_view(listing_id: int, at: Optional[datetime] = None) -> None:
+    hour = (at or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    _pending[(listing_id, hour)] += 1
+
+
+def pending_views() -> int:
+    return sum(_pending.values())
+
+
+async def _write_batch(batch: list[tuple[tuple[int, datetime], int]]) -> None:
+    per_listing: dict[int, int] = defaultdict(int)
+    for (listing_id, _), count in batch:
+        per_listing[listing_id] += count
+    deltas = values(column("id", Integer), column("views", Integer), name="view_deltas").data(
+        sorted(per_listing.items())
+    )
+
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(MarketListing)
+                .where(MarketListing.id == deltas.c.id)
+                .values(views=MarketListing.views + deltas.c.views)
+                .returning(MarketListing.id, MarketListing.seller_id)
+                .execution_options(synchronize_session=False)
+            )
+            sellers = dict(result.all())  # deleted listings drop out here
+            await record_views(session, [
+                (listing_id, sellers[listing_id], hour, count)
+                for (listing_id, hour), count in batch
+                if listing_id in sellers
+            ])
+
+
+async def flush_views(batch_size: int = VIEW_FLUSH_BATCH_SIZE) -> int:
+    """
+    Write out the buffer; returns the number of views flushed.
+
+    The buffer is swapped out first, so views recorded during the flush land
+    in the next one. A batch that fails goes back into the buffer, together
+    with the batches after it, and is retried on the next flush.
+    """
+    global _pending
+    if not _pending:
+        return 0
+    entries = sorted(_pending.items())
+    _pending = defaultdict(int)
+
+    written = 0
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        try:
+            await _write_batch(batch)
+        except BaseException:
+            for key, count in entries[start:]:
+                _pending[key] += count
+            raise
+        written += sum(count for _, count in batch)
+    return written
+
+
+async def run_view_flusher(interval: float = VIEW_FLUSH_INTERVAL_SECONDS) -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown (which flushes once more)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_views()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] View count flush failed ({pending_views()} views kept for retry): {e}")
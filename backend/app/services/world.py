@@ -0,0 +1,180 @@
+"""
+World tables - affinity and VFX degradation, precomputed once per process
+
+Python counterpart of packages/shared/src/types/world.ts. Instead of an
+indexOf per lookup, every (world, attacker, defender) affinity and every
+(skill tier, current tier, budget-below-base) degradation factor sits in a
+flat array('d'), so single lookups are two dict hits and an index, and the
+*_batch helpers map whole columns of fights in one pass.
+
+Tiers outside 1..5 resolve to the last world, as getWorldConfig does.
+"""
+import hashlib
+import json
+import math
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Sequence
+
+from app.services.skill_enums import MATERIALS, build_index
+
+
+@dataclass(frozen=True)
+class WorldConfig:
+    id: int
+    name: str
+    theme: str
+    stage_count: int
+    combat_budget_max: int
+    vfx_budget_base: int
+    affinity_scale: float
+
+
+WORLDS = (
+    WorldConfig(1, "초원", "plains", 5, 100, 100, 1.0),
+    WorldConfig(2, "동굴", "cavern", 5, 150, 125, 1.2),
+    WorldConfig(3, "화산", "volcano", 5, 225, 150, 1.5),
+    WorldConfig(4, "심연", "abyss", 5, 337, 175, 1.8),
+    WorldConfig(5, "천공", "sky", 5, 506, 200, 2.0),
+)
+WORLD_COUNT = len(WORLDS)
+
+# [attack][defense]: Fire, Ice, Lightning, Water, Nature, Earth, Wind
+BASE_ELEMENTS = ("Fire", "Ice", "Lightning", "Water", "Nature", "Earth", "Wind")
+AFFINITY_MATRIX = (
+    (1.0, 1.5, 1.0, 0.5, 1.5, 1.0, 1.0),  # Fire ->
+    (0.5, 1.0, 1.0, 1.0, 1.0, 1.0, 1.5),  # Ice ->
+    (1.0, 1.0, 1.0, 1.5, 1.0, 0.5, 1.5),  # Lightning ->
+    (1.5, 1.0, 0.5, 1.0, 0.5, 1.5, 1.0),  # Water ->
+    (0.5, 1.0, 1.0, 1.5, 1.0, 1.5, 0.5),  # Nature ->
+    (1.0, 1.0, 1.5, 0.5, 0.5, 1.0, 1.0),  # Earth ->
+    (1.0, 0.5, 0.5, 1.0, 1.5, 1.0, 1.0),  # Wind ->
+)
+
+DEGRADATION_PER_WORLD = 0.15
+DEGRADATION_FLOOR = 0.4
+
+MATERIAL_INDEX = build_index(MATERIALS)
+_ELEMENTS = len(MATERIALS)
+
+
+def world_index(world_tier: int) -> int:
+    """0-based index into WORLDS; out-of-range tiers fall back to the last world"""
+    return world_tier - 1 if 1 <= world_tier <= WORLD_COUNT else WORLD_COUNT - 1
+
+
+def get_world_config(world_tier: int) -> WorldConfig:
+    return WORLDS[world_index(world_tier)]
+
+
+def combat_budget_max(world_tier: int) -> int:
+    # Math.round semantics (half up), not Python's banker's rounding
+    return math.floor(100 * 1.5 ** (world_tier - 1) + 0.5)
+
+
+def vfx_budget_base(world_tier: int) -> int:
+    return 100 + (world_tier - 1) * 25
+
+
+# ── Precomputed tables ──
+
+def _build_affinity() -> array:
+    """[world][attack][defense] over all MATERIALS; non-base elements are neutral (1.0)"""
+    base = build_index(BASE_ELEMENTS)
+    table = array("d", [1.0]) * (WORLD_COUNT * _ELEMENTS * _ELEMENTS)
+    for w, world in enumerate(WORLDS):
+        for attack, a in MATERIAL_INDEX.items():
+            if attack not in base:
+                continue
+            for defense, d in MATERIAL_INDEX.items():
+                if defense not in base:
+                    continue
+                diff = AFFINITY_MATRIX[base[attack]][base[defense]] - 1.0
+                table[(w * _ELEMENTS + a) * _ELEMENTS + d] = 1.0 + diff * world.affinity_scale
+    return table
+
+
+def _build_degradation() -> array:
+    """[skill tier][current tier] factor for a VFX budget below the current world's base"""
+    table = array("d", [1.0]) * (WORLD_COUNT * WORLD_COUNT)
+    for s in range(WORLD_COUNT):
+        for c in range(WORLD_COUNT):
+            table[s * WORLD_COUNT + c] = max(DEGRADATION_FLOOR, 1.0 - max(0, c - s) * DEGRADATION_PER_WORLD)
+    return table
+
+
+AFFINITY = _build_affinity()
+DEGRADATION = _build_degradation()
+VFX_BUDGET_BASE = tuple(vfx_budget_base(w.id) for w in WORLDS)
+
+
+# ── Lookups ──
+
+def affinity_multiplier(attack_element: str, defense_element: str, world_tier: int) -> float:
+    a = MATERIAL_INDEX.get(attack_element)
+    d = MATERIAL_INDEX.get(defense_element)
+    if a is None or d is None:
+        return 1.0
+    return AFFINITY[(world_index(world_tier) * _ELEMENTS + a) * _ELEMENTS + d]
+
+
+def vfx_degradation(skill_world_tier: int, current_world_tier: int, skill_vfx_budget: float) -> float:
+    if 1 <= skill_world_tier <= WORLD_COUNT and 1 <= current_world_tier <= WORLD_COUNT:
+        if skill_vfx_budget >= VFX_BUDGET_BASE[current_world_tier - 1]:
+            return 1.0
+        return DEGRADATION[(skill_world_tier - 1) * WORLD_COUNT + current_world_tier - 1]
+    # Tiers beyond the tables: same formula as world.ts
+    if skill_vfx_budget >= vfx_budget_base(current_world_tier):
+        return 1.0
+    return max(DEGRADATION_FLOOR, 1.0 - max(0, current_world_tier - skill_world_tier) * DEGRADATION_PER_WORLD)
+
+
+def affinity_batch(attack: Sequence[str], defense: Sequence[str], world_tiers: Sequence[int]) -> list[float]:
+    """Element-wise affinity_multiplier over equal-length columns"""
+    if not len(attack) == len(defense) == len(world_tiers):
+        raise ValueError("affinity_batch columns must have equal length")
+    get = MATERIAL_INDEX.get
+    table = AFFINITY
+    out = []
+    append = out.append
+    for atk, dfn, tier in zip(attack, defense, world_tiers):
+        a, d = get(atk), get(dfn)
+        append(1.0 if a is None or d is None else table[(world_index(tier) * _ELEMENTS + a) * _ELEMENTS + d])
+    return out
+
+
+def degradation_batch(
+    skill_world_tiers: Sequence[int],
+    current_world_tiers: Sequence[int],
+    skill_vfx_budgets: Sequence[float],
+) -> list[float]:
+    """Element-wise vfx_degradation over equal-length columns"""
+    if not len(skill_world_tiers) == len(current_world_tiers) == len(skill_vfx_budgets):
+        raise ValueError("degradation_batch columns must have equal length")
+    return [vfx_degradation(s, c, b) for s, c, b in zip(skill_world_tiers, current_world_tiers, skill_vfx_budgets)]
+
+
+# ── Wire form ──
+
+def world_tables() -> dict:
+    """Everything a client needs to do the same math without world.ts"""
+    n = _ELEMENTS
+    return {
+        "worlds": [asdict(w) for w in WORLDS],
+        "elements": list(MATERIALS),
+        "base_elements": list(BASE_ELEMENTS),
+        "vfx_budget_base": list(VFX_BUDGET_BASE),
+        # affinity[world][attack][defense], element order as "elements"
+        "affinity": [
+            [list(AFFINITY[(w * n + a) * n:(w * n + a + 1) * n]) for a in range(n)]
+            for w in range(WORLD_COUNT)
+        ],
+        # degradation[skill tier][current tier], applied only below vfx_budget_base[current]
+        "degradation": [list(DEGRADATION[s * WORLD_COUNT:(s + 1) * WORLD_COUNT]) for s in range(WORLD_COUNT)],
+    }
+
+
+WORLD_TABLES = world_tables()
+WORLD_TABLES_VERSION = hashlib.blake2b(
+    json.dumps(WORLD_TABLES, sort_keys=True, ensure_ascii=False).encode(), digest_size=8
+).hexdigest()
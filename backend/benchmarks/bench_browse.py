@@ -0,0 +1,171 @@
+"""
+Browse serialization benchmark - /api/market/browse at limit=100
+
+Runs the real FastAPI app in-process (httpx ASGI transport) with `get_db`
+overridden by a session that returns 100 canned rows, so the numbers
+isolate routing + serialization from Postgres latency. Also times the old
+Pydantic model-per-row path against the Row -> dict -> orjson path.
+
+    cd backend && python -m benchmarks.bench_browse [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+
+from app.main import app
+from app.database.session import get_db
+from app.models import ListingStatus
+from app.api.market import MarketListingResponse, SkillResponse
+from app.api.responses import listing_rows, dumps
+
+LIMIT = 100
+
+
+def make_rows(n: int = LIMIT) -> list[SimpleNamespace]:
+    rows = []
+    for i in range(n):
+        rows.append(SimpleNamespace(
+            id=i + 1,
+            seller_id=1000 + i % 17,
+            price=100 + i,
+            currency_type="points",
+            status=ListingStatus.ACTIVE,
+            views=i * 7,
+            purchases=i * 3,
+            total_rating=4.2 * (i % 9),
+            rating_count=i % 9,
+            created_at=datetime(2026, 1, 1, 12, 0, i % 60),
+            skill_pk=10_000 + i,
+            skill_id=f"skill_{i:08d}_abc123",
+            name=f"Blazing Spear {i}",
+            world_tier=1 + i % 5,
+            combat_budget=87.5,
+            vfx_budget=125.0,
+            mechanics={
+                "delivery": "Projectile",
+                "effects": [{"type": "FlatDamage", "value": 120}, {"type": "DoT", "value": 15, "duration": 3000}],
+                "keywords": [{"keyword": "Pierce"}, {"keyword": "Chain", "n": 3}],
+            },
+            vfx={
+                "geometry": "Spear", "motion": "Straight", "material": "Fire", "rhythm": "Burst",
+                "palette": {"primary": "#f97316", "secondary": "#fbbf24"}, "intensity": 0.7,
+                "blocks": [
+                    {"type": "CoreMesh", "params": {"geometry": "Spear"}, "timing": {"start": 0, "duration": 1500}},
+                    {"type": "Particles", "params": {"count": 500}, "timing": {"start": 0, "duration": 2000}},
+                    {"type": "TrailRibbon", "params": {}, "timing": {"start": 0, "duration": 1500}},
+                ],
+                "audio": {"attack": 0.3, "sustain": 0.6, "decay": 0.8, "filterFreq": 400, "noiseType": "white"},
+            },
+            stats={"cooldown": 5, "manaCost": 40, "castTime": 0.5, "range": 10, "risk": 0},
+            times_used=i,
+            vfx_bundle=f"{i:032x}",
+            skill_version=1,
+            version=1 + i % 3,
+            seller_username=f"seller{i % 17}",
+        ))
+    return rows
+
+
+ROWS = make_rows()
+
+
+class _Result:
+    def all(self):
+        return ROWS
+
+
+class _Session:
+    async def execute(self, *_args, **_kwargs):
+        return _Result()
+
+
+async def _fake_db():
+    yield _Session()
+
+
+def pydantic_path(rows) -> bytes:
+    """What the routes did before: a model per row, FastAPI's encoder on top"""
+    models = [
+        MarketListingResponse(
+            id=r.id,
+            skill=SkillResponse(
+                id=r.skill_pk, skill_id=r.skill_id, name=r.name, world_tier=r.world_tier,
+                combat_budget=r.combat_budget, vfx_budget=r.vfx_budget,
+                mechanics=r.mechanics, vfx=r.vfx, stats=r.stats, times_used=r.times_used,
+                vfx_bundle=r.vfx_bundle, version=r.skill_version,
+            ),
+            seller_username=r.seller_username, seller_id=r.seller_id, price=r.price,
+            currency_type=r.currency_type, status=r.status.value, views=r.views,
+            purchases=r.purchases,
+            average_rating=r.total_rating / r.rating_count if r.rating_count else 0.0,
+            rating_count=r.rating_count, created_at=r.created_at, version=r.version,
+        )
+        for r in rows
+    ]
+    from fastapi.encoders import jsonable_encoder
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def fast_path(rows) -> bytes:
+    return dumps(listing_rows(rows))
+
+
+def time_fn(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(ROWS)
+    return (time.perf_counter() - start) / iterations
+
+
+async def requests_per_second(total: int, concurrency: int) -> float:
+    app.dependency_overrides[get_db] = _fake_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        url = f"/api/market/browse?limit={LIMIT}"
+        assert (await client.get(url)).status_code == 200
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await client.get(url)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    app.dependency_overrides.clear()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    if json.loads(pydantic_path(ROWS)) != json.loads(fast_path(ROWS)):
+        raise SystemExit("pydantic and rows_orjson paths disagree; compare against the current response models")
+
+    old = time_fn(pydantic_path, args.iterations)
+    new = time_fn(fast_path, args.iterations)
+    rps = asyncio.run(requests_per_second(args.requests, args.concurrency))
+
+    print(json.dumps({
+        "limit": LIMIT,
+        "serialize_ms": {"pydantic": round(old * 1000, 3), "rows_orjson": round(new * 1000, 3)},
+        "speedup": round(old / new, 2),
+        "payload_bytes": len(fast_path(ROWS)),
+        "browse_requests_per_sec": round(rps, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compression benchmark - bytes on the wire and CPU cost per codec and level
+
+Two parts:
+
+  codecs     every available codec (gzip always; br / zstd when brotli /
+             zstandard are installed) at several levels over browse payloads
+             of 20..1000 listings: compressed bytes, ratio and CPU ms per body.
+             The level CompressionMiddleware would pick is flagged "policy".
+  in-process the real app (httpx ASGI transport, canned rows as in
+             bench_browse) fetched with each Accept-Encoding, plus a
+             revalidation with If-None-Match: body bytes received and
+             requests/sec.
+
+    cd backend && python -m benchmarks.bench_compression [--iterations 50] [--requests 1000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.main import app
+from app.database.session import get_db
+from app.api.responses import listing_rows, dumps
+from app.services.compression import available_codecs, compression_level
+from benchmarks.bench_browse import make_rows, _fake_db, LIMIT
+
+PAGE_SIZES = (20, 100, 1000)
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 9, 11), "zstd": (1, 3, 9, 19)}
+
+
+def cpu_ms(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1000
+
+
+def codec_table(iterations: int) -> list[dict]:
+    out = []
+    codecs = available_codecs()
+    for size in PAGE_SIZES:
+        body = dumps(listing_rows(make_rows(size)))
+        for name, fn in codecs.items():
+            policy = compression_level(name, len(body))
+            for level in sorted(set(LEVELS[name]) | {policy}):
+                compressed = fn(body, level)
+                out.append({
+                    "listings": size,
+                    "encoding": name,
+                    "level": level,
+                    "policy": level == policy,
+                    "bytes": len(body),
+                    "compressed_bytes": len(compressed),
+                    "ratio": round(len(body) / len(compressed), 2),
+                    "cpu_ms": round(cpu_ms(lambda: fn(body, level), iterations), 3),
+                })
+    return out
+
+
+async def in_process(total: int, concurrency: int) -> list[dict]:
+    app.dependency_overrides[get_db] = _fake_db
+    transport = httpx.ASGITransport(app=app)
+    url = f"/api/market/browse?limit={LIMIT}"
+    out = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        etag = (await client.get(url)).headers["etag"]
+        cases = [(name, {"Accept-Encoding": name}) for name in ("identity", *available_codecs())]
+        cases.append(("revalidate", {"Accept-Encoding": "gzip", "If-None-Match": etag}))
+
+        for label, headers in cases:
+            probe = await client.get(url, headers=headers)
+            remaining = total
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    await client.get(url, headers=headers)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            out.append({
+                "case": label,
+                "status": probe.status_code,
+                "content_encoding": probe.headers.get("content-encoding", "identity"),
+                "wire_body_bytes": probe.num_bytes_downloaded,
+                "requests_per_sec": round(total / elapsed, 1),
+            })
+    app.dependency_overrides.clear()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "codecs": codec_table(args.iterations),
+        "browse_limit_100": asyncio.run(in_process(args.requests, args.concurrency)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
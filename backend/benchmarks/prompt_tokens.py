@@ -0,0 +1,183 @@
+"""
+Prompt token report - full vs compact compile prompts against the stub LLM
+
+Compiles a fixed corpus of skill descriptions (English and Korean) through
+LLMCompiler once per prompt mode and reports, per mode, tokens in / cached /
+out per compile, compile latency percentiles and the cost of 1000 compiles
+at the given prices. The stub's latency model charges per uncached prompt
+token and per completion token, so token savings show up as latency too.
+
+    cd backend && python -m benchmarks.prompt_tokens [--rounds 3] [--cache-min-tokens 1024]
+
+The stub is booted on --stub-port unless --base-url points at one already
+running. --cache-min-tokens 1024 matches OpenAI's automatic prompt caching;
+lower it to model servers that cache shorter prefixes (e.g. vLLM).
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+
+from app.services import prompt_builder
+from app.services.llm_compiler import LLMCompiler, TokenUsage
+from benchmarks.loadtest import _wait_http
+
+CORPUS = (
+    "A fireball that explodes on impact and leaves burning ground",
+    "Chain lightning that bounces between 3 enemies",
+    "Summon a stone golem that taunts nearby enemies",
+    "A healing aura that restores allies over time",
+    "Shadow step behind the target and strike for critical damage",
+    "Frost nova that freezes everything around me",
+    "A laser beam of holy light that pierces all enemies",
+    "Place a poison trap that slows and damages whoever steps on it",
+    "Vampiric slash that heals for half the damage dealt",
+    "Throw three crystal shards that split on hit",
+    "A tornado that pulls enemies toward its center",
+    "Iron wall that blocks projectiles for 4 seconds",
+    "Arcane missiles that home in on the weakest enemy",
+    "Tidal wave that knocks back enemies in a line",
+    "Void orb that slowly drifts forward and devours anything it touches",
+    "Meteor rain over a large area",
+    "Buff myself with haste and a damage shield",
+    "얼음 화살을 발사해서 적을 둔화시킨다",
+    "화염 폭발로 주변 적에게 광역 피해",
+    "번개 토템을 소환해서 주기적으로 공격",
+    "그림자 속으로 순간이동 후 기습",
+    "A mysterious technique passed down for generations",
+)
+
+
+async def run_mode(base_url: str, mode: str, rounds: int, concurrency: int) -> tuple[list[TokenUsage], list[float], int]:
+    compiler = LLMCompiler("stub", base_url=base_url, prompt_mode=mode)
+    queue = [text for _ in range(rounds) for text in CORPUS]
+    usages: list[TokenUsage] = []
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            text = queue.pop()
+            usage = TokenUsage()
+            start = time.perf_counter()
+            try:
+                await compiler.compile(text, usage)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            usages.append(usage)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await compiler.client.close()
+    return usages, latencies, errors
+
+
+def summarize(usages: list[TokenUsage], latencies: list[float], errors: int, prices: dict) -> dict:
+    n = len(usages) or 1
+    prompt = sum(u.prompt_tokens for u in usages)
+    cached = sum(u.cached_tokens for u in usages)
+    completion = sum(u.completion_tokens for u in usages)
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> Optional[float]:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1) if ordered else None
+
+    cost = ((prompt - cached) * prices["input"] + cached * prices["cached"] + completion * prices["output"]) / 1e6
+    return {
+        "compiles": len(usages),
+        "errors": errors,
+        "prompt_tokens_avg": round(prompt / n, 1),
+        "cached_tokens_avg": round(cached / n, 1),
+        "completion_tokens_avg": round(completion / n, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "usd_per_1k_compiles": round(cost / n * 1000, 4),
+    }
+
+
+def hint_coverage() -> dict:
+    hints = [prompt_builder.classify(text) for text in CORPUS]
+    return {
+        "delivery_hinted": round(sum(bool(h.delivery_groups) for h in hints) / len(hints), 2),
+        "material_hinted": round(sum(bool(h.materials) for h in hints) / len(hints), 2),
+        "stable_prefix_chars": len(prompt_builder.STABLE_PREFIX),
+    }
+
+
+async def run(args) -> dict:
+    faults = {
+        "latency_ms": args.latency_ms, "jitter_ms": 0, "error_rate": 0, "rate_limit_rate": 0, "hang_rate": 0,
+        "ms_per_prompt_token": args.ms_per_prompt_token,
+        "ms_per_completion_token": args.ms_per_completion_token,
+        "cache_min_tokens": args.cache_min_tokens,
+    }
+    async with httpx.AsyncClient() as client:
+        await client.post(f"{args.base_url}/_faults", json=faults)
+
+    prices = {"input": args.price_input, "cached": args.price_cached, "output": args.price_output}
+    modes = {}
+    for mode in ("full", "compact"):
+        modes[mode] = summarize(*await run_mode(f"{args.base_url}/v1", mode, args.rounds, args.concurrency), prices)
+
+    full, compact = modes["full"], modes["compact"]
+
+    def saving(key: str) -> Optional[float]:
+        return round(1 - compact[key] / full[key], 3) if full[key] else None
+
+    return {
+        "corpus": len(CORPUS),
+        "rounds": args.rounds,
+        "stub": faults,
+        "prices_usd_per_mtok": prices,
+        "hints": hint_coverage(),
+        "modes": modes,
+        "savings": {
+            key: saving(key) for key in ("prompt_tokens_avg", "completion_tokens_avg", "p50_ms", "usd_per_1k_compiles")
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="Running stub (default: boot one)")
+    parser.add_argument("--stub-port", type=int, default=8099)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.1)
+    parser.add_argument("--ms-per-completion-token", type=float, default=12)
+    parser.add_argument("--cache-min-tokens", type=float, default=1024)
+    parser.add_argument("--price-input", type=float, default=2.50)
+    parser.add_argument("--price-cached", type=float, default=1.25)
+    parser.add_argument("--price-output", type=float, default=10.00)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    stub = None
+    if args.base_url is None:
+        args.base_url = f"http://127.0.0.1:{args.stub_port}"
+        stub = subprocess.Popen([sys.executable, "-m", "benchmarks.stub_openai", "--port", str(args.stub_port)])
+        _wait_http(f"{args.base_url}/_faults")
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Fault-injecting stand-in for the OpenAI chat completions API
+
+Returns schema-valid skill JSON (deterministic per prompt) with configurable
+latency and failure modes, so the compiler's timeouts, retries, hedging and
+circuit breaker can be exercised locally. Compact prompts (prompt_builder's
+stable prefix) get compact answers.
+
+Prompt caching is simulated the way OpenAI reports it: once a message-aligned
+prefix of at least --cache-min-tokens has been seen, later requests sharing it
+report it (rounded down to 128 tokens) as prompt_tokens_details.cached_tokens.
+--ms-per-prompt-token (uncached only) and --ms-per-completion-token add
+prefill / decode time on top of --latency-ms.
+
+    cd backend && python -m benchmarks.stub_openai --port 8099 --latency-ms 800 --error-rate 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+
+Faults can be changed at runtime:
+
+    curl -X POST localhost:8099/_faults -H 'Content-Type: application/json' -d '{"error_rate": 1.0}'
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass, asdict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.prompt_builder import STABLE_PREFIX, compact
+from app.services.skill_enums import (
+    DELIVERY_TYPES,
+    EFFECT_TYPES,
+    KEYWORDS,
+    GEOMETRIES,
+    MOTIONS,
+    MATERIALS,
+    RHYTHMS,
+    ELEMENT_COLORS,
+)
+
+
+@dataclass
+class Faults:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0       # 500 Internal Server Error
+    rate_limit_rate: float = 0.0  # 429 with Retry-After
+    hang_rate: float = 0.0        # sleep hang_seconds (exercise client timeouts)
+    hang_seconds: float = 60.0
+    ms_per_prompt_token: float = 0.0      # prefill cost of uncached prompt tokens
+    ms_per_completion_token: float = 0.0  # decode cost
+    cache_min_tokens: float = 1024        # shortest prefix the simulated cache keeps
+
+
+faults = Faults()
+stats = {
+    "requests": 0, "errors": 0, "rate_limited": 0, "hangs": 0,
+    "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+}
+_seen_prefixes: set[str] = set()
+
+app = FastAPI(title="Stub OpenAI")
+
+
+def fake_skill(prompt: str) -> dict:
+    rng = random.Random(int(hashlib.md5(prompt.encode()).hexdigest()[:8], 16))
+    material = rng.choice(MATERIALS)
+    primary, secondary = ELEMENT_COLORS[material]
+    effects = [{"type": "FlatDamage", "value": rng.randint(50, 200)}]
+    extra = rng.choice(EFFECT_TYPES)
+    if extra != "FlatDamage":
+        effects.append({"type": extra, "value": rng.randint(10, 80), "duration": rng.choice([1000, 2000, 3000, 5000])})
+    keywords = []
+    if rng.random() < 0.5:
+        kw = rng.choice(KEYWORDS)
+        keywords.append({"keyword": kw, "n": rng.randint(2, 4)} if kw in ("Chain", "Split", "Multi_Hit") else {"keyword": kw})
+    return {
+        "intent": {"name": prompt[:20] or "Stub Skill", "description": f"Stub skill for: {prompt[:60]}", "tags": ["stub", material.lower()]},
+        "mechanics": {"delivery": rng.choice(DELIVERY_TYPES), "effects": effects, "keywords": keywords},
+        "vfx": {
+            "geometry": rng.choice(GEOMETRIES),
+            "motion": rng.choice(MOTIONS),
+            "material": material,
+            "rhythm": rng.choice(RHYTHMS),
+            "palette": {"primary": primary, "secondary": secondary},
+            "intensity": round(rng.uniform(0.3, 1.0), 2),
+        },
+        "seed": 0,
+    }
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _cached_tokens(messages: list[dict]) -> int:
+    """Tokens of the longest previously seen message-aligned prefix, in 128-token blocks"""
+    digest = hashlib.sha256()
+    tokens = cached = 0
+    for message in messages:
+        digest.update(json.dumps(message, sort_keys=True).encode())
+        tokens += _tokens(message.get("content", ""))
+        key = digest.hexdigest()
+        if tokens >= faults.cache_min_tokens:
+            if key in _seen_prefixes:
+                cached = tokens // 128 * 128
+            _seen_prefixes.add(key)
+    return cached
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    delay = max(0.0, faults.latency_ms + random.uniform(-faults.jitter_ms, faults.jitter_ms)) / 1000
+    roll = random.random()
+    if roll < faults.hang_rate:
+        stats["hangs"] += 1
+        await asyncio.sleep(faults.hang_seconds)
+    roll = random.random()
+    if roll < faults.rate_limit_rate:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}},
+            status_code=429,
+            headers={"Retry-After": "1"},
+        )
+    messages = body.get("messages", [])
+    prompt = messages[-1]["content"] if messages else ""
+    skill = fake_skill(prompt)
+    compact_prompt = bool(messages) and messages[0].get("content") == STABLE_PREFIX
+    content = json.dumps(compact(skill) if compact_prompt else skill)
+    prompt_tokens = sum(_tokens(m.get("content", "")) for m in messages)
+    cached_tokens = _cached_tokens(messages)
+    completion_tokens = _tokens(content)
+
+    delay += ((prompt_tokens - cached_tokens) * faults.ms_per_prompt_token
+              + completion_tokens * faults.ms_per_completion_token) / 1000
+    await asyncio.sleep(delay)
+    if random.random() < faults.error_rate:
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "Injected failure (stub)", "type": "server_error"}}, status_code=500)
+
+    stats["prompt_tokens"] += prompt_tokens
+    stats["cached_tokens"] += cached_tokens
+    stats["completion_tokens"] += completion_tokens
+
+    return {
+        "id": f"chatcmpl-stub-{stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+@app.get("/_faults")
+async def get_faults():
+    return {"faults": asdict(faults), "stats": stats}
+
+
+@app.post("/_faults")
+async def set_faults(request: Request):
+    for key, value in (await request.json()).items():
+        if hasattr(faults, key):
+            setattr(faults, key, float(value))
+    return {"faults": asdict(faults)}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    for field, default in asdict(Faults()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args()
+    for field in asdict(faults):
+        setattr(faults, field, getattr(args, field))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
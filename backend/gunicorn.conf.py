@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration - multi-worker serving with uvicorn workers
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Workers default to one per usable core (WEB_CONCURRENCY overrides) and the
+count is exported so each worker sizes its DB pool to its share of
+DB_MAX_CONNECTIONS. Zero-downtime reload: `kill -HUP <master pid>` starts
+workers on the new code and retires the old ones once their in-flight
+requests finish (up to GRACEFUL_TIMEOUT).
+"""
+import os
+
+from app.services.serving import default_worker_count
+
+workers = int(os.getenv("WEB_CONCURRENCY") or default_worker_count())
+os.environ["WEB_CONCURRENCY"] = str(workers)  # inherited by workers for pool sizing
+
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Each worker imports the app itself: HUP then reloads code, and nothing
+# (engine, asyncio primitives, Redis clients) is shared across a fork
+preload_app = False
+
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers periodically, staggered so they never restart together
+max_requests = int(os.getenv("MAX_REQUESTS", "20000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    print(f"[OK] Gunicorn ready with {workers} worker(s) on {bind}")
@@ -0,0 +1,63 @@
+"""
+Alembic environment - async engine, models' metadata as the autogenerate target
+
+Used both from the CLI (`alembic upgrade head`) and from the app on boot,
+where app.database.migrations passes an open connection in `config.attributes`.
+"""
+import asyncio
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.session import Base, DATABASE_URL, _engine_kwargs
+import app.models  # noqa: F401  registers every table on Base.metadata
+
+config = context.config
+if config.config_file_name is not None and not config.attributes.get("connection"):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Migrations may need a direct (non-pgbouncer) connection, e.g. Supabase port 5432
+MIGRATION_DATABASE_URL = os.getenv("MIGRATION_DATABASE_URL", DATABASE_URL)
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout (`alembic upgrade head --sql`)"""
+    context.configure(
+        url=MIGRATION_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    # Same SSL / prepared-statement settings the app uses for remote databases
+    connectable = create_async_engine(
+        MIGRATION_DATABASE_URL,
+        poolclass=pool.NullPool,
+        connect_args=_engine_kwargs.get("connect_args", {}),
+    )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    do_run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,121 @@
+"""
+Initial schema - users, skills, marketplace and transactions
+
+Exactly what `Base.metadata.create_all` produced before migrations existed.
+Databases created that way are stamped 0001_initial on boot by
+app.database.migrations.ensure_schema (or by hand with
+`alembic stamp 0001_initial`) and upgraded from there.
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+LISTING_STATUS = sa.Enum("ACTIVE", "SOLD", "CANCELLED", "EXPIRED", name="listingstatus")
+TRANSACTION_TYPE = sa.Enum("PURCHASE", "SALE", "REFUND", name="transactiontype")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("world_tier", sa.Integer(), nullable=False),
+        sa.Column("current_stage", sa.Integer(), nullable=False),
+        sa.Column("player_level", sa.Integer(), nullable=False),
+        sa.Column("xp", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("rune_crystals", sa.Integer(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("last_login", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "skills",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("skill_id", sa.String(100), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("user_input", sa.String(500), nullable=False),
+        sa.Column("seed", sa.BigInteger(), nullable=False),
+        sa.Column("world_tier", sa.Integer(), nullable=False),
+        sa.Column("combat_budget", sa.Float(), nullable=False),
+        sa.Column("combat_budget_max", sa.Float(), nullable=False),
+        sa.Column("vfx_budget", sa.Float(), nullable=False),
+        sa.Column("vfx_budget_base", sa.Float(), nullable=False),
+        sa.Column("vfx_budget_paid", sa.Float(), nullable=False),
+        sa.Column("mechanics", sa.JSON(), nullable=False),
+        sa.Column("vfx", sa.JSON(), nullable=False),
+        sa.Column("stats", sa.JSON(), nullable=False),
+        sa.Column("times_used", sa.Integer(), nullable=False),
+        sa.Column("total_damage", sa.Float(), nullable=False),
+        sa.Column("times_evolved", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_skills_id", "skills", ["id"])
+    op.create_index("ix_skills_owner_id", "skills", ["owner_id"])
+    op.create_index("ix_skills_skill_id", "skills", ["skill_id"], unique=True)
+    op.create_index("ix_skills_world_tier", "skills", ["world_tier"])
+
+    op.create_table(
+        "market_listings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("skill_id", sa.Integer(), sa.ForeignKey("skills.id"), nullable=False),
+        sa.Column("seller_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("currency_type", sa.String(20), nullable=False),
+        sa.Column("status", LISTING_STATUS, nullable=False),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("purchases", sa.Integer(), nullable=False),
+        sa.Column("total_rating", sa.Float(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("sold_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_market_listings_id", "market_listings", ["id"])
+    op.create_index("ix_market_listings_skill_id", "market_listings", ["skill_id"], unique=True)
+    op.create_index("ix_market_listings_seller_id", "market_listings", ["seller_id"])
+    op.create_index("ix_market_listings_status", "market_listings", ["status"])
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("market_listings.id"), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("transaction_type", TRANSACTION_TYPE, nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("currency_type", sa.String(20), nullable=False),
+        sa.Column("buyer_skill_id", sa.Integer(), nullable=True),
+        sa.Column("is_successful", sa.Boolean(), nullable=False),
+        sa.Column("error_message", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_transactions_id", "transactions", ["id"])
+    op.create_index("ix_transactions_listing_id", "transactions", ["listing_id"])
+    op.create_index("ix_transactions_buyer_id", "transactions", ["buyer_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("transactions")
+    op.drop_table("market_listings")
+    op.drop_table("skills")
+    op.drop_table("users")
+    for enum in (TRANSACTION_TYPE, LISTING_STATUS):
+        enum.drop(op.get_bind(), checkfirst=True)
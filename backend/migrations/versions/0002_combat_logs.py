@@ -0,0 +1,50 @@
+"""
+Combat logs - submitted fights with columnar events and replay verification state
+
+Revision ID: 0002_combat_logs
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_combat_logs"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+COMBAT_VERIFICATION = sa.Enum("PENDING", "SKIPPED", "VERIFIED", "REJECTED", name="combatverification")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "combat_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("client_log_id", sa.String(64), nullable=False),
+        sa.Column("world_tier", sa.Integer(), nullable=False),
+        sa.Column("stage", sa.Integer(), nullable=False),
+        sa.Column("victory", sa.Boolean(), nullable=False),
+        sa.Column("seed", sa.BigInteger(), nullable=False),
+        sa.Column("turns_played", sa.Integer(), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=False),
+        sa.Column("total_damage_dealt", sa.Float(), nullable=False),
+        sa.Column("total_damage_taken", sa.Float(), nullable=False),
+        sa.Column("xp_awarded", sa.Integer(), nullable=False),
+        sa.Column("points_awarded", sa.Integer(), nullable=False),
+        sa.Column("skill_stats", sa.JSON(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("events", sa.JSON(), nullable=False),
+        sa.Column("verification", COMBAT_VERIFICATION, nullable=False),
+        sa.Column("verification_error", sa.String(200), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("verified_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "client_log_id", name="uq_combat_logs_user_client_log"),
+    )
+    op.create_index("ix_combat_logs_id", "combat_logs", ["id"])
+    op.create_index("ix_combat_logs_user_id", "combat_logs", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("combat_logs")
+    COMBAT_VERIFICATION.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""
+Leaderboard snapshots - persisted top-K boards for warm restarts
+
+Revision ID: 0003_leaderboard_entries
+Revises: 0002_combat_logs
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_leaderboard_entries"
+down_revision = "0002_combat_logs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leaderboard_entries",
+        sa.Column("board", sa.String(64), primary_key=True),
+        sa.Column("member", sa.String(100), primary_key=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("leaderboard_entries")
@@ -0,0 +1,36 @@
+"""
+VFX bundles - prebaked preview bundles and the skills.vfx_bundle pointer
+
+Revision ID: 0004_vfx_bundles
+Revises: 0003_leaderboard_entries
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_vfx_bundles"
+down_revision = "0003_leaderboard_entries"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vfx_bundles",
+        sa.Column("hash", sa.String(32), primary_key=True),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    # Nullable, no default: instant on existing rows; the prebake loop fills it in
+    op.add_column("skills", sa.Column("vfx_bundle", sa.String(32), nullable=True))
+    # Keeps the backfill scan proportional to what is left to bake
+    op.create_index(
+        "ix_skills_vfx_bundle_missing", "skills", ["id"],
+        postgresql_where=sa.text("vfx_bundle IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skills_vfx_bundle_missing", table_name="skills")
+    op.drop_column("skills", "vfx_bundle")
+    op.drop_table("vfx_bundles")
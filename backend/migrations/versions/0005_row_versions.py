@@ -0,0 +1,25 @@
+"""
+Row versions - optimistic concurrency counters for skills and market listings
+
+Revision ID: 0005_row_versions
+Revises: 0004_vfx_bundles
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_row_versions"
+down_revision = "0004_vfx_bundles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant server default: a catalog-only change on PostgreSQL 11+, no table rewrite
+    op.add_column("skills", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("market_listings", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("market_listings", "version")
+    op.drop_column("skills", "version")
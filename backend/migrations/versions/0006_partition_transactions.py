@@ -0,0 +1,124 @@
+"""
+Transactions by month - range-partition the ledger on created_at
+
+Revision ID: 0006_partition_transactions
+Revises: 0005_row_versions
+Create Date: 2026-10-19
+
+The existing rows are copied into monthly partitions (transactions_pYYYYMM)
+in this migration, so its runtime grows with the table; on a large ledger run
+it in a maintenance window. Partitions ahead of time are created by
+app.services.ledger; transactions_default only catches rows outside them.
+
+The primary key becomes (id, created_at) because a partitioned table's unique
+constraints must include the partition key. ids keep coming from the same
+sequence, so they stay unique in practice.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_partition_transactions"
+down_revision = "0005_row_versions"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, listing_id, buyer_id, transaction_type, amount, currency_type, "
+    "buyer_skill_id, is_successful, error_message, created_at"
+)
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Free the names the new table and its indexes will use
+    op.execute("ALTER TABLE transactions RENAME TO transactions_legacy")
+    op.execute("ALTER TABLE transactions_legacy RENAME CONSTRAINT transactions_pkey TO transactions_legacy_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_id")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_listing_id")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_buyer_id")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE transactions (
+            id integer NOT NULL DEFAULT nextval('transactions_id_seq'),
+            listing_id integer NOT NULL REFERENCES market_listings (id),
+            buyer_id integer NOT NULL REFERENCES users (id),
+            transaction_type transactiontype NOT NULL,
+            amount integer NOT NULL,
+            currency_type varchar(20) NOT NULL,
+            buyer_skill_id integer,
+            is_successful boolean NOT NULL,
+            error_message varchar(500),
+            created_at timestamp without time zone NOT NULL,
+            CONSTRAINT transactions_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM transactions_legacy")).scalar()
+    today = date.today()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE transactions_p{month:%Y%m} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_legacy")
+    op.execute("DROP TABLE transactions_legacy")
+
+    # Created on the parent, so every partition (present and future) gets them
+    op.create_index("ix_transactions_listing_id", "transactions", ["listing_id"])
+    # Keyset purchase history: WHERE buyer_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+    op.create_index(
+        "ix_transactions_buyer_created", "transactions",
+        ["buyer_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.execute("ANALYZE transactions")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute(
+        "ALTER TABLE transactions_partitioned RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_transactions_listing_id")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_buyer_created")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE transactions (
+            id integer NOT NULL DEFAULT nextval('transactions_id_seq'),
+            listing_id integer NOT NULL REFERENCES market_listings (id),
+            buyer_id integer NOT NULL REFERENCES users (id),
+            transaction_type transactiontype NOT NULL,
+            amount integer NOT NULL,
+            currency_type varchar(20) NOT NULL,
+            buyer_skill_id integer,
+            is_successful boolean NOT NULL,
+            error_message varchar(500),
+            created_at timestamp without time zone NOT NULL,
+            CONSTRAINT transactions_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned")  # drops its partitions too
+
+    op.create_index("ix_transactions_id", "transactions", ["id"])
+    op.create_index("ix_transactions_listing_id", "transactions", ["listing_id"])
+    op.create_index("ix_transactions_buyer_id", "transactions", ["buyer_id"])
@@ -0,0 +1,52 @@
+"""
+Stats rollups - hourly, daily and running-total counters per listing and seller
+
+Revision ID: 0007_stats_rollups
+Revises: 0006_partition_transactions
+Create Date: 2026-10-19
+
+Databases migrated with an earlier 0001_initial already have this table, so
+every step checks first. Existing history is loaded with
+app.services.analytics.backfill_rollups().
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007_stats_rollups"
+down_revision = "0006_partition_transactions"
+branch_labels = None
+depends_on = None
+
+ROLLUP_SCOPE = postgresql.ENUM("LISTING", "SELLER", name="rollupscope", create_type=False)
+ROLLUP_GRANULARITY = postgresql.ENUM("HOUR", "DAY", "ALL", name="rollupgranularity", create_type=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    ROLLUP_SCOPE.create(bind, checkfirst=True)
+    ROLLUP_GRANULARITY.create(bind, checkfirst=True)
+    if sa.inspect(bind).has_table("stats_rollups"):
+        return
+
+    op.create_table(
+        "stats_rollups",
+        sa.Column("scope", ROLLUP_SCOPE, primary_key=True),
+        sa.Column("scope_id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", ROLLUP_GRANULARITY, primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("sales", sa.Integer(), nullable=False),
+        sa.Column("revenue_points", sa.Integer(), nullable=False),
+        sa.Column("revenue_crystals", sa.Integer(), nullable=False),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Float(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stats_rollups")
+    bind = op.get_bind()
+    ROLLUP_GRANULARITY.drop(bind, checkfirst=True)
+    ROLLUP_SCOPE.drop(bind, checkfirst=True)
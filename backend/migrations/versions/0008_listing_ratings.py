@@ -0,0 +1,63 @@
+"""
+Listing ratings - per-buyer ratings and the stored Bayesian rating
+
+Revision ID: 0008_listing_ratings
+Revises: 0007_stats_rollups
+Create Date: 2026-10-19
+
+Databases migrated with an earlier 0001_initial already have these, so every
+step checks first. bayesian_rating is backfilled from the existing
+total_rating / rating_count in one UPDATE.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_listing_ratings"
+down_revision = "0007_stats_rollups"
+branch_labels = None
+depends_on = None
+
+# app.models.market.RATING_PRIOR_MEAN / RATING_PRIOR_WEIGHT at the time of this revision
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 5
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if "bayesian_rating" not in {c["name"] for c in inspector.get_columns("market_listings")}:
+        # Constant server default: a catalog-only change, then one pass to fill in rated listings
+        op.add_column(
+            "market_listings",
+            sa.Column("bayesian_rating", sa.Float(), server_default=str(PRIOR_MEAN), nullable=False),
+        )
+        op.execute(
+            f"UPDATE market_listings "
+            f"SET bayesian_rating = ({PRIOR_MEAN} * {PRIOR_WEIGHT} + total_rating) / ({PRIOR_WEIGHT} + rating_count) "
+            f"WHERE rating_count > 0"
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_market_listings_status_bayesian "
+        "ON market_listings (status, bayesian_rating)"
+    )
+
+    if inspector.has_table("skill_ratings"):
+        return
+    op.create_table(
+        "skill_ratings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("market_listings.id"), nullable=False),
+        sa.Column("buyer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("rating", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("listing_id", "buyer_id", name="uq_skill_ratings_listing_buyer"),
+    )
+    op.create_index("ix_skill_ratings_id", "skill_ratings", ["id"])
+    op.create_index("ix_skill_ratings_listing_id", "skill_ratings", ["listing_id"])
+    op.create_index("ix_skill_ratings_buyer_id", "skill_ratings", ["buyer_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("skill_ratings")
+    op.drop_index("ix_market_listings_status_bayesian", table_name="market_listings")
+    op.drop_column("market_listings", "bayesian_rating")
@@ -0,0 +1,33 @@
+"""
+Listing expiry - market_listings.expires_at and the active-listing sweep index
+
+Revision ID: 0009_listing_expiry
+Revises: 0008_listing_ratings
+Create Date: 2026-10-19
+
+Databases migrated with an earlier 0001_initial already have these, so every
+step checks first. Existing listings keep expires_at NULL (no expiry); new
+and relisted ones get one from the API.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_listing_expiry"
+down_revision = "0008_listing_ratings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "expires_at" not in {c["name"] for c in inspector.get_columns("market_listings")}:
+        op.add_column("market_listings", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_market_listings_active_expires_at "
+        "ON market_listings (expires_at) WHERE status = 'ACTIVE'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_listings_active_expires_at", table_name="market_listings")
+    op.drop_column("market_listings", "expires_at")
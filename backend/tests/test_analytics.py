@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import RollupGranularity, RollupScope
+from app.services.analytics import record_listing_event, record_views
+
+T = datetime(2026, 10, 19, 12, 40)
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+def upserted_keys(session: CapturingSession) -> list[tuple]:
+    (stmt,) = session.statements
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    n = sum(1 for key in params if key.startswith("scope_id_m"))
+    return [
+        (params[f"scope_m{i}"], params[f"scope_id_m{i}"], params[f"granularity_m{i}"], params[f"bucket_m{i}"])
+        for i in range(n)
+    ]
+
+
+def test_event_and_view_flush_lock_rows_in_the_same_order():
+    event, views = CapturingSession(), CapturingSession()
+    asyncio.run(record_listing_event(event, 7, 3, sales=1, at=T))
+    asyncio.run(record_views(views, [(7, 3, T.replace(minute=0), 2)]))
+    assert upserted_keys(event) == upserted_keys(views)
+
+
+def test_rows_follow_enum_declaration_order():
+    session = CapturingSession()
+    asyncio.run(record_views(session, [(9, 3, T, 1), (2, 5, T, 1)]))
+    hour, day, epoch = T.replace(minute=0), T.replace(hour=0, minute=0), datetime(1970, 1, 1)
+    assert upserted_keys(session) == [
+        (RollupScope.LISTING, 2, RollupGranularity.HOUR, hour),
+        (RollupScope.LISTING, 2, RollupGranularity.DAY, day),
+        (RollupScope.LISTING, 2, RollupGranularity.ALL, epoch),
+        (RollupScope.LISTING, 9, RollupGranularity.HOUR, hour),
+        (RollupScope.LISTING, 9, RollupGranularity.DAY, day),
+        (RollupScope.LISTING, 9, RollupGranularity.ALL, epoch),
+        (RollupScope.SELLER, 3, RollupGranularity.HOUR, hour),
+        (RollupScope.SELLER, 3, RollupGranularity.DAY, day),
+        (RollupScope.SELLER, 3, RollupGranularity.ALL, epoch),
+        (RollupScope.SELLER, 5, RollupGranularity.HOUR, hour),
+        (RollupScope.SELLER, 5, RollupGranularity.DAY, day),
+        (RollupScope.SELLER, 5, RollupGranularity.ALL, epoch),
+    ]
@@ -0,0 +1,106 @@
+import copy
+
+import pytest
+
+from app.services.blueprint_codec import (
+    BlueprintCodecError,
+    PackedBlueprint,
+    blueprint_hash,
+    decode_blueprint,
+    encode_blueprint,
+)
+
+MECHANICS = {
+    "delivery": "Projectile",
+    "effects": [
+        {"type": "FlatDamage", "value": 120},
+        {"type": "DoT", "value": 15.5, "duration": 3000},
+        {"type": "Stun", "duration": 800, "percent": 0.3},
+    ],
+    "keywords": [{"keyword": "Pierce"}, {"keyword": "Chain", "n": 3}],
+}
+VFX = {
+    "geometry": "Sphere",
+    "motion": "Straight",
+    "material": "Fire",
+    "rhythm": "Burst",
+    "palette": {"primary": "#ff4500", "secondary": "#ffd700"},
+    "intensity": 0.7,
+}
+
+
+def with_changes(mechanics=None, vfx=None):
+    m, v = copy.deepcopy(MECHANICS), copy.deepcopy(VFX)
+    m.update(mechanics or {})
+    v.update(vfx or {})
+    return m, v
+
+
+def test_round_trip():
+    assert decode_blueprint(encode_blueprint(MECHANICS, VFX)) == (MECHANICS, VFX)
+
+
+def test_round_trip_empty_lists():
+    mechanics, vfx = with_changes({"effects": [], "keywords": []})
+    assert decode_blueprint(encode_blueprint(mechanics, vfx)) == (mechanics, vfx)
+
+
+def test_short_hex_color_expands():
+    mechanics, vfx = with_changes(vfx={"palette": {"primary": "#f00", "secondary": "#0F0"}})
+    assert decode_blueprint(encode_blueprint(mechanics, vfx))[1]["palette"] == {
+        "primary": "#ff0000", "secondary": "#00ff00",
+    }
+
+
+def test_hash_ignores_key_order():
+    reordered = {key: MECHANICS[key] for key in reversed(list(MECHANICS))}
+    assert blueprint_hash(reordered, VFX) == blueprint_hash(MECHANICS, VFX)
+    assert blueprint_hash(*with_changes(vfx={"intensity": 0.8})) != blueprint_hash(MECHANICS, VFX)
+
+
+def test_from_bytes_equals_from_dict():
+    packed = PackedBlueprint.from_dict(MECHANICS, VFX)
+    assert PackedBlueprint.from_bytes(packed.to_bytes()) == packed
+
+
+@pytest.mark.parametrize("mechanics, vfx", [
+    ({"delivery": "Teleport"}, None),
+    ({"effects": [{"type": "Damage", "value": 1}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": "high"}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": True}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": 1e39}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": float("nan")}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": 16777217}]}, None),
+    ({"effects": [{"type": "FlatDamage", "value": 0.123456}]}, None),
+    ({"effects": {"type": "FlatDamage"}}, None),
+    ({"effects": ["FlatDamage"]}, None),
+    ({"effects": [{"type": "FlatDamage"}] * 256}, None),
+    ({"keywords": [{"keyword": "Chain", "n": 40000}]}, None),
+    ({"keywords": [{"keyword": "Chain", "n": -1}]}, None),
+    ({"keywords": [{"keyword": "Chain", "n": 2.5}]}, None),
+    (None, {"material": "Plasma"}),
+    (None, {"intensity": "max"}),
+    (None, {"palette": ["#fff", "#000"]}),
+    (None, {"palette": {"primary": "red", "secondary": "#000"}}),
+    (None, {"palette": {"primary": "#12345g", "secondary": "#000"}}),
+])
+def test_rejects_values_that_do_not_round_trip(mechanics, vfx):
+    with pytest.raises(BlueprintCodecError):
+        encode_blueprint(*with_changes(mechanics, vfx))
+
+
+def test_rejects_non_dict_columns():
+    with pytest.raises(BlueprintCodecError):
+        encode_blueprint([], VFX)
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda data: data[:10], "Truncated"),
+    (lambda data: b"XYZ" + data[3:], "Not a RuneSmith"),
+    (lambda data: data[:3] + b"\x02" + data[4:], "Unsupported"),
+    (lambda data: data + b"\x00", "length mismatch"),
+    (lambda data: data[:4] + b"\xff" + data[5:], "Unknown delivery id"),
+])
+def test_from_bytes_errors(mutate, message):
+    with pytest.raises(BlueprintCodecError, match=message):
+        decode_blueprint(mutate(encode_blueprint(MECHANICS, VFX)))
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.services.compile_jobs import CallbackURLError, callback_host_allowed, public_address, resolve_callback
+
+
+@pytest.mark.parametrize("host, allowed, expected", [
+    ("hooks.example.com", (), True),
+    ("hooks.example.com", ("hooks.example.com",), True),
+    ("HOOKS.example.com.", ("hooks.example.com",), True),
+    ("evil.hooks.example.com", ("hooks.example.com",), False),
+    ("a.example.org", (".example.org",), True),
+    ("example.org", (".example.org",), False),
+    ("badexample.org", (".example.org",), False),
+])
+def test_callback_host_allowed(host, allowed, expected):
+    assert callback_host_allowed(host, allowed) is expected
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("93.184.216.34", True),
+    ("2606:2800:220:1:248:1893:25c8:1946", True),
+    ("127.0.0.1", False),
+    ("10.0.0.1", False),
+    ("172.16.5.4", False),
+    ("192.168.1.1", False),
+    ("169.254.169.254", False),
+    ("100.64.0.1", False),
+    ("0.0.0.0", False),
+    ("224.0.0.1", False),
+    ("::1", False),
+    ("fe80::1%eth0", False),
+    ("fd00::1", False),
+    ("::ffff:127.0.0.1", False),
+])
+def test_public_address(address, expected):
+    assert public_address(address) is expected
+
+
+def test_resolve_public_literal():
+    assert asyncio.run(resolve_callback("https://93.184.216.34:8443/cb?a=1")) == "93.184.216.34"
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://93.184.216.34/cb",
+    "http:///cb",
+    "http://localhost/cb",
+    "http://127.0.0.1/cb",
+    "http://0x7f000001/cb",
+    "http://[::ffff:127.0.0.1]/cb",
+    "http://169.254.169.254/latest/meta-data",
+    "http://93.184.216.34:99999/cb",
+])
+def test_resolve_rejects(url):
+    with pytest.raises(CallbackURLError):
+        asyncio.run(resolve_callback(url))
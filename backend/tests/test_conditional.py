@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.api.responses import if_match_version, rows_etag, version_etag
+from app.services.compression import CompressionMiddleware, choose_encoding, etag_matches
+
+
+def test_version_etag_round_trip():
+    assert if_match_version(version_etag(7)) == 7
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("*", None),
+    (' "v3" ', 3),
+    ('"abc", "v12"', 12),
+    ('W/"v3"', 0),
+    ('"v"', 0),
+    ('"v-1"', 0),
+    ('"3"', 0),
+])
+def test_if_match_version(header, expected):
+    assert if_match_version(header) == expected
+
+
+def rows(*pairs):
+    return [SimpleNamespace(id=id_, version=version, mechanics={"large": "ignored"}) for id_, version in pairs]
+
+
+def test_rows_etag():
+    etag = rows_etag(rows((1, 1), (2, 4)), ("id", "version"))
+    assert etag.startswith('W/"')
+    assert rows_etag(rows((1, 1), (2, 4)), ("id", "version")) == etag
+    assert rows_etag(rows((1, 1), (2, 5)), ("id", "version")) != etag
+    assert rows_etag(rows((2, 4), (1, 1)), ("id", "version")) != etag
+    assert rows_etag(rows((1, 1), (2, 4)), ("id", "version"), "page-2") != etag
+
+
+def test_rows_etag_ignores_other_columns():
+    a, b = rows((1, 1)), rows((1, 1))
+    b[0].mechanics = {"large": "changed"}
+    assert rows_etag(a, ("id", "version")) == rows_etag(b, ("id", "version"))
+
+
+@pytest.mark.parametrize("if_none_match, etag, expected", [
+    ('"abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('"x", W/"abc"', 'W/"abc"', True),
+    ("*", '"abc"', True),
+    ('"abd"', '"abc"', False),
+])
+def test_etag_matches(if_none_match, etag, expected):
+    assert etag_matches(if_none_match, etag) is expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("identity", None),
+    ("gzip;q=0", None),
+    ("*", "zstd"),
+    ("br;q=bad, gzip", "gzip"),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def compressed_etag(etag: str) -> httpx.Response:
+    body = b'{"mechanics": "' + b"x" * 3000 + b'"}'
+
+    async def endpoint(request):
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    app = CompressionMiddleware(Starlette(routes=[Route("/", endpoint)]))
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    response = asyncio.run(get())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == body  # httpx decodes gzip
+    return response
+
+
+def test_compressed_version_etag_round_trips_to_if_match():
+    etag = compressed_etag(version_etag(3)).headers["etag"]
+    assert etag == '"v3"'
+    assert if_match_version(etag) == 3
+
+
+def test_compressed_opaque_etag_is_weakened():
+    assert compressed_etag('"abc"').headers["etag"] == 'W/"abc"'
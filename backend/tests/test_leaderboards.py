@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import leaderboards
+from app.services.leaderboards import MemoryLeaderboards, TopK
+
+
+def board(*entries, capacity=10) -> TopK:
+    top = TopK(capacity)
+    for member, score in entries:
+        top.set(member, score)
+    return top
+
+
+def test_ranking_by_score_then_member():
+    top = board(("a", 1.0), ("b", 3.0), ("c", 2.0), ("d", 2.0))
+    assert top.page(0, 10) == [("b", 3.0), ("c", 2.0), ("d", 2.0), ("a", 1.0)]
+    assert [top.rank(m) for m in "abcd"] == [3, 0, 1, 2]
+    assert top.rank("missing") is None
+
+
+def test_update_moves_member():
+    top = board(("a", 1.0), ("b", 2.0))
+    top.set("a", 5.0)
+    assert top.page(0, 10) == [("a", 5.0), ("b", 2.0)]
+    top.set("a", 5.0)
+    assert len(top.order) == 2
+
+
+def test_remove():
+    top = board(("a", 1.0), ("b", 2.0))
+    top.remove("b")
+    top.remove("missing")
+    assert top.page(0, 10) == [("a", 1.0)]
+    assert top.rank("b") is None
+
+
+def test_eviction_keeps_top_capacity():
+    top = board(("a", 1.0), ("b", 2.0), ("c", 3.0), capacity=3)
+    top.set("d", 0.5)  # below the cut
+    assert "d" not in top.scores
+    top.set("e", 4.0)  # evicts the lowest
+    assert top.page(0, 10) == [("e", 4.0), ("c", 3.0), ("b", 2.0)]
+    assert set(top.scores) == {"e", "c", "b"}
+
+
+def test_paging():
+    top = board(*((str(i), float(i)) for i in range(10)))
+    assert top.page(0, 3) == [("9", 9.0), ("8", 8.0), ("7", 7.0)]
+    assert top.page(8, 5) == [("1", 1.0), ("0", 0.0)]
+    assert top.page(20, 5) == []
+
+
+def test_incr_accumulates():
+    backend = MemoryLeaderboards(capacity=10)
+    asyncio.run(backend.incr("sellers:sales", "7", 1))
+    asyncio.run(backend.incr("sellers:sales", "7", 2))
+    assert asyncio.run(backend.page("sellers:sales", 0, 10)) == [("7", 3.0)]
+    assert backend.dirty == {"sellers:sales"}
+
+
+class FakeSession:
+    def __init__(self, locked=True, fail=False):
+        self.locked, self.fail, self.statements = locked, fail, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt, params=None):
+        if self.statements and self.fail:
+            raise RuntimeError("database unavailable")
+        self.statements.append(stmt)
+        return SimpleNamespace(scalar=lambda: self.locked)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemoryLeaderboards(capacity=10)
+    asyncio.run(backend.set("skills:1:all", "1", 0.5))
+    monkeypatch.setattr(leaderboards, "_backend", backend)
+    return backend
+
+
+def snapshot_with(monkeypatch, session) -> int:
+    monkeypatch.setattr(leaderboards, "AsyncSessionLocal", lambda: session)
+    return asyncio.run(leaderboards.snapshot())
+
+
+def test_snapshot_writes_dirty_boards(backend, monkeypatch):
+    session = FakeSession()
+    assert snapshot_with(monkeypatch, session) == 1
+    assert len(session.statements) == 3  # lock, upsert, delete of departed members
+    assert backend.dirty == set()
+
+
+@pytest.mark.parametrize("session", [FakeSession(locked=False), FakeSession(fail=True)])
+def test_snapshot_keeps_dirty_boards_for_retry(backend, monkeypatch, session):
+    if session.fail:
+        with pytest.raises(RuntimeError):
+            snapshot_with(monkeypatch, session)
+    else:
+        assert snapshot_with(monkeypatch, session) == 0
+    assert backend.dirty == {"skills:1:all"}
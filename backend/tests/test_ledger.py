@@ -0,0 +1,65 @@
+import base64
+from datetime import date, datetime
+
+import pytest
+
+from app.services.ledger import (
+    CursorError,
+    add_months,
+    cold_partitions,
+    create_partition_sql,
+    decode_cursor,
+    encode_cursor,
+    months_between,
+    partition_name,
+)
+
+
+@pytest.mark.parametrize("month, n, expected", [
+    (date(2026, 1, 1), 1, date(2026, 2, 1)),
+    (date(2026, 12, 1), 1, date(2027, 1, 1)),
+    (date(2026, 1, 1), -1, date(2025, 12, 1)),
+    (date(2026, 3, 1), -24, date(2024, 3, 1)),
+])
+def test_add_months(month, n, expected):
+    assert add_months(month, n) == expected
+
+
+def test_months_between():
+    assert list(months_between(date(2025, 11, 20), date(2026, 2, 1))) == [
+        date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1),
+    ]
+
+
+def test_partition_sql():
+    assert partition_name(date(2026, 2, 1)) == "transactions_p202602"
+    assert "FROM ('2026-12-01') TO ('2027-01-01')" in create_partition_sql(date(2026, 12, 1))
+
+
+def test_cold_partitions():
+    partitions = [(partition_name(m), m) for m in months_between(date(2024, 8, 1), date(2024, 12, 1))]
+    cold = cold_partitions(partitions, today=date(2026, 10, 19), retention_months=24)
+    # cutoff is 2024-10-01: September ends on it, October does not
+    assert cold == partitions[:2]
+    assert cold_partitions(partitions, today=date(2024, 12, 31), retention_months=24) == []
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 19, 12, 30, 5, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"2026-10-19T12:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|42").decode(),
+    base64.urlsafe_b64encode(b"2026-10-19T12:00:00|x").decode(),
+    base64.urlsafe_b64encode(b"2026-10-19|1|2").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_bad_cursor(cursor):
+    with pytest.raises(CursorError):
+        decode_cursor(cursor)
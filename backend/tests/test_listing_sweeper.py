@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.services import listing_sweeper
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Replace expire_batch with a backlog of `backlog[0]` overdue listings"""
+    backlog = [0]
+    calls = []
+
+    async def expire_batch(batch_size):
+        expired = min(batch_size, backlog[0])
+        backlog[0] -= expired
+        calls.append(expired)
+        return expired
+
+    monkeypatch.setattr(listing_sweeper, "expire_batch", expire_batch)
+    return backlog, calls
+
+
+def test_drains_backlog(batches):
+    backlog, calls = batches
+    backlog[0] = 25
+    assert asyncio.run(listing_sweeper.sweep_once(batch_size=10, max_batches=20)) == 25
+    assert calls == [10, 10, 5]
+
+
+def test_exact_multiple_stops_on_empty_batch(batches):
+    backlog, calls = batches
+    backlog[0] = 20
+    assert asyncio.run(listing_sweeper.sweep_once(batch_size=10, max_batches=20)) == 20
+    assert calls == [10, 10, 0]
+
+
+def test_stops_at_max_batches(batches):
+    backlog, calls = batches
+    backlog[0] = 100
+    assert asyncio.run(listing_sweeper.sweep_once(batch_size=10, max_batches=3)) == 30
+    assert backlog[0] == 70
+    assert len(calls) == 3
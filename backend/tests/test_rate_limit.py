@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import rate_limit
+from app.services.rate_limit import Limit, MemoryBackend
+
+LIMIT = Limit("test", rate=1.0, burst=3.0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def take(backend, key="k", limit=LIMIT, cost=1.0):
+    return asyncio.run(backend.take(key, limit, cost))
+
+
+def test_burst_then_reject(clock):
+    backend = MemoryBackend()
+    assert [take(backend)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = take(backend)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+
+def test_refill_is_capped_at_burst(clock):
+    backend = MemoryBackend()
+    for _ in range(3):
+        take(backend)
+    clock.value += 1.5
+    assert take(backend)[0]
+    assert not take(backend)[0]
+    clock.value += 3600
+    assert [take(backend)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_cost_larger_than_balance(clock):
+    backend = MemoryBackend()
+    assert take(backend, cost=2.0)[0]
+    allowed, retry_after = take(backend, cost=2.0)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+
+def test_buckets_are_bounded_lru(clock):
+    backend = MemoryBackend(max_buckets=2)
+    take(backend, "a", cost=3.0)
+    take(backend, "b", cost=3.0)
+    take(backend, "a", cost=0.0)  # "a" is now most recent
+    take(backend, "c", cost=3.0)  # evicts "b"
+    assert not take(backend, "a")[0]
+    assert take(backend, "b", cost=3.0)[0]
+
+
+def test_enforce_raises_429_with_retry_after(clock, monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(rate_limit, "_backend", backend)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    limit = Limit("slow", rate=0.1, burst=1.0)
+    asyncio.run(rate_limit.enforce("user", limit))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(rate_limit.enforce("user", limit))
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "10"
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import resilience
+from app.services.resilience import CircuitBreaker, CircuitOpenError, LatencyWindow, backoff_delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def opened(clock, threshold=3, reset_timeout=30.0) -> CircuitBreaker:
+    breaker = CircuitBreaker("llm", failure_threshold=threshold, reset_timeout=reset_timeout)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("llm", failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_check_raises_with_retry_after(clock):
+    breaker = opened(clock)
+    clock.value += 10
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.check()
+    assert exc.value.retry_after == pytest.approx(20)
+
+
+def test_half_open_allows_one_trial(clock):
+    breaker = opened(clock)
+    clock.value += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_half_open_success_closes(clock):
+    breaker = opened(clock)
+    clock.value += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["retry_after"] == 0
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = opened(clock)
+    clock.value += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_abandon_releases_trial(clock):
+    breaker = opened(clock)
+    clock.value += 30
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.25, cap=4.0) <= min(4.0, 0.25 * 2 ** attempt)
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=100)
+    for i in range(19):
+        window.add(i / 100)
+    assert window.percentile(0.5) is None
+    for i in range(19, 150):
+        window.add(i / 100)
+    assert window.percentile(0.5) == 1.0
+    assert window.percentile(0.99) == 1.49
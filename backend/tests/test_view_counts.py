@@ -0,0 +1,63 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+
+from app.services import view_counts
+
+T = datetime(2026, 10, 19, 12, 40)
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Fresh buffer; _write_batch records batches instead of writing, failing when told to"""
+    monkeypatch.setattr(view_counts, "_pending", defaultdict(int))
+    batches = []
+    fail_at = [None]
+
+    async def write_batch(batch):
+        if len(batches) == fail_at[0]:
+            raise RuntimeError("database unavailable")
+        batches.append(batch)
+
+    monkeypatch.setattr(view_counts, "_write_batch", write_batch)
+    return batches, fail_at
+
+
+def test_record_view_buckets_by_hour(written):
+    view_counts.record_view(1, T)
+    view_counts.record_view(1, T.replace(minute=5))
+    view_counts.record_view(1, T.replace(hour=13))
+    view_counts.record_view(2, T)
+    assert dict(view_counts._pending) == {
+        (1, T.replace(minute=0)): 2,
+        (1, T.replace(hour=13, minute=0)): 1,
+        (2, T.replace(minute=0)): 1,
+    }
+    assert view_counts.pending_views() == 4
+
+
+def test_flush_in_batches(written):
+    batches, _ = written
+    for listing_id in range(5):
+        view_counts.record_view(listing_id, T)
+    assert asyncio.run(view_counts.flush_views(batch_size=2)) == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert view_counts.pending_views() == 0
+    assert asyncio.run(view_counts.flush_views()) == 0
+
+
+def test_failed_batch_is_kept_for_retry(written):
+    batches, fail_at = written
+    for listing_id in range(5):
+        view_counts.record_view(listing_id, T)
+    fail_at[0] = 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(view_counts.flush_views(batch_size=2))
+    assert view_counts.pending_views() == 3
+    view_counts.record_view(4, T)
+
+    fail_at[0] = None
+    assert asyncio.run(view_counts.flush_views(batch_size=10)) == 4
+    assert dict(batches[-1])[(4, T.replace(minute=0))] == 2